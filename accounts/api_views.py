@@ -11,8 +11,7 @@ from .serializers import (
     UserProfileUpdateSerializer,
     CompleteProfileSerializer,
 )
-from dictionary.models import Word, Level
-from flashcard.models import UserWordStatus
+from flashcard.stats import level_mode_table
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
@@ -65,56 +64,8 @@ class UserDetailAPIView(generics.RetrieveAPIView):
     def get(self, request, *args, **kwargs):
         user = request.user
 
-        # レベルとモードのリストを定義
-        levels = Level.objects.all().values("id", "name")
-        modes = ["en", "ja"]
-
-        # ユーザーの回答実績を取得
-        words_status = UserWordStatus.objects.filter(user=user)
-
-        # モード名の翻訳マッピング
-        MODE_TRANSLATIONS = {
-            "en": "英訳",
-            "ja": "和訳",
-        }
-
-        level_data = []
-        for level in levels:
-            level_id = level["id"]
-            level_name = level["name"]
-
-            # 各難易度の問題総数を取得
-            total_count = Word.objects.filter(level=level_id).count()
-
-            # 各モードごとの回答数と正解数
-            mode_data = []
-            for mode in modes:
-                count = words_status.filter(word__level=level_id, mode=mode).count()
-                correct = words_status.filter(
-                    word__level=level_id, mode=mode, is_correct=True
-                ).count()
-
-                # 正解率を計算
-                accuracy = round((correct / count * 100), 1) if count > 0 else 0
-
-                mode_data.append(
-                    {
-                        "mode": mode,
-                        "mode_display": MODE_TRANSLATIONS.get(mode, mode),
-                        "count": count,
-                        "correct": correct,
-                        "accuracy": accuracy,
-                    }
-                )
-
-            level_data.append(
-                {
-                    "id": level_id,
-                    "name": level_name,
-                    "total_count": total_count,
-                    "modes": mode_data,
-                }
-            )
+        # 難易度ごとの単語数と、モードごとの回答数・正解数・正解率（HTML版と共通）
+        level_data = level_mode_table(user)
 
         response_data = {
             "user": UserSerializer(user).data,
@@ -0,0 +1,65 @@
+# accounts/management/commands/benchmark_jwt.py
+# JWT検証のコールド/ウォーム性能を計測するコマンド
+
+from django.core.management.base import BaseCommand
+from wordbook.token_cache import VerifiedTokenCache
+import jwt
+import time
+
+
+class Command(BaseCommand):
+    help = "JWT検証のコールド（署名検証）とウォーム（検証済みキャッシュ）を比較"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=10000, help="計測回数（デフォルト10000）"
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        self.stdout.write(self.style.WARNING("\n=== JWT検証ベンチマーク ===\n"))
+        self.stdout.write(f"計測回数: {iterations}\n")
+
+        payload = {
+            "sub": "00000000-0000-0000-0000-000000000000",
+            "email": "benchmark@example.com",
+            "aud": "authenticated",
+            "exp": int(time.time()) + 3600,
+        }
+
+        targets = [("HS256", "benchmark-secret", "benchmark-secret")]
+
+        try:
+            from cryptography.hazmat.primitives.asymmetric import ec
+
+            private_key = ec.generate_private_key(ec.SECP256R1())
+            targets.append(("ES256", private_key, private_key.public_key()))
+        except ImportError:
+            self.stdout.write(
+                self.style.ERROR("❌ cryptography が無いため ES256 は計測しません")
+            )
+
+        for algorithm, signing_key, verify_key in targets:
+            token = jwt.encode(payload, signing_key, algorithm=algorithm)
+
+            # コールド: 毎回署名検証
+            start = time.perf_counter()
+            for _ in range(iterations):
+                jwt.decode(
+                    token, verify_key, algorithms=[algorithm], audience="authenticated"
+                )
+            cold = (time.perf_counter() - start) / iterations
+
+            # ウォーム: 検証済みキャッシュから取得
+            cache = VerifiedTokenCache()
+            cache.set(token, payload)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                cache.get(token)
+            warm = (time.perf_counter() - start) / iterations
+
+            self.stdout.write(self.style.SUCCESS(f"✅ {algorithm}"))
+            self.stdout.write(f"  コールド: {cold * 1e6:.1f} µs/回")
+            self.stdout.write(f"  ウォーム: {warm * 1e6:.1f} µs/回")
+            self.stdout.write(f"  高速化: {cold / warm:.1f} 倍\n")
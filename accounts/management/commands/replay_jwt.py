@@ -0,0 +1,97 @@
+# accounts/management/commands/replay_jwt.py
+# トークンファイルを再生し、認証ステージごとのレイテンシ分布を表示するコマンド
+
+from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from rest_framework import exceptions
+from wordbook.authentication import SupabaseAuthentication
+from wordbook.token_cache import get_verified_token_cache
+from wordbook.user_cache import get_user_cache
+import jwt
+
+
+def percentile(sorted_values, p):
+    """ソート済みリストのパーセンタイル（最近傍法）"""
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "JWTトークンファイルを再生し、認証ステージごとのレイテンシ分布を表示"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "token_file", type=str, help="1行に1トークンを記載したファイル"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=1, help="ファイル全体を再生する回数"
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="トークンごとに検証済みキャッシュとユーザーキャッシュを破棄する",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["token_file"], encoding="utf-8") as f:
+                tokens = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            raise CommandError(f"トークンファイルを読み込めません: {str(e)}")
+
+        if not tokens:
+            raise CommandError("トークンが1件もありません")
+
+        self.stdout.write(self.style.WARNING("\n=== 認証ステージ レイテンシ ===\n"))
+        self.stdout.write(
+            f"トークン数: {len(tokens)} × {options['repeat']}回"
+            f"{'（コールド）' if options['cold'] else ''}\n"
+        )
+
+        authenticator = SupabaseAuthentication()
+        factory = RequestFactory()
+        samples = defaultdict(list)  # ステージ名 -> 秒のリスト
+        failures = defaultdict(int)
+
+        with override_settings(AUTH_TIMING_ENABLED=True):
+            for _ in range(options["repeat"]):
+                for token in tokens:
+                    if options["cold"]:
+                        get_verified_token_cache().clear()
+                        self._clear_user_cache(token)
+
+                    request = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+                    try:
+                        authenticator.authenticate(request)
+                    except exceptions.AuthenticationFailed as e:
+                        failures[str(e.detail)] += 1
+
+                    for name, seconds in request.auth_timer.stages:
+                        samples[name].append(seconds)
+
+        self.stdout.write(
+            f"{'stage':<18}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)"
+        )
+        for name, values in samples.items():
+            values.sort()
+            self.stdout.write(
+                f"{name:<18}{len(values):>8}"
+                f"{percentile(values, 50) * 1000:>10.3f}"
+                f"{percentile(values, 90) * 1000:>10.3f}"
+                f"{percentile(values, 99) * 1000:>10.3f}"
+                f"{values[-1] * 1000:>10.3f}"
+            )
+
+        if failures:
+            self.stdout.write(self.style.ERROR("\n❌ 認証失敗:"))
+            for reason, count in failures.items():
+                self.stdout.write(f"  {count}件: {reason}")
+
+    def _clear_user_cache(self, token):
+        try:
+            payload = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return
+        if payload.get("sub"):
+            get_user_cache().invalidate(payload["sub"])
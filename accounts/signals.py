@@ -0,0 +1,15 @@
+# accounts/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wordbook.user_cache import get_user_cache
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_supabase_user_cache(sender, instance, **kwargs):
+    """ユーザーの更新・削除時に supabase_id の解決キャッシュを破棄"""
+    if instance.supabase_id:
+        get_user_cache().invalidate(instance.supabase_id)
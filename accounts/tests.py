@@ -1,3 +1,31 @@
+# accounts/tests.py
+
 from django.test import TestCase
 
-# Create your tests here.
+from flashcard.stats import rebuild_user_statistics
+from wordbook.testing import QueryBudgetTestMixin
+from .api_views import UserDetailAPIView
+
+
+class UserDetailQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """ユーザー詳細のクエリ数が難易度の数に依存せず上限内に収まる"""
+
+    def assert_level_table(self, response):
+        levels = response.data["levels"]
+        self.assertEqual(len(levels), self.level_count)
+        for level in levels:
+            self.assertEqual(level["total_count"], self.words_per_level)
+            # クイズが保存するモード（en / jp）で集計している
+            self.assertEqual(
+                [(mode["mode"], mode["count"], mode["correct"]) for mode in level["modes"]],
+                [("en", self.words_per_level, 1), ("jp", self.words_per_level, 1)],
+            )
+
+    def test_user_detail(self):
+        with self.settings(FLASHCARD_MATERIALIZED_STATS=False):
+            self.assert_level_table(self.assert_query_budget(UserDetailAPIView.as_view(), 2))
+
+    def test_user_detail_with_materialized_statistics(self):
+        rebuild_user_statistics([self.user.id])
+        with self.settings(FLASHCARD_MATERIALIZED_STATS=True):
+            self.assert_level_table(self.assert_query_budget(UserDetailAPIView.as_view(), 2))
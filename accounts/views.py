@@ -5,8 +5,7 @@ from .forms import UserRegistrationForm, UserLoginForm, UserEditForm, CustomPass
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import PasswordChangeView, PasswordResetView, PasswordResetConfirmView
 from django.urls import reverse_lazy
-from dictionary.models import Word, Level
-from flashcard.models import UserWordStatus
+from flashcard.stats import level_mode_table
 from accounts.models import CustomUser
 
 # ユーザー新規登録
@@ -65,46 +64,8 @@ def user_home(request):
 # ユーザー詳細画面
 @login_required
 def user_detail(request):
-    # レベルとモードのリストを定義
-    levels = Level.objects.all().values('id', 'name')
-    modes = ['en', 'ja']
-    
-    # ユーザーの回答実績を取得
-    words_status = UserWordStatus.objects.filter(user=request.user)
-    
-    # モード名の翻訳マッピング
-    MODE_TRANSLATIONS = {
-        'en': '英訳',
-        'ja': '和訳',
-    }
-    
-    level_data = []
-    for level in levels:
-        level_id = level['id']
-        level_name = level['name']
-        
-        # 各難易度の問題総数を取得
-        total_count = Word.objects.filter(level=level_id).count()
-        
-        # 各モードごとの回答数と正解数
-        mode_data = []
-        for mode in modes:
-            count = words_status.filter(word__level=level_id, mode=mode).count()
-            correct = words_status.filter(word__level=level_id, mode=mode, is_correct=True).count()
-            mode_data.append({
-                'mode': mode,
-                'mode_display': MODE_TRANSLATIONS.get(mode, mode),  # 翻訳を適用
-                'count': count,
-                'correct': correct,
-            })
-        
-        # level_dataにデータを挿入する
-        level_data.append({
-            'id': level_id,
-            'name': level_name,
-            'total_count': total_count,
-            'modes': mode_data,
-        })
+    # 難易度ごとの単語数と、モードごとの回答数・正解数（集計は flashcard.stats で共通化）
+    level_data = level_mode_table(request.user)
     
     context = {
         'levels': level_data,
@@ -5,6 +5,8 @@ from .api_views import (
     WordListAPIView,
     WordDetailAPIView,
     word_search,
+    word_autocomplete,
+    word_lookup,
     LevelListAPIView,
     PartOfSpeechListAPIView,
     word_random,
@@ -19,6 +21,8 @@ urlpatterns = [
     path("words/random/", word_random, name="word_random"),
     # 検索
     path("search/", word_search, name="word_search"),
+    path("autocomplete/", word_autocomplete, name="word_autocomplete"),
+    path("lookup/", word_lookup, name="word_lookup"),
     # マスターデータ
     path("levels/", LevelListAPIView.as_view(), name="level_list"),
     path(
@@ -4,17 +4,54 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from django.db.models import Q
+from django.db.models.functions import Lower
 from .models import Word, Level, PartOfSpeech
+from .autocomplete import headword_index
+from .fuzzy import fuzzy_index
+from .search_cache import get_search_cache, normalize_query
+from .substring_index import substring_index
+from .word_pool import word_pool
+from wordbook.pagination import KeysetPagination
 from .serializers import (
     WordListSerializer,
     WordDetailSerializer,
     WordSearchSerializer,
+    WordLookupSerializer,
     LevelSerializer,
     PartOfSpeechSerializer,
 )
 
 
+class WordListPagination(KeysetPagination):
+    """
+    単語一覧のキーセットページネーション
+
+    ソート順はインデックスで並べ替えられるものだけを許可する
+    （english は一意インデックス、id は主キー、level は (level, english) の複合インデックス）
+    """
+
+    page_size = 100
+    max_page_size = 500
+    orderings = {
+        "id": ("id",),
+        "-id": ("-id",),
+        "english": ("english",),
+        "-english": ("-english",),
+        "level": ("level_id", "english"),
+        "-level": ("-level_id", "-english"),
+    }
+
+    def get_ordering(self, request, queryset, view=None):
+        ordering = request.query_params.get("ordering", "id")
+        if ordering not in self.orderings:
+            raise ValidationError(
+                {"ordering": f"指定できるのは {', '.join(self.orderings)} のいずれかです"}
+            )
+        return self.orderings[ordering]
+
+
 class WordListAPIView(generics.ListAPIView):
     """
     単語一覧を取得
@@ -23,11 +60,14 @@ class WordListAPIView(generics.ListAPIView):
     クエリパラメータ:
     - level: 難易度でフィルタ（例: ?level=1）
     - part_of_speech: 品詞でフィルタ（例: ?part_of_speech=1）
-    - ordering: ソート順（例: ?ordering=english または ?ordering=-english）
+    - ordering: ソート順（id, english, level とその降順。例: ?ordering=-english）
+    - limit: 1ページの件数（デフォルト100、最大500）
+    - cursor: 前のレスポンスの next_cursor
     """
 
     serializer_class = WordListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = WordListPagination
 
     def get_queryset(self):
         queryset = Word.objects.select_related("part_of_speech", "level").all()
@@ -42,10 +82,7 @@ class WordListAPIView(generics.ListAPIView):
         if part_of_speech:
             queryset = queryset.filter(part_of_speech_id=part_of_speech)
 
-        # ソート
-        ordering = self.request.query_params.get("ordering", "id")
-        queryset = queryset.order_by(ordering)
-
+        # ソート・ページングは WordListPagination で行う
         return queryset
 
 
@@ -75,6 +112,7 @@ def word_search(request):
     - level (オプション): 難易度でフィルタ
     - part_of_speech (オプション): 品詞でフィルタ
     - limit (オプション): 最大結果数（デフォルト50、最大100）
+    - fuzzy (オプション): true の場合、英単語を編集距離2以内のあいまい検索で探す
     """
     # バリデーション
     serializer = WordSearchSerializer(data=request.query_params)
@@ -85,12 +123,42 @@ def word_search(request):
     query = data["query"]
     limit = data.get("limit", 50)
 
-    # 検索クエリを構築
-    # 英語は完全一致、日本語は部分一致
-    search_filter = Q(english__iexact=query) | Q(japanese__icontains=query)
+    # 表記ゆれ（全角・半角、大文字・小文字、空白）を正規化したクエリで検索・キャッシュする
+    normalized = normalize_query(query)
+    search = fuzzy_word_search if data.get("fuzzy") else exact_word_search
+    filters = {
+        "level": data.get("level"),
+        "part_of_speech": data.get("part_of_speech"),
+        "limit": limit,
+        "fuzzy": data.get("fuzzy", False),
+    }
+    payload = get_search_cache().get_or_set(
+        "api",
+        normalized,
+        filters,
+        lambda: search(normalized, data, limit),
+        indexes=(fuzzy_index,) if data.get("fuzzy") else (substring_index,),
+    )
+
+    return Response({"query": query, **payload})
 
-    queryset = Word.objects.filter(search_filter).select_related(
-        "part_of_speech", "level"
+
+def exact_word_search(query, data, limit):
+    """英語は完全一致、日本語は部分一致で検索"""
+    # 日本語の部分一致は n-gram インデックスで該当する単語IDを求める
+    japanese_ids = substring_index.search(
+        query,
+        level_id=data.get("level"),
+        part_of_speech_id=data.get("part_of_speech"),
+        limit=limit,
+    )
+    # 英語の完全一致は Lower('english') の関数インデックスを使えるように小文字同士で比較する
+    search_filter = Q(english_lower=query.lower()) | Q(id__in=japanese_ids)
+
+    queryset = (
+        Word.objects.alias(english_lower=Lower("english"))
+        .filter(search_filter)
+        .select_related("part_of_speech", "level")
     )
 
     # レベルでフィルタ
@@ -102,13 +170,122 @@ def word_search(request):
         queryset = queryset.filter(part_of_speech_id=data["part_of_speech"])
 
     # 結果を制限
-    results = queryset[:limit]
+    results = queryset.order_by("id")[:limit]
 
     # シリアライズ
-    result_serializer = WordListSerializer(results, many=True)
+    results = list(WordListSerializer(results, many=True).data)
+
+    return {"count": len(results), "results": results}
+
+
+def fuzzy_word_search(query, data, limit):
+    """
+    英単語のあいまい検索（綴りを間違えた場合の候補）
+
+    編集距離の近い順に返し、各結果に distance（編集距離）を付ける
+    """
+    suggestions = fuzzy_index.suggest(
+        query,
+        level_id=data.get("level"),
+        part_of_speech_id=data.get("part_of_speech"),
+        limit=limit,
+    )
+    words = Word.objects.select_related("part_of_speech", "level").in_bulk(
+        [word_id for word_id, _ in suggestions]
+    )
+
+    results = [
+        {**WordListSerializer(words[word_id]).data, "distance": distance}
+        for word_id, distance in suggestions
+        if word_id in words
+    ]
+    return {"fuzzy": True, "count": len(results), "results": results}
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def word_lookup(request):
+    """
+    英単語をまとめて引く（文章中の単語に訳を付ける用途）
+
+    POST /api/dictionary/lookup/
+    {"words": ["Apple", "run", ...]}  （最大1000語）
+
+    大文字・小文字を区別せず、Lower('english') の関数インデックスを使った
+    1回の IN クエリで全ての単語を解決する
+
+    レスポンス:
+    - count: 見つかった単語数
+    - results: 小文字にした単語 -> 単語データのリスト（見つかったもののみ、ID順）
+      "China" と "china" のように大文字・小文字だけが違う見出し語は同じキーにまとめて返す
+    - not_found: 見つからなかった単語（リクエストの表記のまま）
+    """
+    serializer = WordLookupSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    requested = serializer.validated_data["words"]
+    keys = {word.strip().lower() for word in requested}
+
+    words = (
+        Word.objects.alias(english_lower=Lower("english"))
+        .filter(english_lower__in=keys)
+        .select_related("part_of_speech", "level")
+        .order_by("id")
+    )
+    data = WordListSerializer(words, many=True).data
+    results = {}
+    for word in data:
+        results.setdefault(word["english"].lower(), []).append(word)
 
     return Response(
-        {"query": query, "count": len(results), "results": result_serializer.data}
+        {
+            "count": len(data),
+            "results": results,
+            "not_found": [
+                word
+                for word in dict.fromkeys(requested)
+                if word.strip().lower() not in results
+            ],
+        }
+    )
+
+
+# 前方一致検索で一度に返せる単語数の上限
+MAX_AUTOCOMPLETE = 50
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def word_autocomplete(request):
+    """
+    英単語の前方一致検索（入力補完用）
+
+    GET /api/dictionary/autocomplete/?prefix=app&limit=10
+
+    クエリパラメータ:
+    - prefix (必須): 英単語の先頭部分（大文字・小文字は区別しない）
+    - limit (オプション): 最大結果数（デフォルト10、最大50）
+
+    プロセス内の見出し語インデックスから返すため、キー入力ごとに呼び出してもDBに問い合わせない
+    """
+    prefix = request.query_params.get("prefix", "")
+    if not prefix.strip():
+        return Response(
+            {"error": "prefix を指定してください"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 10)), MAX_AUTOCOMPLETE))
+    except ValueError:
+        return Response(
+            {"error": "limit は数値で指定してください"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return Response(
+        {"prefix": prefix, "results": headword_index.complete(prefix, limit)}
     )
 
 
@@ -152,20 +329,20 @@ def word_random(request):
     count = int(request.query_params.get("count", 10))
     count = min(count, 50)  # 最大50件
 
-    queryset = Word.objects.select_related("part_of_speech", "level").all()
-
-    # レベルでフィルタ
-    level = request.query_params.get("level")
-    if level:
-        queryset = queryset.filter(level_id=level)
-
-    # 品詞でフィルタ
-    part_of_speech = request.query_params.get("part_of_speech")
-    if part_of_speech:
-        queryset = queryset.filter(part_of_speech_id=part_of_speech)
-
-    # ランダムに取得
-    random_words = queryset.order_by("?")[:count]
+    # 難易度・品詞でフィルタ
+    try:
+        level = int(request.query_params.get("level") or 0) or None
+        part_of_speech = int(request.query_params.get("part_of_speech") or 0) or None
+    except ValueError:
+        return Response(
+            {"error": "levelとpart_of_speechは数値で指定してください"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # メモリ上のIDプールから抽出し、単語本体は主キーで取得
+    word_ids = word_pool.sample(count, level, part_of_speech)
+    words = Word.objects.select_related("part_of_speech", "level").in_bulk(word_ids)
+    random_words = [words[word_id] for word_id in word_ids if word_id in words]
 
     serializer = WordListSerializer(random_words, many=True)
 
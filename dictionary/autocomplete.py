@@ -0,0 +1,56 @@
+# dictionary/autocomplete.py
+
+from bisect import bisect_left
+
+from .indexes import InMemoryIndex
+from .models import Word
+
+# 接頭辞の後ろに付けて、接頭辞で始まる全てのキーより後ろに来る上限のキーを作る文字
+PREFIX_UPPER_SENTINEL = "\U0010ffff"
+
+
+class HeadwordIndex(InMemoryIndex):
+    """
+    英単語（見出し語）の前方一致検索用インデックス
+
+    小文字化した見出し語をソート済みのリストで保持し、
+    bisect で接頭辞で始まる範囲（prefix 〜 prefix + PREFIX_UPPER_SENTINEL）を求めて
+    先頭から必要な件数だけ返す（DBには問い合わせない）。
+    単語の変更時は裏のスレッドで作り直し（それまでは変更前の一覧を返す）、
+    難易度・品詞の変更時はシグナルで破棄され、次回アクセス時に再構築する。
+    """
+
+    def build(self):
+        rows = sorted(
+            (english.casefold(), word_id, english, level_name, part_of_speech_name)
+            for word_id, english, level_name, part_of_speech_name in Word.objects.values_list(
+                "id", "english", "level__name", "part_of_speech__name"
+            ).iterator(chunk_size=5000)
+        )
+        return {
+            "keys": [row[0] for row in rows],
+            "entries": [
+                {
+                    "id": word_id,
+                    "english": english,
+                    "level": level_name,
+                    "part_of_speech": part_of_speech_name,
+                }
+                for _, word_id, english, level_name, part_of_speech_name in rows
+            ],
+        }
+
+    def complete(self, prefix, limit=10):
+        """prefix で始まる見出し語を辞書順に最大 limit 件取得（大文字・小文字は区別しない）"""
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return []
+
+        data = self.data
+        keys = data["keys"]
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + PREFIX_UPPER_SENTINEL, start)
+        return data["entries"][start : min(end, start + limit)]
+
+
+headword_index = HeadwordIndex()
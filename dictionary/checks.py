@@ -0,0 +1,17 @@
+# dictionary/checks.py
+
+from django.core import checks
+
+from wordbook.checks import check_shared_cache_alias
+
+
+@checks.register(checks.Tags.caches)
+def check_search_cache(app_configs, **kwargs):
+    """検索結果のキャッシュが全ワーカーで共有されるか"""
+    return check_shared_cache_alias(
+        "DICTIONARY_SEARCH_CACHE_ALIAS",
+        "default",
+        "dictionary.W001",
+        "検索結果がワーカーごとにキャッシュされ、ヒット率が下がります。"
+        "CACHES に DB/Redis などの共有バックエンドを設定してください。",
+    )
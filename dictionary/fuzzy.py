@@ -0,0 +1,171 @@
+# dictionary/fuzzy.py
+
+from .indexes import InMemoryIndex
+from .models import Word
+from .search_cache import normalize_query
+
+# 候補として返す最大の編集距離
+MAX_EDIT_DISTANCE = 2
+
+# 削除パターンを作る見出し語の先頭文字数（長い単語で削除パターンが爆発しないようにする）
+PREFIX_LENGTH = 7
+
+
+def deletes(text, max_distance=MAX_EDIT_DISTANCE):
+    """text から max_distance 文字以内を削除してできる文字列の集合（text 自身を含む）"""
+    results = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:i] + variant[i + 1 :]
+            for variant in frontier
+            for i in range(len(variant))
+        } - results
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, max_distance=MAX_EDIT_DISTANCE):
+    """
+    a と b の編集距離（挿入・削除・置換・隣接文字の入れ替え）
+
+    max_distance を超えることが確定した時点で打ち切り、max_distance + 1 を返す
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex(InMemoryIndex):
+    """
+    英単語（見出し語）のあいまい検索用インデックス（SymSpell 方式）
+
+    見出し語の先頭 PREFIX_LENGTH 文字から最大 MAX_EDIT_DISTANCE 文字を削除したパターンを
+    事前に計算しておき、クエリの削除パターンと突き合わせて候補を求める。
+    全単語との編集距離を計算せず、候補に対してだけ距離を確認する。
+    削除パターンの大半は1語にしか対応しないので、値は1語なら単語ID、複数語ならリストで持つ。
+    単語の追加・更新・削除はシグナル経由で差分反映する。
+    """
+
+    incremental = True
+
+    def build(self):
+        data = {"words": {}, "patterns": {}}
+        rows = Word.objects.values_list("id", "english", "level_id", "part_of_speech_id")
+        for word_id, english, level_id, part_of_speech_id in rows.iterator(chunk_size=5000):
+            add_word(data, word_id, english, level_id, part_of_speech_id)
+        return data
+
+    def suggest(
+        self,
+        query,
+        max_distance=MAX_EDIT_DISTANCE,
+        level_id=None,
+        part_of_speech_id=None,
+        limit=None,
+    ):
+        """
+        query との編集距離が max_distance 以内の単語を近い順に取得
+
+        Returns:
+            list: (単語ID, 編集距離) のリスト（距離、見出し語の順）
+        """
+        query = normalize_query(query)
+        if not query:
+            return []
+        max_distance = min(max_distance, MAX_EDIT_DISTANCE)
+
+        with self._lock:
+            # 差分反映（on_word_saved / on_word_deleted）の途中の削除パターンを読まない
+            data = self.data
+            words = data["words"]
+            patterns = data["patterns"]
+
+            checked = set()
+            suggestions = []
+            for pattern in deletes(query[:PREFIX_LENGTH], max_distance):
+                word_ids = patterns.get(pattern, ())
+                for word_id in (word_ids,) if isinstance(word_ids, int) else word_ids:
+                    if word_id in checked:
+                        continue
+                    checked.add(word_id)
+
+                    headword, word_level_id, word_part_of_speech_id = words[word_id]
+                    if level_id is not None and word_level_id != level_id:
+                        continue
+                    if (
+                        part_of_speech_id is not None
+                        and word_part_of_speech_id != part_of_speech_id
+                    ):
+                        continue
+
+                    distance = edit_distance(query, headword, max_distance)
+                    if distance <= max_distance:
+                        suggestions.append((distance, headword, word_id))
+
+        suggestions.sort()
+        return [(word_id, distance) for distance, _, word_id in suggestions[:limit]]
+
+    def on_word_saved(self, word, created):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+                self._add(word)
+
+    def on_word_deleted(self, word):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+
+    def _add(self, word):
+        add_word(self._data, word.id, word.english, word.level_id, word.part_of_speech_id)
+
+    def _remove(self, word_id):
+        entry = self._data["words"].pop(word_id, None)
+        if entry is None:
+            return
+        patterns = self._data["patterns"]
+        for pattern in deletes(entry[0][:PREFIX_LENGTH]):
+            word_ids = patterns.get(pattern)
+            if word_ids == word_id:
+                del patterns[pattern]
+            elif isinstance(word_ids, list) and word_id in word_ids:
+                word_ids.remove(word_id)
+                if len(word_ids) == 1:
+                    patterns[pattern] = word_ids[0]
+
+
+def add_word(data, word_id, english, level_id, part_of_speech_id):
+    """単語と削除パターンをインデックスに追加"""
+    headword = normalize_query(english)
+    data["words"][word_id] = (headword, level_id, part_of_speech_id)
+    patterns = data["patterns"]
+    for pattern in deletes(headword[:PREFIX_LENGTH]):
+        word_ids = patterns.get(pattern)
+        if word_ids is None:
+            patterns[pattern] = word_id
+        elif isinstance(word_ids, int):
+            patterns[pattern] = [word_ids, word_id]
+        else:
+            word_ids.append(word_id)
+
+
+fuzzy_index = FuzzyIndex()
@@ -0,0 +1,202 @@
+# dictionary/indexes.py
+
+import copy
+import logging
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .search_cache import get_search_cache
+
+logger = logging.getLogger(__name__)
+
+# バックグラウンドでの再構築に失敗した場合、次に再構築を試みるまでの間隔（秒）
+REFRESH_RETRY_INTERVAL = 10
+
+
+class InMemoryIndex:
+    """
+    Word テーブルから構築するプロセス内インデックスの基底クラス
+
+    - 初回アクセス時に build() で構築し、以降はDBに問い合わせない
+    - Word / Level / PartOfSpeech の変更シグナル（dictionary.signals）で
+      on_word_saved / on_word_deleted / invalidate が呼ばれる
+      （差分反映するインデックスの on_word_saved / on_word_deleted はコミット後に呼ばれるので、
+      ロールバックされた変更は反映されない。差分反映と同時にデータを読まないよう、
+      読み出し側も _lock を取る）
+    - 構築時の辞書のバージョン（dictionary.models.DictionaryVersion）を記録しておき、
+      DICTIONARY_INDEX_VERSION_CHECK_INTERVAL 秒ごとに共有のバージョンと比べて、
+      他のワーカーで辞書が変更されていれば作り直す（DICTIONARY_INDEX_TTL 秒ごとにも作り直す）
+    - 再構築（TTL切れ・差分反映できない変更）の間は古いデータを返し続け、
+      裏のスレッドで作り直したものに差し替える（リクエストを待たせない）
+    """
+
+    instances = []
+
+    # on_word_saved / on_word_deleted で差分反映し、変更後のバージョンにそのまま追従できるか
+    incremental = False
+
+    def __init__(self):
+        self._data = None
+        self._expires_at = 0.0
+        self._changes = 0  # 単語の変更を受け取った回数（再構築中の変更の検出用）
+        self._version = None  # データが反映している辞書のバージョン
+        self._version_checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.RLock()
+        InMemoryIndex.instances.append(self)
+
+    def build(self):
+        """インデックスを構築して返す（サブクラスで実装）"""
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        data = self._data
+        if data is not None and self._version_check_due():
+            self.is_current(dictionary_version())
+        if data is not None and time.monotonic() <= self._expires_at:
+            return data
+
+        if data is not None and getattr(settings, "DICTIONARY_INDEX_BACKGROUND_REFRESH", True):
+            self._refresh_in_background()
+            return data
+
+        # 初回（またはバックグラウンドでの再構築が無効な場合）はその場で構築する
+        with self._lock:
+            if self._data is None or time.monotonic() > self._expires_at:
+                version = dictionary_version()
+                self._install(self.build(), version)
+            return self._data
+
+    def invalidate(self):
+        """データを破棄し、次回アクセス時にその場で構築し直す"""
+        with self._lock:
+            self._data = None
+            self._version = None
+
+    def is_current(self, version):
+        """
+        データが辞書のバージョン version を反映しているか
+
+        古い場合は再構築を予約する（次回アクセス時に裏のスレッドで作り直す）
+        """
+        self._version_checked_at = time.monotonic()
+        if self._data is not None and self._version == version:
+            return True
+        self.mark_stale()
+        return False
+
+    def advance_version(self, version):
+        """
+        辞書の変更を差分反映した後、バージョンを version に進める
+
+        直前のバージョンを反映しているインデックスだけを進める
+        （他のワーカーでの変更を挟んでいる場合は再構築に任せる）
+        """
+        with self._lock:
+            if self.incremental and self._version is not None and self._version == version - 1:
+                self._version = version
+
+    def mark_stale(self):
+        """次回アクセス時に再構築する（それまでは現在のデータを返す）"""
+        self._expires_at = 0.0
+
+    def on_word_saved(self, word, created):
+        """Word の保存時（差分更新できるサブクラスはオーバーライドする）"""
+        self._mark_stale_after_commit()
+
+    def on_word_deleted(self, word):
+        """Word の削除時（差分更新できるサブクラスはオーバーライドする）"""
+        self._mark_stale_after_commit()
+
+    def _mark_stale_after_commit(self):
+        # コミット前に再構築が始まると変更を読めないので、コミット後にもう一度印を付ける
+        self.mark_stale()
+        transaction.on_commit(self.mark_stale)
+
+    def _install(self, data, version):
+        ttl = getattr(settings, "DICTIONARY_INDEX_TTL", 300)
+        self._data = data
+        self._version = version
+        self._version_checked_at = time.monotonic()
+        self._expires_at = time.monotonic() + ttl if ttl else float("inf")
+
+    def _version_check_due(self):
+        interval = getattr(settings, "DICTIONARY_INDEX_VERSION_CHECK_INTERVAL", 5)
+        return time.monotonic() - self._version_checked_at > interval
+
+    def _refresh_in_background(self):
+        if self._refreshing:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                changes = self._changes
+                # 構築前に読んでおき、構築中に進んだ場合は古いバージョンとして扱う
+                version = dictionary_version()
+                data = self.build()
+                with self._lock:
+                    self._install(data, version)
+                    # 構築中に届いた変更は反映されていない可能性があるので、もう一度作り直す
+                    if self._changes != changes:
+                        self.mark_stale()
+            except Exception as e:
+                # 古いデータで動き続けられるので警告のみ
+                logger.warning(f"{type(self).__name__} background rebuild failed: {str(e)}")
+                self._expires_at = time.monotonic() + REFRESH_RETRY_INTERVAL
+            finally:
+                self._refreshing = False
+                connections.close_all()
+
+        threading.Thread(
+            target=run, name=f"{type(self).__name__}-rebuild", daemon=True
+        ).start()
+
+
+def dictionary_version():
+    """全ワーカーで共有している辞書のバージョン（DBから読み直す）"""
+    return get_search_cache().version(refresh=True)
+
+
+def word_saved(word, created):
+    """全てのプロセス内インデックスに単語の追加・更新を反映（差分反映はコミット後）"""
+    # コミットまでにインスタンスが変更・削除されても、保存時の値で反映する
+    word = copy.copy(word)
+    for index in InMemoryIndex.instances:
+        index._changes += 1
+        if index.incremental:
+            transaction.on_commit(partial(index.on_word_saved, word, created))
+        else:
+            index.on_word_saved(word, created)
+
+
+def word_deleted(word):
+    """全てのプロセス内インデックスに単語の削除を反映（差分反映はコミット後）"""
+    # 削除後のインスタンスは id が None になるので、削除時の値を残しておく
+    word = copy.copy(word)
+    for index in InMemoryIndex.instances:
+        index._changes += 1
+        if index.incremental:
+            transaction.on_commit(partial(index.on_word_deleted, word))
+        else:
+            index.on_word_deleted(word)
+
+
+def advance_version(version):
+    """差分反映できるプロセス内インデックスのバージョンを進める"""
+    for index in InMemoryIndex.instances:
+        index.advance_version(version)
+
+
+def invalidate_all():
+    """全てのプロセス内インデックスを破棄"""
+    for index in InMemoryIndex.instances:
+        index.invalidate()
@@ -0,0 +1,149 @@
+# dictionary/management/commands/benchmark_fuzzy_search.py
+# 英単語のあいまい検索インデックス（SymSpell 方式）の構築時間・メモリ・検索時間を計測するコマンド
+# 合成した辞書（デフォルト10万語）で計測し、計測後はすべてロールバックする
+# 一部のクエリは全単語との編集距離の計算（総当たり）と結果を照合する
+
+from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from dictionary.fuzzy import MAX_EDIT_DISTANCE, edit_distance, fuzzy_index
+from dictionary.models import Level, PartOfSpeech, Word
+import random
+import statistics
+import string
+import time
+import tracemalloc
+import uuid
+
+
+class Rollback(Exception):
+    pass
+
+
+def misspell(word, edits):
+    """word に挿入・削除・置換・隣接文字の入れ替えを edits 回加える"""
+    for _ in range(edits):
+        position = random.randrange(len(word))
+        operation = random.choice(("insert", "delete", "replace", "transpose"))
+        if operation == "insert":
+            word = word[:position] + random.choice(string.ascii_lowercase) + word[position:]
+        elif operation == "delete" and len(word) > 1:
+            word = word[:position] + word[position + 1 :]
+        elif operation == "transpose" and position < len(word) - 1:
+            word = word[:position] + word[position + 1] + word[position] + word[position + 2 :]
+        else:
+            word = word[:position] + random.choice(string.ascii_lowercase) + word[position + 1 :]
+    return word
+
+
+class Command(BaseCommand):
+    help = "合成辞書であいまい検索インデックスの構築時間・メモリ・検索時間を計測"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words", type=int, default=100000, help="合成する単語数"
+        )
+        parser.add_argument(
+            "--queries", type=int, default=200, help="編集回数ごとの計測クエリ数"
+        )
+        parser.add_argument(
+            "--verify", type=int, default=5, help="総当たりと照合するクエリ数（編集回数ごと）"
+        )
+
+    def handle(self, *args, **options):
+        self.failures = []
+        try:
+            with transaction.atomic():
+                self._create_dictionary(options["words"])
+                self._benchmark(options["queries"], options["verify"])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # ロールバックした単語をインデックスに残さない
+            fuzzy_index.invalidate()
+
+        if self.failures:
+            raise CommandError("総当たりと結果が一致しません: " + ", ".join(self.failures))
+
+    def _create_dictionary(self, word_count):
+        suffix = uuid.uuid4().hex[:8]
+        part_of_speech = PartOfSpeech.objects.create(name=f"bench-{suffix}")
+        level = Level.objects.create(name=f"bench-{suffix}")
+
+        # 英単語らしい長さ（4〜12文字）のランダムな綴り（既存の単語とは重複させない）
+        existing = {english.casefold() for english in Word.objects.values_list("english", flat=True)}
+        headwords = set()
+        while len(headwords) < word_count:
+            headword = "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12)))
+            if headword not in existing:
+                headwords.add(headword)
+
+        start = time.perf_counter()
+        Word.objects.bulk_create(
+            (
+                Word(english=headword, japanese="合成", part_of_speech=part_of_speech, level=level)
+                for headword in headwords
+            ),
+            batch_size=5000,
+        )
+        self.headwords = sorted(headwords)
+        self.stdout.write(
+            f"合成辞書の作成: {word_count}語 ({(time.perf_counter() - start):.1f} s)"
+        )
+
+    def _benchmark(self, query_count, verify_count):
+        self.stdout.write(self.style.WARNING("\n=== あいまい検索ベンチマーク ===\n"))
+
+        fuzzy_index.invalidate()
+        start = time.perf_counter()
+        data = fuzzy_index.data
+        build_time = time.perf_counter() - start
+
+        # メモリ使用量は tracemalloc を有効にしてもう一度構築して計測（構築時間には含めない）
+        fuzzy_index.invalidate()
+        tracemalloc.start()
+        data = fuzzy_index.data
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"インデックスの構築: {build_time:.1f} s  メモリ: {memory / 1024 / 1024:.0f} MiB  "
+            f"削除パターン: {len(data['patterns'])}件\n"
+        )
+
+        all_words = Word.objects.values_list("id", "english")
+        all_words = [(word_id, english.casefold()) for word_id, english in all_words]
+
+        self.stdout.write(
+            f"{'edits':>6}{'hits':>8}{'median ms':>12}{'p95 ms':>10}{'brute ms':>12}"
+        )
+        for edits in range(MAX_EDIT_DISTANCE + 1):
+            queries = [misspell(random.choice(self.headwords), edits) for _ in range(query_count)]
+
+            timings, hits = [], []
+            for query in queries:
+                start = time.perf_counter()
+                suggestions = fuzzy_index.suggest(query)
+                timings.append((time.perf_counter() - start) * 1000)
+                hits.append(len(suggestions))
+
+            # 総当たり（全単語との編集距離）と照合
+            brute_timings = []
+            for query in queries[:verify_count]:
+                start = time.perf_counter()
+                expected = {
+                    word_id
+                    for word_id, headword in all_words
+                    if edit_distance(query, headword) <= MAX_EDIT_DISTANCE
+                }
+                brute_timings.append((time.perf_counter() - start) * 1000)
+                if {word_id for word_id, _ in fuzzy_index.suggest(query)} != expected:
+                    self.failures.append(query)
+
+            timings.sort()
+            self.stdout.write(
+                f"{edits:>6}{statistics.median(hits):>8.0f}"
+                f"{statistics.median(timings):>12.3f}"
+                f"{timings[int(len(timings) * 0.95)]:>10.3f}"
+                f"{statistics.median(brute_timings) if brute_timings else 0:>12.1f}"
+            )
@@ -0,0 +1,157 @@
+# dictionary/management/commands/benchmark_substring_search.py
+# 日本語訳の部分一致検索を、icontains（LIKE '%...%'）と n-gram インデックスで比較するコマンド
+# 合成した辞書（デフォルト10万語）で計測し、計測後はすべてロールバックする
+
+from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from dictionary.models import Level, PartOfSpeech, Word
+from dictionary.substring_index import substring_index
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+
+# 合成する日本語訳に使う文字（ひらがな・カタカナ・よく使う漢字）
+CHARACTERS = (
+    "".join(chr(code) for code in range(0x3041, 0x3094))
+    + "".join(chr(code) for code in range(0x30A1, 0x30F7))
+    + "日本人大年中出生子分行時上会自事者社見月前後手間気入下場合物方地国"
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "合成辞書で日本語訳の部分一致検索を比較（icontains / n-gram インデックス）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words", type=int, default=100000, help="合成する単語数"
+        )
+        parser.add_argument(
+            "--queries", type=int, default=50, help="クエリの長さごとの計測回数"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                words = self._create_dictionary(options["words"])
+                self._benchmark(words, options["queries"])
+                self._check_incremental(words)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # ロールバックした単語をインデックスに残さない
+            substring_index.invalidate()
+
+        if self.failures:
+            raise CommandError("検索結果が一致しません: " + ", ".join(self.failures))
+
+    def _create_dictionary(self, word_count):
+        suffix = uuid.uuid4().hex[:8]
+        part_of_speech = PartOfSpeech.objects.create(name=f"bench-{suffix}")
+        level = Level.objects.create(name=f"bench-{suffix}")
+
+        def text(low, high):
+            return "".join(random.choices(CHARACTERS, k=random.randint(low, high)))
+
+        start = time.perf_counter()
+        words = Word.objects.bulk_create(
+            (
+                Word(
+                    english=f"bench-{suffix}-{i}",
+                    japanese=",".join(text(2, 6) for _ in range(random.randint(1, 3))),
+                    phrase=text(10, 30) if i % 3 == 0 else None,
+                    part_of_speech=part_of_speech,
+                    level=level,
+                )
+                for i in range(word_count)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(
+            f"合成辞書の作成: {word_count}語 ({(time.perf_counter() - start):.1f} s)"
+        )
+        return words
+
+    def _benchmark(self, words, query_count):
+        self.failures = []
+
+        self.stdout.write(self.style.WARNING("\n=== 部分一致検索ベンチマーク ===\n"))
+
+        substring_index.invalidate()
+        start = time.perf_counter()
+        substring_index.data
+        build_time = time.perf_counter() - start
+
+        # メモリ使用量は tracemalloc を有効にしてもう一度構築して計測（構築時間には含めない）
+        substring_index.invalidate()
+        tracemalloc.start()
+        substring_index.data
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.stdout.write(
+            f"インデックスの構築: {build_time * 1000:.0f} ms  メモリ: {memory / 1024 / 1024:.1f} MiB\n"
+        )
+
+        self.stdout.write(f"{'length':>8}{'hits':>10}{'icontains ms':>15}{'index ms':>12}")
+        for length in (1, 2, 3, 4):
+            # 既存の単語の日本語訳から切り出したクエリ（必ず1件以上ヒットする）
+            queries = []
+            while len(queries) < query_count:
+                japanese = random.choice(words).japanese
+                if len(japanese) >= length:
+                    offset = random.randrange(len(japanese) - length + 1)
+                    queries.append(japanese[offset : offset + length])
+
+            database_times, index_times, hits = [], [], []
+            for query in queries:
+                start = time.perf_counter()
+                expected = list(
+                    Word.objects.filter(japanese__icontains=query)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                database_times.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                actual = substring_index.search(query)
+                index_times.append((time.perf_counter() - start) * 1000)
+
+                hits.append(len(actual))
+                if actual != expected:
+                    self.failures.append(query)
+
+            self.stdout.write(
+                f"{length:>8}{statistics.median(hits):>10.0f}"
+                f"{statistics.median(database_times):>15.2f}"
+                f"{statistics.median(index_times):>12.3f}"
+            )
+
+    def _check_incremental(self, words):
+        """シグナル経由の差分更新後も icontains と同じ結果になるか確認"""
+        changed = random.sample(words, 20)
+        for word in changed:
+            word.japanese = f"差分{word.id}更新"
+            word.save()
+        deleted = changed[:5]
+        for word in deleted:
+            Word.objects.get(id=word.id).delete()
+
+        for word in changed:
+            query = f"{word.id}更"
+            expected = list(
+                Word.objects.filter(japanese__icontains=query)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            if substring_index.search(query) != expected:
+                self.failures.append(f"差分更新:{word.id}")
+
+        self.stdout.write(
+            f"\n差分更新の確認: 更新 {len(changed)}語 / 削除 {len(deleted)}語"
+        )
@@ -0,0 +1,134 @@
+# dictionary/management/commands/benchmark_word_pages.py
+# 単語一覧のページ取得コストを、深い位置のページで OFFSET 方式とキーセット方式で比較するコマンド
+# 合成した辞書（デフォルト10万語）で計測し、計測後はすべてロールバックする
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from dictionary.api_views import WordListPagination
+from dictionary.models import Level, PartOfSpeech, Word
+from dictionary.serializers import WordListSerializer
+import statistics
+import time
+import uuid
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "合成辞書で単語一覧の深いページの取得時間を比較（OFFSET / キーセット）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words", type=int, default=100000, help="合成する単語数"
+        )
+        parser.add_argument(
+            "--levels", type=int, default=5, help="合成する難易度の数"
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=100, help="1ページの件数"
+        )
+        parser.add_argument(
+            "--depths",
+            type=float,
+            nargs="+",
+            default=[0, 0.1, 0.5, 0.9, 0.99],
+            help="計測するページの位置（全体に対する割合、複数指定可）",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="1ページあたりの計測回数（中央値を表示）"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._create_dictionary(options["words"], options["levels"])
+                self._benchmark(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _create_dictionary(self, word_count, level_count):
+        """英語の並びとIDの並びが一致しないように、ランダムな接頭辞をつけた単語を作成"""
+        suffix = uuid.uuid4().hex[:8]
+        part_of_speech = PartOfSpeech.objects.create(name=f"bench-{suffix}")
+        levels = Level.objects.bulk_create(
+            Level(name=f"bench-{suffix}-{i}") for i in range(level_count)
+        )
+
+        start = time.perf_counter()
+        Word.objects.bulk_create(
+            (
+                Word(
+                    english=f"{uuid.uuid4().hex[:10]}-{suffix}-{i}",
+                    japanese=f"合成{i}",
+                    part_of_speech=part_of_speech,
+                    level=levels[i % level_count],
+                )
+                for i in range(word_count)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(
+            f"合成辞書の作成: {word_count}語 ({(time.perf_counter() - start):.1f} s)"
+        )
+
+    def _benchmark(self, options):
+        factory = APIRequestFactory()
+        page_size = options["page_size"]
+        repeat = options["repeat"]
+        queryset = Word.objects.select_related("part_of_speech", "level")
+        total = Word.objects.count()
+
+        self.stdout.write(self.style.WARNING("\n=== 単語一覧ページ取得ベンチマーク ===\n"))
+        self.stdout.write(
+            f"{'ordering':<10}{'offset':>10}{'OFFSET ms':>12}{'keyset ms':>12}"
+        )
+
+        for ordering_param in ("id", "english", "level"):
+            ordering = WordListPagination.orderings[ordering_param]
+            for depth in options["depths"]:
+                offset = min(int(total * depth), total - 1)
+
+                # キーセット方式のカーソル（offset の直前の行のキー）は計測外で用意する
+                params = {"ordering": ordering_param, "limit": page_size}
+                if offset:
+                    previous = queryset.order_by(*ordering)[offset - 1]
+                    paginator = WordListPagination()
+                    paginator.ordering = ordering
+                    params["cursor"] = paginator.encode_cursor(
+                        [paginator.key_value(previous, field) for field in ordering]
+                    )
+
+                def offset_page():
+                    page = queryset.order_by(*ordering)[offset : offset + page_size]
+                    return WordListSerializer(page, many=True).data
+
+                def keyset_page():
+                    request = Request(factory.get("/", params))
+                    paginator = WordListPagination()
+                    page = paginator.paginate_queryset(queryset, request)
+                    return WordListSerializer(page, many=True).data
+
+                offset_rows = offset_page()
+                keyset_rows = keyset_page()
+                if [row["id"] for row in offset_rows] != [row["id"] for row in keyset_rows]:
+                    self.stdout.write(self.style.ERROR(f"結果が一致しません: {ordering_param} @ {offset}"))
+
+                self.stdout.write(
+                    f"{ordering_param:<10}{offset:>10}"
+                    f"{self._measure(offset_page, repeat):>12.2f}"
+                    f"{self._measure(keyset_page, repeat):>12.2f}"
+                )
+
+    @staticmethod
+    def _measure(fetch, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
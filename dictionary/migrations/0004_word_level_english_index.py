@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0003_alter_word_english_alter_word_japanese_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(fields=['level', 'english'], name='word_level_english_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 19:04
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0004_word_level_english_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(django.db.models.functions.text.Lower('english'), name='word_english_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0005_word_english_lower_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DictionaryVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(verbose_name='バージョン')),
+            ],
+            options={
+                'verbose_name_plural': '辞書のバージョン',
+                'db_table': 'dictionary_version',
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import time
+
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
 
 # 品詞モデル
 class PartOfSpeech(models.Model):
@@ -10,7 +14,9 @@ class PartOfSpeech(models.Model):
     
     @property
     def part_of_speech_count(self):
-        return self.part_of_speech.count()
+        # 単語数は単語IDプール（プロセス内キャッシュ）から取得し、COUNTクエリを発行しない
+        from .word_pool import word_pool
+        return word_pool.count(part_of_speech_id=self.id)
     
     def __str__(self):
         return self.name
@@ -26,7 +32,9 @@ class Level(models.Model):
     
     @property
     def level_count(self):
-        return self.level.count()
+        # 単語数は単語IDプール（プロセス内キャッシュ）から取得し、COUNTクエリを発行しない
+        from .word_pool import word_pool
+        return word_pool.count(level_id=self.id)
     
     def __str__(self):
         return self.name
@@ -41,7 +49,43 @@ class Word(models.Model):
     
     class Meta:
         db_table = 'word'
+        indexes = [
+            # 単語一覧を (難易度, 英語) の順にキーセットでページングする
+            models.Index(fields=['level', 'english'], name='word_level_english_idx'),
+            # 英単語の大文字・小文字を区別しない完全一致（Lower('english') での検索）に使う
+            models.Index(Lower('english'), name='word_english_lower_idx'),
+        ]
         verbose_name_plural = '単語'
     
     def __str__(self):
-        return self.english
\ No newline at end of file
+        return self.english
+
+# 辞書のバージョン（Word / Level / PartOfSpeech の変更ごとに進める、1行だけのテーブル）
+# キャッシュの設定に関わらず全ワーカーで共有するためDBに保存する
+class DictionaryVersion(models.Model):
+    ROW_ID = 1
+
+    version = models.BigIntegerField(verbose_name='バージョン')
+
+    class Meta:
+        db_table = 'dictionary_version'
+        verbose_name_plural = '辞書のバージョン'
+
+    @classmethod
+    def current(cls):
+        """現在のバージョン（行が無ければ作成する）"""
+        version = cls.objects.filter(id=cls.ROW_ID).values_list('version', flat=True).first()
+        if version is None:
+            # 行が消えた後に以前と同じ番号から数え直さないよう、初期値は現在時刻にする
+            row, _ = cls.objects.get_or_create(id=cls.ROW_ID, defaults={'version': time.time_ns()})
+            version = row.version
+        return version
+
+    @classmethod
+    def bump(cls):
+        """バージョンを1つ進め、進めた後のバージョンを返す"""
+        with transaction.atomic():
+            cls.current()
+            # UPDATE で行をロックするので、コミットまで他の bump() の値は混ざらない
+            cls.objects.filter(id=cls.ROW_ID).update(version=F('version') + 1)
+            return cls.objects.filter(id=cls.ROW_ID).values_list('version', flat=True).get()
@@ -0,0 +1,130 @@
+# dictionary/search_cache.py
+
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+
+from wordbook.metrics import registry
+from .models import DictionaryVersion
+
+SEARCH_CACHE_LOOKUPS = registry.counter(
+    "dictionary_search_cache_lookups_total", "単語検索の結果キャッシュの参照数（hit/miss）"
+)
+SEARCH_CACHE_HIT_RATE = registry.gauge(
+    "dictionary_search_cache_hit_rate", "単語検索の結果キャッシュのヒット率"
+)
+
+
+def normalize_query(query):
+    """検索クエリを正規化（NFKC・大文字小文字の統一・前後と連続する空白の除去）"""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class SearchResultCache:
+    """
+    単語検索の結果キャッシュ
+
+    - キーは 正規化したクエリ + 絞り込み条件 + 辞書のバージョン
+    - Word / Level / PartOfSpeech の変更時は dictionary.signals がバージョンを進めるので、
+      古いキーを探して削除しなくても以降の検索は新しいキーで行われる（古いエントリは期限切れで消える）
+    - 辞書のバージョンはキャッシュではなくDB（DictionaryVersion）に保存し、
+      DICTIONARY_INDEX_VERSION_CHECK_INTERVAL 秒ごとに読み直す
+      （プロセス内キャッシュのままでも、他のワーカーでの変更がその間隔で反映される）
+    - 検索に使ったプロセス内インデックスが現在のバージョンを反映していない場合
+      （他のワーカーで辞書が変更された直後など）は、結果を返すだけで保存しない
+    """
+
+    key_prefix = "dictionary:search:"
+
+    def __init__(self, cache_alias="default", timeout=600):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self._version = None
+        self._version_read_at = 0.0
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def version(self, refresh=False):
+        """
+        現在の辞書のバージョン
+
+        DBから読んだ値を DICTIONARY_INDEX_VERSION_CHECK_INTERVAL 秒間使い回す
+        （refresh=True の場合は必ず読み直す）
+        """
+        interval = getattr(settings, "DICTIONARY_INDEX_VERSION_CHECK_INTERVAL", 5)
+        if refresh or self._version is None or time.monotonic() - self._version_read_at > interval:
+            self._remember_version(DictionaryVersion.current())
+        return self._version
+
+    def bump_version(self):
+        """辞書のバージョンを進め、それまでの検索結果をすべて無効にする（進めた後のバージョンを返す）"""
+        version = DictionaryVersion.bump()
+        self._remember_version(version)
+        return version
+
+    def _remember_version(self, version):
+        self._version = version
+        self._version_read_at = time.monotonic()
+
+    def key(self, kind, query, filters, version=None):
+        digest = hashlib.sha256(
+            json.dumps([query, filters], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        if version is None:
+            version = self.version()
+        return f"{self.key_prefix}{version}:{kind}:{digest}"
+
+    def get_or_set(self, kind, query, filters, compute, indexes=()):
+        """
+        検索結果をキャッシュから取得し、なければ compute() の結果を保存して返す
+
+        Args:
+            kind (str): 検索の種類（API・HTMLなど、結果の形式ごとに分ける）
+            query (str): 正規化した検索クエリ
+            filters (dict): 絞り込み条件・件数など結果に影響するパラメータ
+            compute (callable): 検索を実行して結果を返す関数
+            indexes (tuple): compute() が使うプロセス内インデックス（dictionary.indexes）
+        """
+        version = self.version()
+        key = self.key(kind, query, filters, version)
+        result = self.cache.get(key)
+        self._record_lookup(result is not None)
+        if result is None:
+            # 検索の前後どちらでも現在のバージョンを反映している場合だけ保存する
+            current = all([index.is_current(version) for index in indexes])
+            result = compute()
+            if current and all([index.is_current(version) for index in indexes]):
+                self.cache.set(key, result, timeout=self.timeout)
+        return result
+
+    def _record_lookup(self, hit):
+        SEARCH_CACHE_LOOKUPS.inc(result="hit" if hit else "miss")
+        hits = SEARCH_CACHE_LOOKUPS.value(result="hit")
+        total = hits + SEARCH_CACHE_LOOKUPS.value(result="miss")
+        SEARCH_CACHE_HIT_RATE.set(round(hits / total, 4))
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """settings からプロセス共通の SearchResultCache を取得（初回のみ生成）"""
+    global _search_cache
+
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchResultCache(
+                    cache_alias=getattr(settings, "DICTIONARY_SEARCH_CACHE_ALIAS", "default"),
+                    timeout=getattr(settings, "DICTIONARY_SEARCH_CACHE_TTL", 600),
+                )
+
+    return _search_cache
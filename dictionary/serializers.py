@@ -22,8 +22,8 @@ class LevelSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "word_count"]
 
     def get_word_count(self, obj):
-        """このレベルの単語数を取得"""
-        return obj.level.count()
+        """このレベルの単語数を取得（単語IDプールから取得するのでクエリは発行しない）"""
+        return obj.level_count
 
 
 class WordListSerializer(serializers.ModelSerializer):
@@ -66,3 +66,19 @@ class WordSearchSerializer(serializers.Serializer):
         max_value=100,
         help_text="最大結果数（デフォルト50、最大100）",
     )
+    fuzzy = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="英単語を編集距離2以内のあいまい検索で探す（オプション）",
+    )
+
+
+class WordLookupSerializer(serializers.Serializer):
+    """英単語の一括検索用のシリアライザー"""
+
+    words = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=1000,
+        help_text="検索する英単語のリスト（最大1000語、大文字・小文字は区別しない）",
+    )
@@ -0,0 +1,39 @@
+# dictionary/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import indexes
+from .models import Level, PartOfSpeech, Word
+from .search_cache import get_search_cache
+
+
+def dictionary_changed():
+    """辞書のバージョンを進め、差分反映済みのプロセス内インデックスを新しいバージョンに追従させる"""
+    indexes.advance_version(get_search_cache().bump_version())
+
+
+@receiver(post_save, sender=Word)
+def word_saved(sender, instance, created, **kwargs):
+    """単語の追加・更新をプロセス内インデックスに反映し、検索結果のキャッシュを無効にする"""
+    indexes.word_saved(instance, created)
+    # 他のワーカーがコミット前のデータでインデックスを作り直さないよう、バージョンはコミット後に進める
+    transaction.on_commit(dictionary_changed)
+
+
+@receiver(post_delete, sender=Word)
+def word_deleted(sender, instance, **kwargs):
+    """単語の削除をプロセス内インデックスに反映し、検索結果のキャッシュを無効にする"""
+    indexes.word_deleted(instance)
+    transaction.on_commit(dictionary_changed)
+
+
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+@receiver(post_save, sender=PartOfSpeech)
+@receiver(post_delete, sender=PartOfSpeech)
+def master_changed(sender, **kwargs):
+    """難易度・品詞の変更時はインデックスを作り直し、検索結果のキャッシュを無効にする"""
+    indexes.invalidate_all()
+    transaction.on_commit(dictionary_changed)
@@ -0,0 +1,172 @@
+# dictionary/substring_index.py
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from .indexes import InMemoryIndex
+from .models import Word
+from .search_cache import normalize_query
+
+# 索引を作るフィールド（search の fields で指定する）
+FIELDS = ("japanese", "phrase")
+
+
+def fold(text):
+    """
+    比較用に文字列を変換（icontains 相当）
+
+    検索クエリと同じ normalize_query（NFKC・大文字小文字の統一・空白の統一）をかけ、
+    全角・半角などの表記ゆれがあっても正規化したクエリで見つかるようにする
+    """
+    return normalize_query(text or "")
+
+
+def grams(text):
+    """文字列に含まれる1文字・2文字の n-gram の集合"""
+    return set(text) | {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def query_grams(query):
+    """
+    部分一致検索で候補を絞り込むための n-gram
+
+    クエリを含む文字列は必ずクエリのすべての2文字 n-gram を含むので、
+    2文字以上のクエリは2文字 n-gram だけで絞り込める
+    """
+    if len(query) == 1:
+        return {query}
+    return {query[i : i + 2] for i in range(len(query) - 1)}
+
+
+def contains(posting, word_id):
+    """ID順のポスティングに word_id が含まれるか（二分探索）"""
+    position = bisect_left(posting, word_id)
+    return position < len(posting) and posting[position] == word_id
+
+
+class SubstringIndex(InMemoryIndex):
+    """
+    日本語訳・成句の部分一致検索用の n-gram 転置インデックス
+
+    LIKE '%...%' はインデックスを使えず全件走査になるため、
+    1文字・2文字の n-gram ごとに単語IDを ID 順の array('q') で保持しておき、
+    クエリの n-gram のうち最も短いポスティングから候補を取り出して残りと照合、
+    最後に実際の文字列で部分一致を確認する。
+    単語の追加・更新・削除はシグナル経由で差分反映する。
+    """
+
+    incremental = True
+
+    def build(self):
+        words = {}
+        postings = {field: defaultdict(lambda: array("q")) for field in FIELDS}
+
+        rows = Word.objects.order_by("id").values_list(
+            "id", "level_id", "part_of_speech_id", *FIELDS
+        )
+        for word_id, level_id, part_of_speech_id, *texts in rows.iterator(chunk_size=5000):
+            texts = tuple(fold(text) for text in texts)
+            words[word_id] = (level_id, part_of_speech_id, texts)
+            for field, text in zip(FIELDS, texts):
+                for gram in grams(text):
+                    postings[field][gram].append(word_id)
+
+        return {
+            "words": words,
+            "postings": {field: dict(postings[field]) for field in FIELDS},
+        }
+
+    def search(
+        self,
+        query,
+        fields=("japanese",),
+        level_id=None,
+        part_of_speech_id=None,
+        limit=None,
+    ):
+        """
+        query を部分一致で含む単語IDを ID 順に取得（大文字・小文字は区別しない）
+
+        Args:
+            query (str): 検索文字列
+            fields (tuple): 検索するフィールド（FIELDS のうちのいくつか）
+            level_id (int): 難易度で絞り込む（オプション）
+            part_of_speech_id (int): 品詞で絞り込む（オプション）
+            limit (int): 最大件数（オプション）
+        """
+        query = fold(query)
+        if not query:
+            return []
+
+        with self._lock:
+            # 差分反映（on_word_saved / on_word_deleted）の途中のポスティングを読まない
+            data = self.data
+            words = data["words"]
+            matched = set()
+            for field in fields:
+                field_position = FIELDS.index(field)
+                field_postings = data["postings"][field]
+
+                lists = sorted(
+                    (field_postings.get(gram, ()) for gram in query_grams(query)), key=len
+                )
+                candidates, others = lists[0], lists[1:]
+                for word_id in candidates:
+                    if word_id in matched:
+                        continue
+                    word_level_id, word_part_of_speech_id, texts = words[word_id]
+                    if level_id is not None and word_level_id != level_id:
+                        continue
+                    if (
+                        part_of_speech_id is not None
+                        and word_part_of_speech_id != part_of_speech_id
+                    ):
+                        continue
+                    if not all(contains(posting, word_id) for posting in others):
+                        continue
+                    if query in texts[field_position]:
+                        matched.add(word_id)
+                        # 1フィールドだけなら候補は ID 順なので、limit 件見つかった時点で打ち切れる
+                        if len(fields) == 1 and limit is not None and len(matched) >= limit:
+                            break
+
+        return sorted(matched)[:limit]
+
+    def on_word_saved(self, word, created):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+                self._add(word)
+
+    def on_word_deleted(self, word):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+
+    def _add(self, word):
+        texts = tuple(fold(getattr(word, field)) for field in FIELDS)
+        self._data["words"][word.id] = (word.level_id, word.part_of_speech_id, texts)
+        for field, text in zip(FIELDS, texts):
+            field_postings = self._data["postings"][field]
+            for gram in grams(text):
+                posting = field_postings.setdefault(gram, array("q"))
+                position = bisect_left(posting, word.id)
+                posting.insert(position, word.id)
+
+    def _remove(self, word_id):
+        entry = self._data["words"].pop(word_id, None)
+        if entry is None:
+            return
+        for field, text in zip(FIELDS, entry[2]):
+            field_postings = self._data["postings"][field]
+            for gram in grams(text):
+                posting = field_postings.get(gram)
+                if posting is None or not contains(posting, word_id):
+                    continue
+                del posting[bisect_left(posting, word_id)]
+                if not posting:
+                    del field_postings[gram]
+
+
+substring_index = SubstringIndex()
@@ -1,3 +1,393 @@
-from django.test import TestCase
+# dictionary/tests.py
 
-# Create your tests here.
+import threading
+
+from django.core.cache import caches
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from wordbook.testing import QueryBudgetTestMixin
+from .api_views import LevelListAPIView, word_autocomplete, word_lookup, word_search
+from .autocomplete import headword_index
+from .indexes import InMemoryIndex, invalidate_all
+from .search_cache import get_search_cache
+from .substring_index import substring_index
+from .word_pool import word_pool
+from .models import DictionaryVersion, Level, PartOfSpeech, Word
+
+
+class CountingIndex(InMemoryIndex):
+    """build() の回数を数え、release が set されるまで構築を止められるテスト用インデックス"""
+
+    def __init__(self):
+        super().__init__()
+        self.builds = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def build(self):
+        self.started.set()
+        self.release.wait(5)
+        self.builds += 1
+        return self.builds
+
+
+@override_settings(DICTIONARY_INDEX_TTL=300, DICTIONARY_INDEX_BACKGROUND_REFRESH=True)
+class InMemoryIndexRefreshTests(TransactionTestCase):
+    """TTL切れ・変更時の再構築でリクエストを待たせない"""
+
+    def setUp(self):
+        self.index = CountingIndex()
+        self.addCleanup(InMemoryIndex.instances.remove, self.index)
+
+    def wait_for_rebuild(self):
+        for _ in range(500):
+            if not self.index._refreshing:
+                return
+            threading.Event().wait(0.01)
+        self.fail("background rebuild did not finish")
+
+    def test_first_access_builds_synchronously(self):
+        self.assertEqual(self.index.data, 1)
+
+    def test_expired_index_is_served_stale_while_rebuilding(self):
+        self.assertEqual(self.index.data, 1)
+        self.index.release.clear()
+        self.index.started.clear()
+        self.index.mark_stale()
+
+        # 再構築が終わるまでは古いデータを返し、再構築は1つしか走らない
+        self.assertEqual(self.index.data, 1)
+        self.assertTrue(self.index.started.wait(5))
+        self.assertEqual(self.index.data, 1)
+
+        self.index.release.set()
+        self.wait_for_rebuild()
+        self.assertEqual(self.index.data, 2)
+        self.assertEqual(self.index.builds, 2)
+
+    def test_change_during_rebuild_schedules_another_rebuild(self):
+        self.assertEqual(self.index.data, 1)
+        self.index.release.clear()
+        self.index.started.clear()
+        self.index.mark_stale()
+        self.index.data
+        self.assertTrue(self.index.started.wait(5))
+
+        # 構築中に単語が変更された（dictionary.indexes.word_deleted と同じ通知）
+        self.index._changes += 1
+        self.index.on_word_deleted(None)
+        self.index.release.set()
+        self.wait_for_rebuild()
+
+        self.assertEqual(self.index.data, 2)
+        self.wait_for_rebuild()
+        self.assertEqual(self.index.data, 3)
+
+    @override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False)
+    def test_rebuilds_synchronously_when_background_refresh_is_disabled(self):
+        self.assertEqual(self.index.data, 1)
+        self.index.mark_stale()
+        self.assertEqual(self.index.data, 2)
+
+
+class LevelListQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """難易度一覧のクエリ数が難易度の数に依存しない（単語数は単語IDプールから取得）"""
+
+    def test_levels(self):
+        response = self.assert_query_budget(LevelListAPIView.as_view(), 1)
+
+        self.assertEqual(len(response.data), self.level_count)
+        self.assertEqual({level["word_count"] for level in response.data}, {self.words_per_level})
+
+
+class SearchNormalizationTests(TestCase):
+    """全角・半角や大文字・小文字の表記ゆれがあっても検索できる"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="search", email="search@example.com")
+        level = Level.objects.create(name="テスト")
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        cls.word = Word.objects.create(
+            english="Word", japanese="（名）単語１", level=level, part_of_speech=part_of_speech
+        )
+
+    def setUp(self):
+        self.enterContext(override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False))
+        caches["default"].clear()
+        invalidate_all()
+
+    def search(self, **params):
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=self.user)
+        response = word_search(request)
+        self.assertEqual(response.status_code, 200)
+        return [result["id"] for result in response.data["results"]]
+
+    def test_substring_search_matches_fullwidth_text(self):
+        for query in ("（名）単語1", "(名)単語1", "（名）単語１", "単語１"):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query=query), [self.word.id])
+
+    def test_fuzzy_search_matches_fullwidth_query(self):
+        self.assertEqual(self.search(query="ｗｏｒｄ", fuzzy="true"), [self.word.id])
+
+
+class DictionaryVersionTests(TestCase):
+    """他のワーカーで辞書が変更された後の検索結果のキャッシュ"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="version", email="version@example.com")
+        cls.level = Level.objects.create(name="テスト")
+        cls.part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        Word.objects.create(
+            english="apple", japanese="りんご", level=cls.level, part_of_speech=cls.part_of_speech
+        )
+
+    def setUp(self):
+        self.enterContext(override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False))
+        caches["default"].clear()
+        invalidate_all()
+        self.search_cache = get_search_cache()
+
+    def search(self, query):
+        request = APIRequestFactory().get("/", {"query": query})
+        force_authenticate(request, user=self.user)
+        return word_search(request)
+
+    def cached(self, query):
+        filters = {"level": None, "part_of_speech": None, "limit": 50, "fuzzy": False}
+        return self.search_cache.cache.get(self.search_cache.key("api", query, filters))
+
+    def test_result_from_outdated_index_is_not_cached(self):
+        substring_index.data
+        self.search("りんご")
+        self.assertIsNotNone(self.cached("りんご"))
+
+        # 他のワーカーで辞書が変更された（このプロセスのインデックスは古いまま）
+        DictionaryVersion.objects.update(version=F("version") + 1)
+        with self.settings(DICTIONARY_INDEX_VERSION_CHECK_INTERVAL=0):
+            self.search("りんご")
+        self.assertIsNone(self.cached("りんご"))
+
+        # インデックスを作り直した後の結果は保存する
+        self.search("りんご")
+        self.assertIsNotNone(self.cached("りんご"))
+
+    def test_version_is_shared_through_the_database(self):
+        version = self.search_cache.version(refresh=True)
+        # キャッシュが消えても（プロセス内キャッシュの別ワーカーでも）同じバージョンを読む
+        caches["default"].clear()
+        self.assertEqual(self.search_cache.version(refresh=True), version)
+
+        DictionaryVersion.objects.update(version=F("version") + 1)
+        # 確認間隔の間は読み直さない
+        self.assertEqual(self.search_cache.version(), version)
+        self.assertEqual(self.search_cache.version(refresh=True), version + 1)
+        self.assertEqual(self.search_cache.bump_version(), version + 2)
+
+    def test_incremental_indexes_follow_local_changes(self):
+        substring_index.data
+        headword_index.data
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Word.objects.create(
+                english="orange",
+                japanese="オレンジ",
+                level=self.level,
+                part_of_speech=self.part_of_speech,
+            )
+
+        version = self.search_cache.version()
+        self.assertTrue(substring_index.is_current(version))
+        # 差分反映しないインデックスは作り直す
+        self.assertFalse(headword_index.is_current(version))
+
+
+class WordIdPoolTests(TestCase):
+    """単語の削除・更新後の単語IDプール"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.levels = [Level.objects.create(name=f"プール{i}") for i in range(2)]
+        cls.part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        cls.words = [
+            Word.objects.create(
+                english=f"pool{i}",
+                japanese=f"プール{i}",
+                level=cls.levels[0],
+                part_of_speech=cls.part_of_speech,
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.enterContext(override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False))
+        caches["default"].clear()
+        invalidate_all()
+
+    def test_changes_are_applied_after_commit(self):
+        word_pool.data
+        substring_index.data
+        with self.captureOnCommitCallbacks() as callbacks:
+            word = Word.objects.create(
+                english="grape",
+                japanese="ぶどう",
+                level=self.levels[1],
+                part_of_speech=self.part_of_speech,
+            )
+            # ロールバックされるかもしれない変更はインデックスに反映しない
+            self.assertEqual(list(word_pool.ids(level_id=self.levels[1].id)), [])
+            self.assertEqual(substring_index.search("ぶどう"), [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(list(word_pool.ids(level_id=self.levels[1].id)), [word.id])
+        self.assertEqual(substring_index.search("ぶどう"), [word.id])
+
+    def test_deleted_word_is_removed_from_every_pool(self):
+        word_pool.data
+        deleted = self.words[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted.delete()
+
+        for level_id in (self.levels[0].id, None):
+            with self.subTest(level_id=level_id):
+                self.assertNotIn(deleted.id, word_pool.ids(level_id=level_id))
+        self.assertEqual(word_pool.count(level_id=self.levels[0].id), 2)
+
+    def test_level_change_moves_word_between_pools(self):
+        word_pool.data
+        word = self.words[0]
+        word.level = self.levels[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            word.save()
+
+        self.assertEqual(
+            list(word_pool.ids(level_id=self.levels[0].id)), [self.words[1].id, self.words[2].id]
+        )
+        self.assertEqual(list(word_pool.ids(level_id=self.levels[1].id)), [word.id])
+        self.assertEqual(list(word_pool.ids()), [word.id for word in self.words])
+
+    def test_sample_existing_replaces_words_deleted_by_another_worker(self):
+        word_pool.data
+        # 他のワーカーで削除された（コミット後の差分反映が届かず、このプロセスのプールには残ったまま）
+        self.words[0].delete()
+
+        sampled = word_pool.sample_existing(3, level_id=self.levels[0].id)
+
+        self.assertCountEqual(sampled, [self.words[1].id, self.words[2].id])
+
+
+class HeadwordIndexTests(TestCase):
+    """見出し語の前方一致検索"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="complete", email="complete@example.com")
+        cls.level = Level.objects.create(name="テスト")
+        cls.part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        for english in ("apple", "Apply", "applesauce", "app", "apricot", "banana", "ap"):
+            Word.objects.create(
+                english=english,
+                japanese=english,
+                level=cls.level,
+                part_of_speech=cls.part_of_speech,
+            )
+
+    def setUp(self):
+        self.enterContext(override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False))
+        invalidate_all()
+
+    def complete(self, prefix, limit=10):
+        return [entry["english"] for entry in headword_index.complete(prefix, limit)]
+
+    def test_prefix_range(self):
+        self.assertEqual(self.complete("app"), ["app", "apple", "applesauce", "Apply"])
+        self.assertEqual(self.complete("apple"), ["apple", "applesauce"])
+        self.assertEqual(
+            self.complete("ap"), ["ap", "app", "apple", "applesauce", "Apply", "apricot"]
+        )
+        # 最後の見出し語・全ての見出し語より後ろ・間に一致しない接頭辞
+        self.assertEqual(self.complete("banana"), ["banana"])
+        self.assertEqual(self.complete("bananas"), [])
+        self.assertEqual(self.complete("zzz"), [])
+        self.assertEqual(self.complete("apq"), [])
+
+    def test_prefix_is_case_folded(self):
+        self.assertEqual(self.complete("APPL"), ["apple", "applesauce", "Apply"])
+        self.assertEqual(self.complete("  Apply "), ["Apply"])
+
+    def test_limit(self):
+        self.assertEqual(self.complete("ap", limit=2), ["ap", "app"])
+
+    def test_api_answers_without_queries(self):
+        headword_index.data
+        request = APIRequestFactory().get("/", {"prefix": "APR", "limit": 5})
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(0):
+            response = word_autocomplete(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "id": Word.objects.get(english="apricot").id,
+                    "english": "apricot",
+                    "level": "テスト",
+                    "part_of_speech": "名詞",
+                }
+            ],
+        )
+
+    def test_index_follows_word_changes(self):
+        self.assertEqual(self.complete("ba"), ["banana"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Word.objects.create(
+                english="Bamboo", japanese="竹", level=self.level, part_of_speech=self.part_of_speech
+            )
+        self.assertEqual(self.complete("ba"), ["Bamboo", "banana"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Word.objects.get(english="banana").delete()
+        self.assertEqual(self.complete("ba"), ["Bamboo"])
+
+
+class WordLookupTests(TestCase):
+    """英単語の一括検索"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="lookup", email="lookup@example.com")
+        level = Level.objects.create(name="テスト")
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        cls.words = [
+            Word.objects.create(
+                english=english, japanese=japanese, level=level, part_of_speech=part_of_speech
+            )
+            for english, japanese in (("China", "中国"), ("china", "陶磁器"), ("run", "走る"))
+        ]
+
+    def lookup(self, words):
+        request = APIRequestFactory().post("/", {"words": words}, format="json")
+        force_authenticate(request, user=self.user)
+        response = word_lookup(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_headwords_differing_only_in_case_are_all_returned(self):
+        data = self.lookup(["CHINA", "Run", "missing"])
+
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(
+            [word["english"] for word in data["results"]["china"]], ["China", "china"]
+        )
+        self.assertEqual([word["english"] for word in data["results"]["run"]], ["run"])
+        self.assertEqual(data["not_found"], ["missing"])
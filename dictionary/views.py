@@ -1,7 +1,10 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
 from django.db.models import Q
+from django.db.models.functions import Lower
 from .models import Word
+from .search_cache import get_search_cache, normalize_query
+from .substring_index import substring_index
 
 # 単語検索機能
 @login_required
@@ -10,9 +13,15 @@ def search(request):
     results = []
     
     if query:
-        # 英語または日本語で検索
-        results = Word.objects.filter(
-            Q(english__iexact=query) | Q(japanese__icontains=query) # 英語は完全一致で、日本語は部分一致
+        # 英語または日本語で検索（正規化したクエリで検索し、結果はキャッシュする）
+        normalized = normalize_query(query)
+        results = get_search_cache().get_or_set(
+            'html', normalized, {}, lambda: list(
+                Word.objects.alias(english_lower=Lower('english')).filter(
+                    Q(english_lower=normalized.lower()) | Q(id__in=substring_index.search(normalized)) # 英語は完全一致で、日本語は部分一致（n-gram インデックス）
+                ).select_related('part_of_speech').order_by('id')
+            ),
+            indexes=(substring_index,),
         )
     else:
         return render(request, 'dictionary/search.html', {'results': results, 'query': query})
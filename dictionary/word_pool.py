@@ -0,0 +1,113 @@
+# dictionary/word_pool.py
+
+import random
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from .indexes import InMemoryIndex
+from .models import Word
+
+
+class WordIdPool(InMemoryIndex):
+    """
+    難易度・品詞ごとの単語IDプール
+
+    (level_id, part_of_speech_id) ごとに単語IDを array('q') で保持する。
+    どちらかを None にしたキーには「全て」の組み合わせを事前に用意しておくので、
+    k 件のランダム抽出はテーブルを走査せず O(k) で行える。
+    単語の追加・更新・削除はシグナル経由で差分反映する。
+    """
+
+    incremental = True
+
+    def build(self):
+        pools = defaultdict(lambda: array("q"))
+
+        rows = Word.objects.order_by("id").values_list(
+            "id", "level_id", "part_of_speech_id"
+        )
+        for word_id, level_id, part_of_speech_id in rows.iterator(chunk_size=5000):
+            pools[(level_id, part_of_speech_id)].append(word_id)
+            pools[(level_id, None)].append(word_id)
+            pools[(None, part_of_speech_id)].append(word_id)
+            pools[(None, None)].append(word_id)
+
+        return dict(pools)
+
+    def ids(self, level_id=None, part_of_speech_id=None):
+        """条件に一致する単語IDの配列（ID順）"""
+        return self.data.get((level_id, part_of_speech_id), array("q"))
+
+    def count(self, level_id=None, part_of_speech_id=None):
+        """条件に一致する単語数"""
+        return len(self.ids(level_id, part_of_speech_id))
+
+    def sample(self, k, level_id=None, part_of_speech_id=None):
+        """
+        条件に一致する単語IDをランダムに最大 k 件取得
+
+        random.sample(range(n), k) は range を展開しないので O(k)
+        """
+        with self._lock:
+            # 差分反映で配列が縮んだ後の位置を読まない
+            pool = self.ids(level_id, part_of_speech_id)
+            positions = random.sample(range(len(pool)), min(k, len(pool)))
+            return [pool[position] for position in positions]
+
+    def sample_existing(self, k, level_id=None, part_of_speech_id=None):
+        """
+        sample() のうちDBに存在する単語IDだけを返す（クイズの出題順に保存する用）
+
+        他のワーカーで削除された単語は再構築までこのプロセスのプールに残るので、
+        1回のクエリで存在を確認し、削除済みの分は抽出し直して補う
+        """
+        word_ids = self.sample(k, level_id, part_of_speech_id)
+        existing = set(Word.objects.filter(id__in=word_ids).values_list("id", flat=True))
+        if len(existing) == len(word_ids):
+            return word_ids
+
+        # プールが古いので作り直し、足りない分は残りから抽出する
+        self.mark_stale()
+        deleted = set(word_ids) - existing
+        word_ids = [word_id for word_id in word_ids if word_id in existing]
+        candidates = [
+            word_id
+            for word_id in self.sample(k, level_id, part_of_speech_id)
+            if word_id not in deleted and word_id not in existing
+        ][: k - len(word_ids)]
+        if candidates:
+            found = set(Word.objects.filter(id__in=candidates).values_list("id", flat=True))
+            word_ids += [word_id for word_id in candidates if word_id in found]
+        return word_ids
+
+    def on_word_saved(self, word, created):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+                self._add(word)
+
+    def on_word_deleted(self, word):
+        with self._lock:
+            if self._data is not None:
+                self._remove(word.id)
+
+    def _add(self, word):
+        for key in (
+            (word.level_id, word.part_of_speech_id),
+            (word.level_id, None),
+            (None, word.part_of_speech_id),
+            (None, None),
+        ):
+            pool = self._data.setdefault(key, array("q"))
+            pool.insert(bisect_left(pool, word.id), word.id)
+
+    def _remove(self, word_id):
+        # 更新前の難易度・品詞は分からないので、全てのプールから取り除く
+        for pool in self._data.values():
+            position = bisect_left(pool, word_id)
+            if position < len(pool) and pool[position] == word_id:
+                del pool[position]
+
+
+word_pool = WordIdPool()
@@ -0,0 +1,147 @@
+# flashcard/answer_log.py
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AnswerEvent
+from .scheduler import apply_answers
+from .stats import apply_statistics_changes
+
+logger = logging.getLogger(__name__)
+
+# 回答イベントの反映を直列化する PostgreSQL のアドバイザリロックのキー
+FLUSH_ADVISORY_LOCK_ID = 0x616E7377  # "answ"
+
+
+def append_answers(user, mode, results):
+    """
+    回答を回答イベントとして追記（リクエスト内の書き込みは1回のINSERTのみ）
+
+    UserWordStatus への反映はフラッシャーがまとめて行う。
+
+    Args:
+        user: ユーザー
+        mode (str): "en" または "jp"
+        results (list): (word, is_correct) のリスト（回答順）
+    """
+    if not results:
+        return
+
+    now = timezone.now()
+    AnswerEvent.objects.bulk_create(
+        [
+            AnswerEvent(
+                user=user, word=word, mode=mode, is_correct=is_correct, answered_at=now
+            )
+            for word, is_correct in results
+        ]
+    )
+
+    if getattr(settings, "ANSWER_LOG_BACKGROUND_FLUSH", True):
+        get_answer_event_flusher().ensure_started()
+
+
+def flush_answer_events(batch_size=None):
+    """
+    未反映の回答イベントを古い順に最大 batch_size 件 UserWordStatus に反映し、削除する
+
+    反映は UserWordStatus・UserStatistics の現在値を読んで書き戻すため、
+    複数のワーカーや flush_answer_events コマンドが同時に実行した場合は
+    トランザクション単位のロックで1つずつ順番に反映する（バッチを並行して反映しない）。
+
+    Returns:
+        int: 反映したイベント数
+    """
+    batch_size = batch_size or getattr(settings, "ANSWER_LOG_BATCH_SIZE", 500)
+
+    with transaction.atomic():
+        lock_flush()
+        events = list(
+            AnswerEvent.objects.select_for_update(of=("self",))
+            .order_by("id")
+            .values_list(
+                "id", "user_id", "word_id", "mode", "is_correct", "answered_at", "word__level_id"
+            )[:batch_size]
+        )
+        if not events:
+            return 0
+
+        changes = apply_answers([event[1:6] for event in events])
+        apply_statistics_changes(changes, {event[2]: event[6] for event in events})
+        AnswerEvent.objects.filter(id__in=[event[0] for event in events]).delete()
+
+    return len(events)
+
+
+def lock_flush():
+    """
+    トランザクションが終わるまで他のフラッシャーの反映を待たせる
+
+    PostgreSQL ではアドバイザリロックを使う。SQLite は書き込みが1つずつしか行われず、
+    それ以外のDBでは select_for_update() の行ロックで先に反映中のバッチを待つ。
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [FLUSH_ADVISORY_LOCK_ID])
+
+
+class AnswerEventFlusher:
+    """
+    回答イベントを一定間隔で UserWordStatus に反映するバックグラウンドスレッド
+
+    イベントはDBに保存されているため、プロセスが終了しても失われない
+    （次に起動したフラッシャーか flush_answer_events コマンドが反映する）
+    """
+
+    def __init__(self, interval=2.0, batch_size=500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="answer-event-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                # 1バッチ分たまっている間は続けて反映する
+                while flush_answer_events(self.batch_size) >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.warning(f"Answer event flush failed: {str(e)}")
+            finally:
+                connection.close()
+
+
+_answer_event_flusher = None
+_answer_event_flusher_lock = threading.Lock()
+
+
+def get_answer_event_flusher():
+    """settings からプロセス共通の AnswerEventFlusher を取得（初回のみ生成）"""
+    global _answer_event_flusher
+
+    if _answer_event_flusher is None:
+        with _answer_event_flusher_lock:
+            if _answer_event_flusher is None:
+                _answer_event_flusher = AnswerEventFlusher(
+                    interval=getattr(settings, "ANSWER_LOG_FLUSH_INTERVAL", 2.0),
+                    batch_size=getattr(settings, "ANSWER_LOG_BATCH_SIZE", 500),
+                )
+
+    return _answer_event_flusher
@@ -6,11 +6,13 @@ from .api_views import (
     UserProgressDetailAPIView,
     start_quiz,
     submit_answer,
+    submit_answers_batch,
     pause_quiz,
     resume_quiz,
     delete_progress,
     get_statistics,
     get_incorrect_words,
+    get_due_cards,
 )
 
 app_name = "flashcard_api"
@@ -29,7 +31,12 @@ urlpatterns = [
     # クイズ
     path("quiz/start/", start_quiz, name="start_quiz"),
     path("quiz/answer/", submit_answer, name="submit_answer"),
+    path(
+        "quiz/answers/batch/", submit_answers_batch, name="submit_answers_batch"
+    ),
     # 統計
     path("statistics/", get_statistics, name="statistics"),
     path("incorrect-words/", get_incorrect_words, name="incorrect_words"),
+    # 復習
+    path("review/due/", get_due_cards, name="due_cards"),
 ]
@@ -1,26 +1,83 @@
 # flashcard/api_views.py
 
+import json
+
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Count, Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-import random
-import json
 
 from .models import UserProgress, UserWordStatus, UserReviewProgress
+from .grading import grade_answer
+from .quiz_session import QuizSession
+from .answer_log import append_answers
+from .scheduler import due_queryset, due_word_ids
+from .stats import statistics_cells, summarize_statistics
 from dictionary.models import Word, Level
+from dictionary.word_pool import word_pool
+from wordbook.pagination import KeysetPagination
 from .serializers import (
     UserProgressSerializer,
     UserProgressCreateSerializer,
     UserWordStatusSerializer,
     AnswerSubmitSerializer,
+    BatchAnswerSubmitSerializer,
     UserReviewProgressSerializer,
     StatisticsSerializer,
 )
 
 
+# prefetch で一度に返せる問題数の上限
+MAX_PREFETCH = 20
+
+
+def get_prefetch_count(request):
+    """クエリパラメータ prefetch（先読みする問題数）を取得（未指定の場合は None）"""
+    prefetch = request.query_params.get("prefetch")
+    if prefetch is None:
+        return None
+    try:
+        return max(1, min(int(prefetch), MAX_PREFETCH))
+    except ValueError:
+        return 1
+
+
+def stale_answer_response(current_question_index=None):
+    """回答済みの問題への回答（二重送信・同時送信）に対するレスポンス"""
+    data = {"error": "この問題はすでに回答済みです", "stale": True}
+    if current_question_index is not None:
+        data["current_question_index"] = current_question_index
+    return Response(data, status=status.HTTP_409_CONFLICT)
+
+
+def serialize_question(word, mode, index, total_questions):
+    """出題用の問題データ（品詞と成句を含む）"""
+    return {
+        "id": word.id,
+        "question": word.japanese if mode == "en" else word.english,
+        "question_number": index + 1,
+        "total_questions": total_questions,
+        "part_of_speech": word.part_of_speech.name if word.part_of_speech else None,
+        "phrase": word.phrase or None,
+    }
+
+
+def fetch_questions(ids, start, mode, total_questions):
+    """
+    出題順の問題ID ids（start 番目から）を1クエリで取得し、出題順に並べて返す
+    """
+    words = Word.objects.select_related("part_of_speech").in_bulk(ids)
+    return [
+        serialize_question(words[word_id], mode, start + offset, total_questions)
+        for offset, word_id in enumerate(ids)
+        if word_id in words
+    ]
+
+
 class UserProgressListAPIView(generics.ListAPIView):
     """
     ユーザーの進行状況一覧を取得
@@ -79,8 +136,12 @@ def start_quiz(request):
     {
         "level_id": 1,
         "mode": "en",  // en: 英訳, jp: 和訳
-        "quiz_mode": "normal"  // normal: 通常, test: テスト, replay: リプレイ
+        "quiz_mode": "normal"  // normal: 通常, test: テスト, replay: リプレイ（復習時期の来た問題）
     }
+
+    クエリパラメータ:
+    - prefetch: 先読みする問題数（例: ?prefetch=5、最大20）
+      指定すると現在の問題から K 問分を prefetched_questions で返す
     """
     serializer = UserProgressCreateSerializer(data=request.data)
     if not serializer.is_valid():
@@ -94,26 +155,17 @@ def start_quiz(request):
     # レベルを取得
     level = get_object_or_404(Level, id=level_id)
 
-    # 選択したレベルの単語を取得
-    words = Word.objects.filter(level=level)
-
-    # クイズモードによって問題を生成
+    # クイズモードによって問題を生成（通常・テストはメモリ上のIDプールから抽出）
     if quiz_mode == "test":
         # テストモード: ランダムで100問
-        total_questions = min(100, words.count())
-        questions = random.sample(
-            list(words.values_list("id", flat=True)), total_questions
-        )
+        questions = word_pool.sample_existing(100, level_id=level.id)
+        total_questions = len(questions)
 
     elif quiz_mode == "replay":
-        # リプレイモード: 間違えた問題のみ
-        incorrect_word_ids = UserWordStatus.objects.filter(
-            user=request.user, mode=mode, is_correct=False
-        ).values_list("word_id", flat=True)
-
-        replay_words = words.filter(id__in=incorrect_word_ids)
+        # リプレイモード: 復習時期の来た問題（間違えた問題を含む）を期限の古い順に最大 REVIEW_QUEUE_LIMIT 問
+        questions = due_word_ids(request.user, mode, level_id=level.id)
 
-        if not replay_words.exists():
+        if not questions:
             return Response(
                 {
                     "error": "リプレイする問題がありません。まず通常モードで学習してください。"
@@ -121,16 +173,19 @@ def start_quiz(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        total_questions = replay_words.count()
-        questions = random.sample(
-            list(replay_words.values_list("id", flat=True)), total_questions
-        )
+        total_questions = len(questions)
 
     else:
         # 通常モード: 全問題
-        total_questions = words.count()
-        questions = random.sample(
-            list(words.values_list("id", flat=True)), total_questions
+        questions = word_pool.sample_existing(
+            word_pool.count(level_id=level.id), level_id=level.id
+        )
+        total_questions = len(questions)
+
+    if not questions:
+        return Response(
+            {"error": "この難易度には出題できる単語がありません"},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
     # 進行状況を作成
@@ -141,49 +196,22 @@ def start_quiz(request):
         score=0,
         total_questions=total_questions,
         current_question_index=0,
-        question_ids=json.dumps(questions),
+        question_ids=questions,
     )
+    QuizSession.from_progress(user_progress).save()
 
-    # 最初の問題を取得
-    first_question_id = questions[0]
-    first_question = Word.objects.get(id=first_question_id)
-
-    # 品詞と成句を取得（文字列 or オブジェクトに対応）
-    part_of_speech = first_question.part_of_speech
-    phrase = first_question.phrase
+    # 最初の問題（と先読み分）を1クエリで取得
+    prefetch = get_prefetch_count(request)
+    upcoming = fetch_questions(questions[: prefetch or 1], 0, mode, total_questions)
 
-    # part_of_speechが文字列かオブジェクトか判定
-    if part_of_speech:
-        part_of_speech_str = (
-            part_of_speech.name
-            if hasattr(part_of_speech, "name")
-            else str(part_of_speech)
-        )
-    else:
-        part_of_speech_str = None
-
-    # phraseが文字列かオブジェクトか判定
-    if phrase:
-        phrase_str = phrase.name if hasattr(phrase, "name") else str(phrase)
-    else:
-        phrase_str = None
+    response_data = {
+        "progress": UserProgressSerializer(user_progress).data,
+        "current_question": upcoming[0],
+    }
+    if prefetch:
+        response_data["prefetched_questions"] = upcoming
 
-    return Response(
-        {
-            "progress": UserProgressSerializer(user_progress).data,
-            "current_question": {
-                "id": first_question.id,
-                "question": first_question.japanese
-                if mode == "en"
-                else first_question.english,
-                "question_number": 1,
-                "total_questions": total_questions,
-                "part_of_speech": part_of_speech_str,
-                "phrase": phrase_str,
-            },
-        },
-        status=status.HTTP_201_CREATED,
-    )
+    return Response(response_data, status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
@@ -208,6 +236,18 @@ def submit_answer(request):
         "is_completed": false,
         "next_question": { ... } または null（完了時）
     }
+
+    クエリパラメータ:
+    - prefetch: 先読みする問題数（例: ?prefetch=5、最大20）
+      指定すると次の問題から K 問分を prefetched_questions で返す
+
+    - question_index (オプション): 回答する問題のインデックス
+      現在の問題と一致しない場合（二重送信など）は回答せずに 409 を返す
+
+    進行状況は問題インデックスを条件にした1回のUPDATEで進める（compare-and-set）。
+    同じ問題への回答が同時に届いた場合は一方だけが反映され、他方には 409 を返す。
+    question_index を省略した回答は、キャッシュのセッションが古くて進められなかった場合に
+    UserProgress から読み直して現在の問題で1回だけ判定し直す。
     """
     serializer = AnswerSubmitSerializer(data=request.data)
     if not serializer.is_valid():
@@ -215,16 +255,42 @@ def submit_answer(request):
 
     progress_id = serializer.validated_data["progress_id"]
     answer = serializer.validated_data["answer"].strip()
+    question_index = serializer.validated_data.get("question_index")
 
-    # 進行状況を取得
-    user_progress = get_object_or_404(
-        UserProgress, id=progress_id, user=request.user, is_completed=False
-    )
+    # 進行状況を取得（キャッシュに無ければ UserProgress から復元）
+    session = QuizSession.load(progress_id, request.user)
+
+    if question_index is not None and question_index != session.current_question_index:
+        # キャッシュのセッションが他のワーカーでの回答より古い可能性があるので読み直す
+        session = QuizSession.reload(progress_id, request.user)
+
+        # 回答済みの問題への再送は判定せずに返す
+        if question_index != session.current_question_index:
+            return stale_answer_response(session.current_question_index)
+
+    for attempt in range(2):
+        # 現在の問題を取得
+        current_question = get_object_or_404(
+            Word.objects.select_related("part_of_speech"), id=session.current_question_id
+        )
 
-    # 現在の問題を取得
-    questions = json.loads(user_progress.question_ids)
-    current_question_id = questions[user_progress.current_question_index]
-    current_question = get_object_or_404(Word, id=current_question_id)
+        # 正解を判定
+        is_correct, correct_answer = grade_answer(current_question, session.mode, answer)
+
+        with transaction.atomic():
+            # スコアを更新し、問題インデックスを進める（他の回答が先に反映されていれば失敗）
+            if session.advance(int(is_correct)):
+                # 回答イベントを追記（UserWordStatusへの反映はフラッシャーがまとめて行う）
+                append_answers(request.user, session.mode, [(current_question, is_correct)])
+                break
+
+        # question_index を指定した回答、または読み直した後も進められなければ 409
+        if question_index is not None or attempt:
+            return stale_answer_response(QuizSession.stored_question_index(progress_id))
+
+        # question_index なしの回答は、キャッシュのセッションが他のワーカーでの回答より
+        # 古かった可能性があるので、読み直した現在の問題で1回だけ判定し直す
+        session = QuizSession.reload(progress_id, request.user)
 
     # 品詞と成句を取得（文字列 or オブジェクトに対応）
     part_of_speech = current_question.part_of_speech
@@ -246,50 +312,17 @@ def submit_answer(request):
     else:
         phrase_str = None
 
-    # 正解を判定
-    if user_progress.mode == "en":
-        # 英訳モード
-        correct_answer = current_question.english
-        is_correct = answer == correct_answer
-    else:
-        # 和訳モード（複数の正解がカンマ区切りで存在する可能性）
-        correct_answers = [ans.strip() for ans in current_question.japanese.split(",")]
-        is_correct = answer in correct_answers
-        correct_answer = current_question.japanese
-
-    # スコアを更新
-    if is_correct:
-        user_progress.score += 1
-
-    # UserWordStatusを更新または作成
-    user_word_status, _ = UserWordStatus.objects.update_or_create(
-        user=request.user,
-        word=current_question,
-        mode=user_progress.mode,
-        defaults={"is_correct": is_correct},
-    )
-
-    # 問題インデックスを進める
-    user_progress.current_question_index += 1
-
-    # 完了判定
-    is_completed = user_progress.current_question_index >= user_progress.total_questions
-
-    if is_completed:
-        user_progress.is_completed = True
-        user_progress.is_paused = False
-        user_progress.save()
-
+    if session.is_completed:
         return Response(
             {
                 "is_correct": is_correct,
                 "correct_answer": correct_answer,
-                "score": user_progress.score,
-                "total_questions": user_progress.total_questions,
-                "current_question_index": user_progress.current_question_index,
+                "score": session.score,
+                "total_questions": session.total_questions,
+                "current_question_index": session.current_question_index,
                 "is_completed": True,
                 "correct_rate": round(
-                    user_progress.score / user_progress.total_questions * 100, 1
+                    session.score / session.total_questions * 100, 1
                 ),
                 "next_question": None,
                 # 品詞と成句も返す
@@ -299,32 +332,174 @@ def submit_answer(request):
         )
 
     else:
-        user_progress.save()
+        # 次の問題（と先読み分）を1クエリで取得
+        prefetch = get_prefetch_count(request)
+        upcoming = fetch_questions(
+            session.question_ids_between(
+                session.current_question_index, prefetch or 1
+            ),
+            session.current_question_index,
+            session.mode,
+            session.total_questions,
+        )
 
-        # 次の問題を取得
-        next_question_id = questions[user_progress.current_question_index]
-        next_question = Word.objects.get(id=next_question_id)
+        response_data = {
+            "is_correct": is_correct,
+            "correct_answer": correct_answer,
+            "score": session.score,
+            "current_question_index": session.current_question_index,
+            "is_completed": False,
+            # 品詞と成句も返す
+            "part_of_speech": part_of_speech_str,
+            "phrase": phrase_str,
+            "next_question": upcoming[0],
+        }
+        if prefetch:
+            response_data["prefetched_questions"] = upcoming
+
+        return Response(response_data)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def submit_answers_batch(request):
+    """
+    複数の回答をまとめて送信（オフライン時にためた回答の送信用）
 
+    POST /api/flashcard/quiz/answers/batch/
+    Body:
+    {
+        "progress_id": 123,
+        "answers": [
+            {"question_index": 5, "answer": "apple"},
+            {"question_index": 6, "answer": "りんご"}
+        ]
+    }
+
+    - 現在の問題インデックスより前の回答は送信済みとみなしてスキップする（再送対策）
+    - 残りの回答は現在の問題インデックスから連続している必要がある
+    - 回答数に関わらず、単語の取得・回答イベントの追記・進行状況の更新は各1クエリ
+    - 出題後に削除された単語への回答が含まれる場合は、どの回答も反映せず 404
+    - クエリパラメータ prefetch で次の問題から K 問分を先読みできる（submit_answerと同じ）
+    """
+    serializer = BatchAnswerSubmitSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    progress_id = serializer.validated_data["progress_id"]
+    answers = sorted(
+        serializer.validated_data["answers"], key=lambda item: item["question_index"]
+    )
+
+    # 進行状況を取得（キャッシュに無ければ UserProgress から復元）
+    session = QuizSession.load(progress_id, request.user)
+    ahead = [
+        item["question_index"]
+        for item in answers
+        if item["question_index"] >= session.current_question_index
+    ]
+    if ahead and ahead[0] != session.current_question_index:
+        # 現在の問題より先から始まる回答は、キャッシュのセッションが
+        # 他のワーカーでの回答より古い可能性があるので読み直す
+        session = QuizSession.reload(progress_id, request.user)
+    start_index = session.current_question_index
+
+    # 送信済みの回答を除外し、残りが連続しているか確認
+    skipped = [
+        item["question_index"]
+        for item in answers
+        if item["question_index"] < start_index
+    ]
+    pending = [item for item in answers if item["question_index"] >= start_index]
+
+    for offset, item in enumerate(pending):
+        if item["question_index"] != start_index + offset:
+            return Response(
+                {
+                    "error": "回答の問題番号が連続していません",
+                    "current_question_index": start_index,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    if start_index + len(pending) > session.total_questions:
         return Response(
+            {"error": "問題数を超える回答が含まれています"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # 対象の単語を1クエリで取得
+    word_ids = session.question_ids_between(start_index, len(pending))
+    words = Word.objects.in_bulk(word_ids)
+    if len(words) != len(set(word_ids)):
+        # 出題後に削除された単語への回答は反映しない（submit_answer と同じく 404）
+        return Response(
+            {
+                "error": "削除された単語への回答が含まれています",
+                "current_question_index": start_index,
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    results = []
+    answered = []
+    correct_count = 0
+    for item, word_id in zip(pending, word_ids):
+        word = words[word_id]
+        is_correct, correct_answer = grade_answer(
+            word, session.mode, item["answer"].strip()
+        )
+        correct_count += is_correct
+
+        results.append(
             {
+                "question_index": item["question_index"],
+                "word_id": word_id,
                 "is_correct": is_correct,
                 "correct_answer": correct_answer,
-                "score": user_progress.score,
-                "current_question_index": user_progress.current_question_index,
-                "is_completed": False,
-                # 品詞と成句も返す
-                "part_of_speech": part_of_speech_str,
-                "phrase": phrase_str,
-                "next_question": {
-                    "id": next_question.id,
-                    "question": next_question.japanese
-                    if user_progress.mode == "en"
-                    else next_question.english,
-                    "question_number": user_progress.current_question_index + 1,
-                    "total_questions": user_progress.total_questions,
-                },
             }
         )
+        answered.append((word, is_correct))
+
+    if pending:
+        with transaction.atomic():
+            # スコアと問題インデックスを1回の条件付きUPDATEで反映
+            # （同じ進行状況への回答が先に反映されていれば 409）
+            if not session.advance(correct_count, len(pending)):
+                return stale_answer_response(QuizSession.stored_question_index(progress_id))
+
+            # 回答イベントを一括追記（UserWordStatusへの反映はフラッシャーがまとめて行う）
+            append_answers(request.user, session.mode, answered)
+
+    response_data = {
+        "results": results,
+        "skipped": skipped,
+        "score": session.score,
+        "total_questions": session.total_questions,
+        "current_question_index": session.current_question_index,
+        "is_completed": session.is_completed,
+        "next_question": None,
+    }
+
+    if session.is_completed:
+        response_data["correct_rate"] = round(
+            session.score / session.total_questions * 100, 1
+        )
+    else:
+        prefetch = get_prefetch_count(request)
+        upcoming = fetch_questions(
+            session.question_ids_between(
+                session.current_question_index, prefetch or 1
+            ),
+            session.current_question_index,
+            session.mode,
+            session.total_questions,
+        )
+        response_data["next_question"] = upcoming[0]
+        if prefetch:
+            response_data["prefetched_questions"] = upcoming
+
+    return Response(response_data)
 
 
 @api_view(["POST"])
@@ -335,12 +510,15 @@ def pause_quiz(request, progress_id):
 
     POST /api/flashcard/progress/<id>/pause/
     """
+    # スコアと問題インデックスは回答ごとに保存済みなので、中断フラグのみ更新
     user_progress = get_object_or_404(
-        UserProgress, id=progress_id, user=request.user, is_completed=False
+        UserProgress.objects.select_related("level"),
+        id=progress_id,
+        user=request.user,
+        is_completed=False,
     )
-
     user_progress.is_paused = True
-    user_progress.save()
+    user_progress.save(update_fields=["is_paused"])
 
     return Response(
         {
@@ -357,6 +535,9 @@ def resume_quiz(request, progress_id):
     クイズを再開
 
     POST /api/flashcard/progress/<id>/resume/
+
+    クエリパラメータ:
+    - prefetch: 先読みする問題数（例: ?prefetch=5、最大20）
     """
     user_progress = get_object_or_404(
         UserProgress,
@@ -367,48 +548,29 @@ def resume_quiz(request, progress_id):
     )
 
     user_progress.is_paused = False
-    user_progress.save()
-
-    # 現在の問題を取得
-    questions = json.loads(user_progress.question_ids)
-    current_question_id = questions[user_progress.current_question_index]
-    current_question = Word.objects.get(id=current_question_id)
-
-    # 品詞と成句を取得（文字列 or オブジェクトに対応）
-    part_of_speech = current_question.part_of_speech
-    phrase = current_question.phrase
-
-    # part_of_speechが文字列かオブジェクトか判定
-    if part_of_speech:
-        part_of_speech_str = (
-            part_of_speech.name
-            if hasattr(part_of_speech, "name")
-            else str(part_of_speech)
-        )
-    else:
-        part_of_speech_str = None
+    user_progress.save(update_fields=["is_paused"])
+
+    # 中断時に進行状況は書き込み済みなので、UserProgress からセッションを作り直す
+    session = QuizSession.from_progress(user_progress)
+    session.save()
+
+    # 現在の問題（と先読み分）を1クエリで取得
+    prefetch = get_prefetch_count(request)
+    upcoming = fetch_questions(
+        session.question_ids_between(session.current_question_index, prefetch or 1),
+        session.current_question_index,
+        session.mode,
+        session.total_questions,
+    )
 
-    # phraseが文字列かオブジェクトか判定
-    if phrase:
-        phrase_str = phrase.name if hasattr(phrase, "name") else str(phrase)
-    else:
-        phrase_str = None
+    response_data = {
+        "progress": UserProgressSerializer(user_progress).data,
+        "current_question": upcoming[0],
+    }
+    if prefetch:
+        response_data["prefetched_questions"] = upcoming
 
-    return Response(
-        {
-            "progress": UserProgressSerializer(user_progress).data,
-            "current_question": {
-                "id": current_question.id,
-                "question": current_question.japanese
-                if user_progress.mode == "en"
-                else current_question.english,
-                "question_number": user_progress.current_question_index + 1,
-                "total_questions": user_progress.total_questions,
-                "part_of_speech": part_of_speech_str,
-                "phrase": phrase_str,
-            },
-        }
-    )
+    return Response(response_data)
 
 
 @api_view(["DELETE"])
@@ -424,6 +586,7 @@ def delete_progress(request, progress_id):
     user_progress.is_completed = True
     user_progress.is_paused = False
     user_progress.save()
+    QuizSession.discard(progress_id)
 
     return Response(
         {"message": "進行状況を削除しました"}, status=status.HTTP_204_NO_CONTENT
@@ -437,54 +600,11 @@ def get_statistics(request):
     ユーザーの学習統計を取得
 
     GET /api/flashcard/statistics/
-    """
-    # 全ての正誤履歴を取得
-    word_statuses = UserWordStatus.objects.filter(user=request.user)
-
-    total_attempted = word_statuses.count()
-    total_correct = word_statuses.filter(is_correct=True).count()
-    total_incorrect = word_statuses.filter(is_correct=False).count()
-
-    correct_rate = (
-        round(total_correct / total_attempted * 100, 1) if total_attempted > 0 else 0.0
-    )
 
-    # レベル別統計
-    by_level = []
-    levels = Level.objects.all()
-    for level in levels:
-        level_statuses = word_statuses.filter(word__level=level)
-        level_total = level_statuses.count()
-
-        if level_total > 0:
-            level_correct = level_statuses.filter(is_correct=True).count()
-            level_rate = round(level_correct / level_total * 100, 1)
-
-            by_level.append(
-                {
-                    "level_id": level.id,
-                    "level_name": level.name,
-                    "correct": level_correct,
-                    "total": level_total,
-                    "rate": level_rate,
-                }
-            )
-
-    # モード別統計
-    by_mode = {}
-    for mode in ["en", "jp"]:
-        mode_statuses = word_statuses.filter(mode=mode)
-        mode_total = mode_statuses.count()
-
-        if mode_total > 0:
-            mode_correct = mode_statuses.filter(is_correct=True).count()
-            mode_rate = round(mode_correct / mode_total * 100, 1)
-
-            by_mode[mode] = {
-                "correct": mode_correct,
-                "total": mode_total,
-                "rate": mode_rate,
-            }
+    正誤の集計1クエリと最近の学習履歴1クエリの計2クエリ（難易度の数に依存しない）
+    """
+    # 難易度・モードごとの正誤を1クエリで集計し、全体・難易度別・モード別にまとめる
+    statistics = summarize_statistics(statistics_cells(request.user))
 
     # 最近の学習履歴
     recent_progress_qs = (
@@ -511,26 +631,25 @@ def get_statistics(request):
             }
         )
 
-    return Response(
-        {
-            "total_words_attempted": total_attempted,
-            "total_correct": total_correct,
-            "total_incorrect": total_incorrect,
-            "correct_rate": correct_rate,
-            "by_level": by_level,
-            "by_mode": by_mode,
-            "recent_progress": recent_progress,
-        }
-    )
+    return Response({**statistics, "recent_progress": recent_progress})
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_incorrect_words(request):
     """
-    間違えた単語の一覧を取得
+    間違えた単語の一覧を新しい順に取得
+
+    GET /api/flashcard/incorrect-words/?mode=en&level=1&limit=50&cursor=...
 
-    GET /api/flashcard/incorrect-words/?mode=en&level=1
+    クエリパラメータ:
+    - mode, level (オプション): 絞り込み
+    - limit (オプション): 1ページの件数（デフォルト50、最大200）
+    - cursor (オプション): 前のレスポンスの next_cursor
+    - stream (オプション): 1 を指定すると全件を NDJSON（1行1件）で逐次返す
+
+    (最終回答日時, id) のキーセットでページングするため、
+    ページの深さや履歴の件数に関わらず一定のコストで返す（総件数は返さない）
     """
     queryset = UserWordStatus.objects.filter(
         user=request.user, is_correct=False
@@ -544,7 +663,88 @@ def get_incorrect_words(request):
     # レベルでフィルタ
     level = request.query_params.get("level")
     if level:
+        if not level.isdigit():
+            return Response(
+                {"error": "level は数値で指定してください"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         queryset = queryset.filter(word__level_id=level)
 
-    serializer = UserWordStatusSerializer(queryset, many=True)
-    return Response({"count": queryset.count(), "results": serializer.data})
+    if request.query_params.get("stream") in ("1", "true"):
+        return stream_incorrect_words(queryset)
+
+    paginator = IncorrectWordPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = UserWordStatusSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+class IncorrectWordPagination(KeysetPagination):
+    """間違えた単語の一覧を最終回答日時の新しい順にページング"""
+
+    ordering = ("-last_attempted_at", "-id")
+
+
+# ストリーミング時に DB から一度に読み込む行数
+INCORRECT_WORDS_STREAM_CHUNK = 500
+
+
+def stream_incorrect_words(queryset):
+    """
+    間違えた単語を NDJSON で逐次返す
+
+    iterator() でチャンクごとに読み込むため、件数が多くてもメモリ使用量は一定
+    """
+    queryset = queryset.order_by("-last_attempted_at", "-id")
+
+    def rows():
+        for status_obj in queryset.iterator(chunk_size=INCORRECT_WORDS_STREAM_CHUNK):
+            data = UserWordStatusSerializer(status_obj).data
+            yield json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+    return StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+
+
+# 復習キューで一度に返せる単語数の上限
+MAX_DUE_CARDS = 100
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_due_cards(request):
+    """
+    復習時期の来た単語を期限の古い順に取得
+
+    GET /api/flashcard/review/due/?mode=en&limit=20
+
+    クエリパラメータ:
+    - mode (必須): en（英訳）または jp（和訳）
+    - limit (オプション): 取得する単語数（デフォルト20、最大100）
+
+    (user, mode, due_at) のインデックスの範囲検索で先頭 limit 件だけを読むため、
+    復習履歴の件数に関わらず一定のコストで返す
+    """
+    mode = request.query_params.get("mode")
+    if mode not in ("en", "jp"):
+        return Response(
+            {"error": "modeにはenまたはjpを指定してください"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 20)), MAX_DUE_CARDS))
+    except ValueError:
+        return Response(
+            {"error": "limitは数値で指定してください"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # limit + 1 件を取得して続きの有無を判定する（件数の集計はしない）
+    cards = list(
+        due_queryset(request.user, mode).select_related(
+            "word", "word__level", "word__part_of_speech"
+        )[: limit + 1]
+    )
+
+    serializer = UserWordStatusSerializer(cards[:limit], many=True)
+    return Response({"has_more": len(cards) > limit, "results": serializer.data})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FlashcardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flashcard'
+
+    def ready(self):
+        from . import checks  # noqa: F401
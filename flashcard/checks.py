@@ -0,0 +1,17 @@
+# flashcard/checks.py
+
+from django.core import checks
+
+from wordbook.checks import check_shared_cache_alias
+
+
+@checks.register(checks.Tags.caches)
+def check_quiz_session_cache(app_configs, **kwargs):
+    """クイズセッションが全ワーカーで共有されるキャッシュに保存されるか"""
+    return check_shared_cache_alias(
+        "QUIZ_SESSION_CACHE_ALIAS",
+        "default",
+        "flashcard.W001",
+        "ワーカーごとにセッションが分かれ、他のワーカーで進んだクイズが古い位置のまま返されます。"
+        "CACHES に DB/Redis などの共有バックエンドを設定してください。",
+    )
@@ -0,0 +1,91 @@
+# flashcard/grading.py
+
+import unicodedata
+
+from dictionary.indexes import InMemoryIndex
+from dictionary.models import Word
+
+
+def normalize_answer(text):
+    """
+    回答・正解を比較用に正規化
+    （NFKCで全角英数字・半角カナなどを統一し、空白の連続を1つにまとめる）
+    """
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def compile_answers(english, japanese):
+    """
+    単語の正解集合を (英訳モード, 和訳モード) の frozenset で返す
+    和訳の正解は複数ある場合カンマ区切り（全角カンマも含む）
+    """
+    japanese_answers = frozenset(
+        answer
+        for answer in (
+            normalize_answer(candidate)
+            for candidate in unicodedata.normalize("NFKC", japanese or "").split(",")
+        )
+        if answer
+    )
+    return frozenset([normalize_answer(english)]), japanese_answers
+
+
+class AnswerTable(InMemoryIndex):
+    """
+    単語IDごとの正規化済み正解集合
+
+    回答のたびに Word.japanese を分割・正規化せず、集合の検索だけで判定する。
+    単語の追加・更新・削除はシグナル経由で差分反映する。
+    """
+
+    incremental = True
+
+    def build(self):
+        rows = Word.objects.values_list("id", "english", "japanese")
+        return {
+            word_id: compile_answers(english, japanese)
+            for word_id, english, japanese in rows.iterator(chunk_size=5000)
+        }
+
+    def answers(self, word):
+        table = self.data
+        answers = table.get(word.id)
+        if answers is None:
+            # 他のワーカーで追加された単語など（次回の再構築までここで補う）
+            answers = table[word.id] = compile_answers(word.english, word.japanese)
+        return answers
+
+    def on_word_saved(self, word, created):
+        table = self._data
+        if table is not None:
+            table[word.id] = compile_answers(word.english, word.japanese)
+
+    def on_word_deleted(self, word):
+        table = self._data
+        if table is not None:
+            table.pop(word.id, None)
+
+
+answer_table = AnswerTable()
+
+
+def grade_answer(word, mode, answer):
+    """
+    回答の正誤を判定（HTML・APIの両方で使用）
+
+    Args:
+        word (Word): 出題した単語
+        mode (str): "en"（英訳）または "jp"（和訳）
+        answer (str): ユーザーの回答
+
+    Returns:
+        tuple: (is_correct, correct_answer)
+    """
+    english_answers, japanese_answers = answer_table.answers(word)
+
+    if mode == "en":
+        # 英訳モード
+        return normalize_answer(answer) in english_answers, word.english
+
+    # 和訳モード（複数の正解がカンマ区切りで存在する可能性）
+    return normalize_answer(answer) in japanese_answers, word.japanese
@@ -0,0 +1,108 @@
+# flashcard/management/commands/benchmark_answer_log.py
+# 回答ごとに UserWordStatus を更新する場合と、回答イベントを追記してまとめて反映する場合の
+# 書き込みクエリ数（write QPS）と回答スループットを比較するコマンド
+# 計測用のデータはすべてロールバックする
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from accounts.models import CustomUser
+from dictionary.models import Word
+from flashcard.answer_log import append_answers, flush_answer_events
+from flashcard.scheduler import apply_answers
+import random
+import time
+import uuid
+
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE")
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "回答ごとの同期書き込みと回答イベントのまとめ書き込みの write QPS を比較"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--answers", type=int, default=5000, help="回答数")
+        parser.add_argument("--users", type=int, default=20, help="回答するユーザー数")
+        parser.add_argument(
+            "--batch-sizes",
+            type=int,
+            nargs="+",
+            default=[50, 500],
+            help="計測するフラッシュ1回あたりの件数（複数指定可）",
+        )
+
+    def handle(self, *args, **options):
+        word_ids = list(Word.objects.values_list("id", flat=True))
+        if not word_ids:
+            raise CommandError("単語が1件もありません")
+
+        self.stdout.write(self.style.WARNING("\n=== 回答イベントログ ベンチマーク ===\n"))
+        self.stdout.write(
+            f"回答数: {options['answers']}  ユーザー数: {options['users']}  単語数: {len(word_ids)}\n"
+        )
+        self.stdout.write(
+            "writes: INSERT/UPDATE/DELETE の総数 / status: そのうち user_word_status への書き込み\n"
+        )
+        self.stdout.write(
+            f"{'strategy':<16}{'answers/s':>12}{'writes':>10}{'status':>10}"
+            f"{'writes/ans':>12}{'write QPS':>12}"
+        )
+
+        # バックグラウンドのフラッシャーは止め、フラッシュはこのコマンドから明示的に行う
+        with override_settings(ANSWER_LOG_BACKGROUND_FLUSH=False):
+            self._run("sync", word_ids, options, None)
+            for batch_size in options["batch_sizes"]:
+                self._run(f"log/{batch_size}", word_ids, options, batch_size)
+
+    def _run(self, label, word_ids, options, batch_size):
+        try:
+            with transaction.atomic():
+                users = [
+                    CustomUser.objects.create(
+                        username=f"bench-{uuid.uuid4().hex[:12]}",
+                        email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+                    )
+                    for _ in range(options["users"])
+                ]
+                words = Word.objects.in_bulk(word_ids)
+                answers = [
+                    (random.choice(users), words[random.choice(word_ids)], random.random() < 0.7)
+                    for _ in range(options["answers"])
+                ]
+
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for i, (user, word, is_correct) in enumerate(answers, 1):
+                        if batch_size is None:
+                            # 従来: 回答ごとに UserWordStatus を更新
+                            apply_answers(
+                                [(user.id, word.id, "en", is_correct, timezone.now())]
+                            )
+                        else:
+                            append_answers(user, "en", [(word, is_correct)])
+                            if i % batch_size == 0:
+                                flush_answer_events(batch_size)
+                    if batch_size is not None:
+                        while flush_answer_events(batch_size):
+                            pass
+                    elapsed = time.perf_counter() - start
+
+                writes = [
+                    query["sql"]
+                    for query in queries.captured_queries
+                    if query["sql"].lstrip().upper().startswith(WRITE_PREFIXES)
+                ]
+                status_writes = sum(1 for sql in writes if '"user_word_status"' in sql)
+                count = len(answers)
+                self.stdout.write(
+                    f"{label:<16}{count / elapsed:>12.0f}{len(writes):>10}{status_writes:>10}"
+                    f"{len(writes) / count:>12.2f}{len(writes) / elapsed:>12.0f}"
+                )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,97 @@
+# flashcard/management/commands/benchmark_grading.py
+# 辞書全体に対して、従来の文字列分割による判定と正解集合テーブルによる判定を比較するコマンド
+
+from django.core.management.base import BaseCommand, CommandError
+from dictionary.models import Word
+from flashcard.grading import answer_table, grade_answer, normalize_answer
+import random
+import time
+
+
+def legacy_grade_answer(word, mode, answer):
+    """従来の判定（リクエストごとに Word.japanese を分割して完全一致で比較）"""
+    if mode == "en":
+        return answer == word.english
+    return answer in [ans.strip() for ans in word.japanese.split(",")]
+
+
+def split_grade_answer(word, mode, answer):
+    """テーブルを使わずにリクエストごとに正解を分割・正規化して判定"""
+    answer = normalize_answer(answer)
+    if mode == "en":
+        return answer == normalize_answer(word.english)
+    return answer in [normalize_answer(ans) for ans in word.japanese.split(",")]
+
+
+def to_fullwidth(text):
+    """英数字・記号を全角に変換（全角入力のシミュレーション）"""
+    return "".join(
+        chr(ord(char) + 0xFEE0) if "!" <= char <= "~" else char for char in text
+    )
+
+
+class Command(BaseCommand):
+    help = "辞書全体で回答判定（従来の分割方式 / 正解集合テーブル）のコストと判定結果を比較"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rounds", type=int, default=3, help="辞書全体を判定する回数"
+        )
+
+    def handle(self, *args, **options):
+        words = list(Word.objects.all())
+        if not words:
+            raise CommandError("単語が1件もありません")
+
+        # 正解そのもの・全角入力・余分な空白入り・不正解の4種類の回答を用意
+        cases = []
+        for word in words:
+            for mode, correct in (
+                ("en", word.english),
+                ("jp", random.choice(word.japanese.split(","))),
+            ):
+                cases.append((word, mode, correct.strip()))
+                cases.append((word, mode, to_fullwidth(correct.strip())))
+                cases.append((word, mode, f" {correct.strip()}  "))
+                cases.append((word, mode, correct.strip() + "x"))
+
+        self.stdout.write(self.style.WARNING("\n=== 回答判定ベンチマーク ===\n"))
+        self.stdout.write(
+            "legacy: 従来の判定（正規化なし） / split: 毎回分割・正規化 / table: 正解集合テーブル"
+        )
+        self.stdout.write(f"単語数: {len(words)}  判定数: {len(cases)} × {options['rounds']}回\n")
+
+        answer_table.invalidate()
+        start = time.perf_counter()
+        answer_table.data
+        self.stdout.write(f"正解集合テーブルの構築: {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+        for label, grade in (
+            ("legacy", legacy_grade_answer),
+            ("split", split_grade_answer),
+            ("table", lambda word, mode, answer: grade_answer(word, mode, answer)[0]),
+        ):
+            start = time.perf_counter()
+            for _ in range(options["rounds"]):
+                for word, mode, answer in cases:
+                    grade(word, mode, answer)
+            elapsed = time.perf_counter() - start
+            per_answer = elapsed / (len(cases) * options["rounds"])
+            self.stdout.write(f"{label:<8}{per_answer * 1e6:>10.2f} µs/answer")
+
+        # 判定結果の違い（全角・空白入りの回答が正解になった件数など）
+        newly_correct = sum(
+            1
+            for word, mode, answer in cases
+            if grade_answer(word, mode, answer)[0]
+            and not legacy_grade_answer(word, mode, answer)
+        )
+        newly_incorrect = sum(
+            1
+            for word, mode, answer in cases
+            if not grade_answer(word, mode, answer)[0]
+            and legacy_grade_answer(word, mode, answer)
+        )
+        self.stdout.write(
+            f"\n従来は不正解 → 正解: {newly_correct}件  従来は正解 → 不正解: {newly_incorrect}件"
+        )
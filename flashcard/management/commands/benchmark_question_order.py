@@ -0,0 +1,58 @@
+# flashcard/management/commands/benchmark_question_order.py
+# 出題順の保存形式（JSON文字列 / パック配列）の行サイズと1回答あたりの読み出しコストを比較するコマンド
+
+from django.core.management.base import BaseCommand
+from flashcard.question_order import pack_question_ids, question_id_at
+import json
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = "出題順の保存形式ごとの行サイズと1回答あたりの読み出しコストを比較"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000, 50000],
+            help="計測するレベルの単語数（複数指定可）",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=1000, help="読み出しの計測回数"
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        self.stdout.write(self.style.WARNING("\n=== 出題順の保存形式ベンチマーク ===\n"))
+        self.stdout.write(
+            f"{'words':>8}{'json bytes':>14}{'packed bytes':>14}"
+            f"{'json µs/ans':>14}{'packed µs/ans':>15}"
+        )
+
+        for size in options["sizes"]:
+            # 実際のIDに近い値（数万〜数十万）をランダムな順番で並べる
+            ids = random.sample(range(100000, 100000 + size * 10), size)
+
+            # 従来: json.dumps したリストを JSONField に保存（二重エンコード）
+            json_row = json.dumps(json.dumps(ids))
+            packed_row = pack_question_ids(ids)
+
+            indexes = [random.randrange(size) for _ in range(iterations)]
+
+            start = time.perf_counter()
+            for index in indexes:
+                json.loads(json.loads(json_row))[index]
+            json_cost = (time.perf_counter() - start) / iterations
+
+            start = time.perf_counter()
+            for index in indexes:
+                question_id_at(packed_row, index)
+            packed_cost = (time.perf_counter() - start) / iterations
+
+            self.stdout.write(
+                f"{size:>8}{len(json_row.encode()):>14}{len(packed_row):>14}"
+                f"{json_cost * 1e6:>14.1f}{packed_cost * 1e6:>15.2f}"
+            )
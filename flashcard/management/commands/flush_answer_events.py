@@ -0,0 +1,46 @@
+# flashcard/management/commands/flush_answer_events.py
+# 未反映の回答イベントを UserWordStatus に反映するコマンド（専用ワーカー・cron 用）
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from flashcard.answer_log import flush_answer_events
+import time
+
+
+class Command(BaseCommand):
+    help = "未反映の回答イベントを UserWordStatus に反映"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="1回に反映する最大件数（デフォルトは ANSWER_LOG_BATCH_SIZE）",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="ANSWER_LOG_FLUSH_INTERVAL ごとに反映し続ける",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"] or getattr(settings, "ANSWER_LOG_BATCH_SIZE", 500)
+        interval = getattr(settings, "ANSWER_LOG_FLUSH_INTERVAL", 2.0)
+
+        while True:
+            total = 0
+            while True:
+                flushed = flush_answer_events(batch_size)
+                total += flushed
+                if flushed < batch_size:
+                    break
+
+            if total:
+                self.stdout.write(f"{total}件の回答イベントを反映しました")
+
+            if not options["loop"]:
+                break
+
+            connection.close()
+            time.sleep(interval)
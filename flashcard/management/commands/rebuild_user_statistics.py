@@ -0,0 +1,23 @@
+# flashcard/management/commands/rebuild_user_statistics.py
+# UserWordStatus から集計テーブル（UserStatistics）を作り直すコマンド
+
+from django.core.management.base import BaseCommand
+from flashcard.answer_log import flush_answer_events
+from flashcard.stats import rebuild_user_statistics
+
+
+class Command(BaseCommand):
+    help = "UserWordStatus から難易度・モードごとの集計テーブルを作り直す"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, nargs="+", dest="user_ids", help="対象のユーザーID（複数指定可）"
+        )
+
+    def handle(self, *args, **options):
+        # 未反映の回答イベントを先に反映しておく
+        while flush_answer_events():
+            pass
+
+        count = rebuild_user_statistics(options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"{count}件の集計を作成しました"))
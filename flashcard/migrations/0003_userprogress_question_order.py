@@ -0,0 +1,70 @@
+# 出題順を JSON の文字列から4バイト整数のパック配列に変換する
+
+import json
+import struct
+
+from django.db import migrations, models
+
+
+def pack_question_ids(apps, schema_editor):
+    UserProgress = apps.get_model("flashcard", "UserProgress")
+
+    batch = []
+    for progress in UserProgress.objects.only("id", "question_ids").iterator(
+        chunk_size=500
+    ):
+        question_ids = progress.question_ids
+        # json.dumps したリストが JSONField に入っている（二重エンコード）
+        while isinstance(question_ids, str):
+            question_ids = json.loads(question_ids)
+        question_ids = question_ids or []
+
+        progress.question_order = struct.pack(f"<{len(question_ids)}I", *question_ids)
+        batch.append(progress)
+
+        if len(batch) >= 500:
+            UserProgress.objects.bulk_update(batch, ["question_order"])
+            batch = []
+
+    if batch:
+        UserProgress.objects.bulk_update(batch, ["question_order"])
+
+
+def unpack_question_ids(apps, schema_editor):
+    UserProgress = apps.get_model("flashcard", "UserProgress")
+
+    batch = []
+    for progress in UserProgress.objects.only("id", "question_order").iterator(
+        chunk_size=500
+    ):
+        order = bytes(progress.question_order or b"")
+        question_ids = list(struct.unpack(f"<{len(order) // 4}I", order))
+        progress.question_ids = json.dumps(question_ids)
+        batch.append(progress)
+
+        if len(batch) >= 500:
+            UserProgress.objects.bulk_update(batch, ["question_ids"])
+            batch = []
+
+    if batch:
+        UserProgress.objects.bulk_update(batch, ["question_ids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flashcard", "0002_alter_userprogress_question_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprogress",
+            name="question_order",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(pack_question_ids, unpack_question_ids),
+        migrations.RemoveField(
+            model_name="userprogress",
+            name="question_ids",
+        ),
+    ]
@@ -0,0 +1,59 @@
+# 単語ごとの復習スケジュール（SM-2）と復習キュー用のインデックスを追加する
+# 既存の記録は、不正解なら最終回答日時から即復習対象、正解なら1日後を期限とする
+
+from datetime import timedelta
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def schedule_existing_statuses(apps, schema_editor):
+    UserWordStatus = apps.get_model("flashcard", "UserWordStatus")
+
+    UserWordStatus.objects.filter(is_correct=False).update(
+        due_at=F("last_attempted_at")
+    )
+    UserWordStatus.objects.filter(is_correct=True).update(
+        due_at=F("last_attempted_at") + timedelta(days=1),
+        interval=1,
+        repetitions=1,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0003_alter_word_english_alter_word_japanese_and_more'),
+        ('flashcard', '0003_userprogress_question_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userwordstatus',
+            name='due_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='userwordstatus',
+            name='ease',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='userwordstatus',
+            name='interval',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userwordstatus',
+            name='repetitions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(schedule_existing_statuses, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userwordstatus',
+            index=models.Index(fields=['user', 'mode', 'due_at'], name='uws_user_mode_due_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 18:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0003_alter_word_english_alter_word_japanese_and_more'),
+        ('flashcard', '0004_userwordstatus_schedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(max_length=10)),
+                ('is_correct', models.BooleanField()),
+                ('answered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dictionary.word')),
+            ],
+            options={
+                'verbose_name': '回答イベント',
+                'verbose_name_plural': '回答イベント',
+                'db_table': 'answer_event',
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# 復習対象の問題を ManyToMany から4バイト整数のパック配列（出題順）に変換する
+# 出題順は中間テーブルへの登録順（id順）とする
+
+import struct
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def pack_review_questions(apps, schema_editor):
+    UserReviewProgress = apps.get_model("flashcard", "UserReviewProgress")
+    Through = UserReviewProgress.questions.through
+
+    question_ids = defaultdict(list)
+    for progress_id, word_id in (
+        Through.objects.order_by("id")
+        .values_list("userreviewprogress_id", "word_id")
+        .iterator(chunk_size=5000)
+    ):
+        question_ids[progress_id].append(word_id)
+
+    batch = []
+    for progress in UserReviewProgress.objects.only("id").iterator(chunk_size=500):
+        ids = question_ids.get(progress.id, [])
+        progress.question_order = struct.pack(f"<{len(ids)}I", *ids)
+        batch.append(progress)
+
+        if len(batch) >= 500:
+            UserReviewProgress.objects.bulk_update(batch, ["question_order"])
+            batch = []
+
+    if batch:
+        UserReviewProgress.objects.bulk_update(batch, ["question_order"])
+
+
+def unpack_review_questions(apps, schema_editor):
+    UserReviewProgress = apps.get_model("flashcard", "UserReviewProgress")
+    Through = UserReviewProgress.questions.through
+
+    rows = []
+    for progress in UserReviewProgress.objects.only("id", "question_order").iterator(
+        chunk_size=500
+    ):
+        order = bytes(progress.question_order or b"")
+        for word_id in struct.unpack(f"<{len(order) // 4}I", order):
+            rows.append(Through(userreviewprogress_id=progress.id, word_id=word_id))
+
+    Through.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flashcard", "0005_answerevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userreviewprogress",
+            name="question_order",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(pack_review_questions, unpack_review_questions),
+        migrations.RemoveField(
+            model_name="userreviewprogress",
+            name="questions",
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 18:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0003_alter_word_english_alter_word_japanese_and_more'),
+        ('flashcard', '0006_userreviewprogress_question_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(max_length=10)),
+                ('attempted', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dictionary.level')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'ユーザー統計',
+                'verbose_name_plural': 'ユーザー統計',
+                'db_table': 'user_statistics',
+                'unique_together': {('user', 'level', 'mode')},
+            },
+        ),
+    ]
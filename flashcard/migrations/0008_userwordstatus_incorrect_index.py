@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-17 18:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dictionary', '0003_alter_word_english_alter_word_japanese_and_more'),
+        ('flashcard', '0007_userstatistics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userwordstatus',
+            index=models.Index(fields=['user', 'is_correct', 'last_attempted_at', 'id'], name='uws_user_incorrect_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 19:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcard', '0008_userwordstatus_incorrect_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userwordstatus',
+            name='last_attempted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
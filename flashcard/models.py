@@ -1,18 +1,35 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import CustomUser
 from dictionary.models import Word
 from dictionary.models import Level
-from django.db.models import JSONField
+from .question_order import pack_question_ids, question_id_at, unpack_question_ids
+
+# 出題順（question_order フィールド）を扱うメソッド
+class QuestionOrderMixin:
+    @property
+    def question_ids(self):
+        """出題順の問題IDリスト"""
+        return unpack_question_ids(self.question_order)
+
+    @question_ids.setter
+    def question_ids(self, ids):
+        self.question_order = pack_question_ids(ids)
+
+    def question_id_at(self, index):
+        """index 番目の問題IDを取得（リスト全体をデコードしない）"""
+        return question_id_at(self.question_order, index)
+
 
 # 通常モードとテストモードの進行状況
-class UserProgress(models.Model):
+class UserProgress(QuestionOrderMixin, models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE) # ユーザー
     level = models.ForeignKey(Level, on_delete=models.CASCADE) # 対象のレベル
     mode = models.CharField(max_length=10) # モード
     score = models.IntegerField(default=0) # スコア（正解数）
     total_questions = models.IntegerField(default=0) # 問題数のトータル
     current_question_index = models.IntegerField(default=0) # 現在の問題インデックス
-    question_ids = JSONField(blank=True, null=True) # 出題された問題のIDリストをシリアライズして保存
+    question_order = models.BinaryField(blank=True, null=True) # 出題する問題のIDを出題順に4バイト整数でパックして保存
     completed_at = models.DateTimeField(auto_now_add=True) # 完了日時
     is_completed = models.BooleanField(default=False) # 完了しているかどうか
     is_paused = models.BooleanField(default=False) # 中断データがあるか
@@ -25,6 +42,31 @@ class UserProgress(models.Model):
     def __str__(self):
         return self.user.username
 
+    @classmethod
+    def compare_and_advance(cls, progress_id, index, total_questions, correct=1, answered=1):
+        """
+        問題インデックスが index のままの場合のみ、スコアと問題インデックスを進める
+
+        UPDATE ... SET score = score + correct, current_question_index = index + answered
+        WHERE id = progress_id AND current_question_index = index の1クエリで行うため、
+        同じ問題への同時回答はどちらか一方だけが反映される。
+
+        Returns:
+            bool: 更新できた場合 True（他の回答が先に反映されていた場合 False）
+        """
+        fields = {
+            "score": models.F("score") + correct,
+            "current_question_index": index + answered,
+        }
+        if index + answered >= total_questions:
+            fields.update(is_completed=True, is_paused=False)
+
+        return bool(
+            cls.objects.filter(
+                id=progress_id, current_question_index=index, is_completed=False
+            ).update(**fields)
+        )
+
 
 # 単語ごとの正誤履歴
 class UserWordStatus(models.Model):
@@ -32,18 +74,58 @@ class UserWordStatus(models.Model):
     word = models.ForeignKey(Word, on_delete=models.CASCADE)  # 問題（単語）
     is_correct = models.BooleanField(default=False)  # 正誤データ
     mode = models.CharField(max_length=10)  # モード（英訳か和訳か）
-    last_attempted_at = models.DateTimeField(auto_now=True)  # 最後に回答した日時
+    last_attempted_at = models.DateTimeField(default=timezone.now)  # 最後に回答した日時（回答イベントの回答日時）
+    # 復習スケジュール（SM-2、flashcard/scheduler.py）
+    interval = models.PositiveIntegerField(default=0)  # 復習間隔（日）
+    ease = models.FloatField(default=2.5)  # 易しさ係数
+    repetitions = models.PositiveIntegerField(default=0)  # 連続正解数
+    due_at = models.DateTimeField(default=timezone.now)  # 次に復習する日時
 
     class Meta:
         unique_together = ('user', 'word', 'mode')  # ユーザー、単語、モードの組み合わせを一意にする
+        indexes = [
+            # 復習キュー（期限の来た単語）をインデックスの範囲検索で取得する
+            models.Index(fields=['user', 'mode', 'due_at'], name='uws_user_mode_due_idx'),
+            # 間違えた単語の一覧を (最終回答日時, id) のキーセットで新しい順にページングする
+            models.Index(fields=['user', 'is_correct', 'last_attempted_at', 'id'], name='uws_user_incorrect_idx'),
+        ]
         db_table = 'user_word_status'
         verbose_name = '正解ステータス情報'
         verbose_name_plural = '正解ステータス情報'
 
+# ユーザーの難易度・モードごとの集計（FLASHCARD_MATERIALIZED_STATS が有効な場合のみ使用）
+# 回答イベントの反映時に差分更新する。既存データからの作成は rebuild_user_statistics コマンドで行う
+class UserStatistics(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)  # ユーザー
+    level = models.ForeignKey(Level, on_delete=models.CASCADE)  # 難易度
+    mode = models.CharField(max_length=10)  # モード（英訳か和訳か）
+    attempted = models.PositiveIntegerField(default=0)  # 回答した単語数
+    correct = models.PositiveIntegerField(default=0)  # 最後の回答が正解の単語数
+
+    class Meta:
+        unique_together = ('user', 'level', 'mode')
+        db_table = 'user_statistics'
+        verbose_name = 'ユーザー統計'
+        verbose_name_plural = 'ユーザー統計'
+
+# 回答イベント（追記のみ）
+# flashcard/answer_log.py のフラッシャーがまとめて UserWordStatus に反映し、反映済みのものは削除する
+class AnswerEvent(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)  # ユーザー
+    word = models.ForeignKey(Word, on_delete=models.CASCADE)  # 問題（単語）
+    mode = models.CharField(max_length=10)  # モード（英訳か和訳か）
+    is_correct = models.BooleanField()  # 正誤
+    answered_at = models.DateTimeField(default=timezone.now)  # 回答日時
+
+    class Meta:
+        db_table = 'answer_event'
+        verbose_name = '回答イベント'
+        verbose_name_plural = '回答イベント'
+
 # 復習モードの進行状況
-class UserReviewProgress(models.Model):
+class UserReviewProgress(QuestionOrderMixin, models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)  # ユーザー
-    questions = models.ManyToManyField(Word)  # 復習対象の問題（複数問題を持つ）
+    question_order = models.BinaryField(blank=True, null=True) # 復習する問題のIDを出題順に4バイト整数でパックして保存
     mode = models.CharField(max_length=10) # モード
     current_question_index = models.IntegerField(default=0)  # 現在の問題インデックス
     total_questions = models.IntegerField(default=0)  # 総問題数
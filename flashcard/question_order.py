@@ -0,0 +1,41 @@
+# flashcard/question_order.py
+# 出題順（単語IDの並び）を4バイト整数の配列としてパックする
+#
+# JSONの文字列として保存するよりも小さく、任意の位置のIDを
+# 全体をデコードせずに O(1) で取り出せる
+
+import struct
+
+ITEM_SIZE = 4  # 1件あたりのバイト数（リトルエンディアンの符号なし32bit整数）
+MAX_ID = 2**32 - 1
+
+
+def pack_question_ids(ids):
+    """単語IDのリストをバイト列にパック"""
+    ids = list(ids)
+    if ids and max(ids) > MAX_ID:
+        raise ValueError(f"単語IDが出題順に保存できる範囲を超えています: {max(ids)}")
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+
+def question_count(order):
+    """パックされた出題順の問題数"""
+    return len(order) // ITEM_SIZE if order else 0
+
+
+def question_id_at(order, index):
+    """index 番目の単語IDを取得"""
+    if not 0 <= index < question_count(order):
+        raise IndexError("問題インデックスが範囲外です")
+    return struct.unpack_from("<I", order, index * ITEM_SIZE)[0]
+
+
+def question_ids_between(order, start, count):
+    """start 番目から最大 count 件の単語IDを取得"""
+    count = max(0, min(count, question_count(order) - start))
+    return list(struct.unpack_from(f"<{count}I", order, start * ITEM_SIZE))
+
+
+def unpack_question_ids(order):
+    """全ての単語IDをリストで取得"""
+    return question_ids_between(order, 0, question_count(order)) if order else []
@@ -0,0 +1,152 @@
+# flashcard/quiz_session.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import get_object_or_404
+
+from .models import UserProgress
+from .question_order import question_id_at, question_ids_between
+
+
+class QuizSession:
+    """
+    進行中クイズのセッション（出題順・現在位置・スコア）をキャッシュに保持する
+
+    - 回答ごとに UserProgress の行（出題順を含む）を読み込まない
+    - UserProgress への書き込みは問題インデックスを条件にした1回のUPDATEのみ
+      （UserProgress.compare_and_advance）。同時に送られた回答は一方だけが反映される
+    - キャッシュに無い場合は UserProgress から復元する
+    - キャッシュのセッションが他のワーカーでの回答より古い場合は、問題インデックスの不一致か
+      compare-and-set の失敗で検出して UserProgress から読み直す
+    """
+
+    key_prefix = "flashcard:quiz_session:"
+
+    def __init__(
+        self,
+        progress_id,
+        user_id,
+        mode,
+        question_order,
+        total_questions,
+        current_question_index=0,
+        score=0,
+    ):
+        self.progress_id = progress_id
+        self.user_id = user_id
+        self.mode = mode
+        self.question_order = question_order  # パックされた出題順（question_order.py）
+        self.total_questions = total_questions
+        self.current_question_index = current_question_index
+        self.score = score
+
+    @classmethod
+    def cache(cls):
+        return caches[getattr(settings, "QUIZ_SESSION_CACHE_ALIAS", "default")]
+
+    @classmethod
+    def cache_key(cls, progress_id):
+        return f"{cls.key_prefix}{progress_id}"
+
+    @classmethod
+    def from_progress(cls, user_progress):
+        """UserProgress からセッションを生成"""
+        return cls(
+            progress_id=user_progress.id,
+            user_id=user_progress.user_id,
+            mode=user_progress.mode,
+            question_order=bytes(user_progress.question_order or b""),
+            total_questions=user_progress.total_questions,
+            current_question_index=user_progress.current_question_index,
+            score=user_progress.score,
+        )
+
+    @classmethod
+    def load(cls, progress_id, user):
+        """
+        進行中（未完了）のセッションを取得
+        キャッシュに無い場合は UserProgress から復元する（無ければ404）
+        """
+        session = cls.cache().get(cls.cache_key(progress_id))
+        if session is not None and session.user_id == user.id:
+            return session
+
+        user_progress = get_object_or_404(
+            UserProgress, id=progress_id, user=user, is_completed=False
+        )
+        session = cls.from_progress(user_progress)
+        session.save()
+        return session
+
+    @classmethod
+    def reload(cls, progress_id, user):
+        """キャッシュのセッションを破棄し、UserProgress から読み直す"""
+        cls.discard(progress_id)
+        return cls.load(progress_id, user)
+
+    @classmethod
+    def stored_question_index(cls, progress_id):
+        """UserProgress に保存されている現在の問題インデックス（キャッシュを経由しない）"""
+        return (
+            UserProgress.objects.filter(id=progress_id)
+            .values_list("current_question_index", flat=True)
+            .first()
+        )
+
+    @classmethod
+    def discard(cls, progress_id):
+        cls.cache().delete(cls.cache_key(progress_id))
+
+    @property
+    def is_completed(self):
+        return self.current_question_index >= self.total_questions
+
+    @property
+    def current_question_id(self):
+        return self.question_id_at(self.current_question_index)
+
+    def question_id_at(self, index):
+        return question_id_at(self.question_order, index)
+
+    def question_ids_between(self, start, count):
+        return question_ids_between(self.question_order, start, count)
+
+    def advance(self, correct=1, answered=1):
+        """
+        回答を反映して問題を進める（問題インデックスを条件にした compare-and-set）
+
+        読み込んだ時点から他のリクエストが問題を進めていた場合は何も更新せず False を返す
+        （キャッシュのセッションは破棄し、次回は UserProgress から復元する）
+
+        Args:
+            correct (int): 正解数
+            answered (int): 回答数
+
+        Returns:
+            bool: 反映できた場合 True
+        """
+        if not UserProgress.compare_and_advance(
+            self.progress_id,
+            self.current_question_index,
+            self.total_questions,
+            correct=correct,
+            answered=answered,
+        ):
+            self.discard(self.progress_id)
+            return False
+
+        self.score += correct
+        self.current_question_index += answered
+
+        if self.is_completed:
+            self.discard(self.progress_id)
+        else:
+            self.save()
+        return True
+
+    def save(self):
+        self.cache().set(
+            self.cache_key(self.progress_id),
+            self,
+            timeout=getattr(settings, "QUIZ_SESSION_TTL", 60 * 60 * 24),
+        )
@@ -0,0 +1,129 @@
+# flashcard/scheduler.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UserWordStatus
+
+# SM-2 の回答品質（0〜5）。正誤の2値しかないため固定値に対応させる
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 2
+
+MIN_EASE = 1.3
+
+# apply_answers の upsert で更新するフィールド
+SCHEDULE_FIELDS = ["is_correct", "last_attempted_at", "interval", "ease", "repetitions", "due_at"]
+
+
+def next_schedule(interval, ease, repetitions, is_correct):
+    """
+    SM-2 で次の復習スケジュールを計算
+
+    - 正解: 1日 → 6日 → 前回の間隔 × 易しさ係数 と間隔を広げる
+    - 不正解: 連続正解数をリセットし、すぐに復習対象にする
+
+    Returns:
+        tuple: (interval, ease, repetitions)
+    """
+    quality = CORRECT_QUALITY if is_correct else INCORRECT_QUALITY
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    if not is_correct:
+        return 0, ease, 0
+
+    repetitions += 1
+    if repetitions == 1:
+        interval = 1
+    elif repetitions == 2:
+        interval = 6
+    else:
+        interval = max(1, round(interval * ease))
+    return interval, ease, repetitions
+
+
+def apply_answers(answers):
+    """
+    回答を UserWordStatus に反映（正誤と復習スケジュール）
+
+    同じ単語への複数の回答は古い順に畳み込む。最終回答日時は反映した時刻ではなく回答日時にする。
+    既存の状態の取得と upsert の各1クエリで、回答数・ユーザー数に関わらず2クエリ
+
+    Args:
+        answers (list): (user_id, word_id, mode, is_correct, answered_at) のリスト（回答順）
+
+    Returns:
+        list: 反映した (user_id, word_id, mode) ごとの
+              (user_id, word_id, mode, 反映前の正誤（未回答なら None）, 反映後の正誤)
+    """
+    if not answers:
+        return []
+
+    previous = {}
+    was_correct = {}
+    for user_id, word_id, mode, is_correct, interval, ease, repetitions in (
+        UserWordStatus.objects.filter(
+            user_id__in={answer[0] for answer in answers},
+            word_id__in={answer[1] for answer in answers},
+        ).values_list(
+            "user_id", "word_id", "mode", "is_correct", "interval", "ease", "repetitions"
+        )
+    ):
+        previous[(user_id, word_id, mode)] = (interval, ease, repetitions)
+        was_correct[(user_id, word_id, mode)] = is_correct
+
+    word_statuses = {}
+    for user_id, word_id, mode, is_correct, answered_at in answers:
+        key = (user_id, word_id, mode)
+        interval, ease, repetitions = next_schedule(
+            *previous.get(key, (0, 2.5, 0)), is_correct
+        )
+        previous[key] = (interval, ease, repetitions)
+        word_statuses[key] = UserWordStatus(
+            user_id=user_id,
+            word_id=word_id,
+            mode=mode,
+            is_correct=is_correct,
+            last_attempted_at=answered_at,
+            interval=interval,
+            ease=ease,
+            repetitions=repetitions,
+            due_at=answered_at + timedelta(days=interval),
+        )
+
+    # (user, word, mode) の一意キーで一括upsert
+    UserWordStatus.objects.bulk_create(
+        list(word_statuses.values()),
+        update_conflicts=True,
+        unique_fields=["user", "word", "mode"],
+        update_fields=SCHEDULE_FIELDS,
+    )
+
+    return [
+        (*key, was_correct.get(key), word_status.is_correct)
+        for key, word_status in word_statuses.items()
+    ]
+
+
+def due_queryset(user, mode, now=None):
+    """
+    期限の来た復習対象（期限の古い順）
+    (user, mode, due_at) のインデックスの範囲検索になる
+    """
+    return UserWordStatus.objects.filter(
+        user=user, mode=mode, due_at__lte=now or timezone.now()
+    ).order_by("due_at", "id")
+
+
+def due_word_ids(user, mode, limit=None, level_id=None):
+    """
+    期限の来た復習対象の単語IDを最大 limit 件取得
+    （未指定の場合は REVIEW_QUEUE_LIMIT 件）
+    """
+    queryset = due_queryset(user, mode)
+    if level_id is not None:
+        queryset = queryset.filter(word__level_id=level_id)
+
+    limit = limit or getattr(settings, "REVIEW_QUEUE_LIMIT", 100)
+    return list(queryset.values_list("word_id", flat=True)[:limit])
@@ -21,8 +21,19 @@ class UserWordStatusSerializer(serializers.ModelSerializer):
             "is_correct",
             "mode",
             "last_attempted_at",
+            "interval",
+            "ease",
+            "repetitions",
+            "due_at",
+        ]
+        read_only_fields = [
+            "id",
+            "last_attempted_at",
+            "interval",
+            "ease",
+            "repetitions",
+            "due_at",
         ]
-        read_only_fields = ["id", "last_attempted_at"]
 
 
 class UserProgressSerializer(serializers.ModelSerializer):
@@ -76,12 +87,31 @@ class AnswerSubmitSerializer(serializers.Serializer):
 
     progress_id = serializers.IntegerField(help_text="進行状況ID")
     answer = serializers.CharField(max_length=255, help_text="ユーザーの回答")
+    question_index = serializers.IntegerField(
+        min_value=0, required=False, help_text="回答する問題インデックス（二重送信の検出用）"
+    )
+
+
+class BatchAnswerItemSerializer(serializers.Serializer):
+    """一括回答の1件分"""
+
+    question_index = serializers.IntegerField(min_value=0, help_text="問題インデックス")
+    answer = serializers.CharField(max_length=255, help_text="ユーザーの回答")
+
+
+class BatchAnswerSubmitSerializer(serializers.Serializer):
+    """一括回答送信用のシリアライザー"""
+
+    progress_id = serializers.IntegerField(help_text="進行状況ID")
+    answers = BatchAnswerItemSerializer(
+        many=True, min_length=1, max_length=500, help_text="回答のリスト（最大500件）"
+    )
 
 
 class UserReviewProgressSerializer(serializers.ModelSerializer):
     """復習進行状況のシリアライザー"""
 
-    questions = WordListSerializer(many=True, read_only=True)
+    questions = serializers.SerializerMethodField()
     correct_rate = serializers.SerializerMethodField()
 
     class Meta:
@@ -100,6 +130,16 @@ class UserReviewProgressSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at"]
 
+    def get_questions(self, obj):
+        """復習対象の問題（出題順）"""
+        question_ids = obj.question_ids
+        words = Word.objects.select_related("part_of_speech", "level").in_bulk(
+            question_ids
+        )
+        return WordListSerializer(
+            [words[word_id] for word_id in question_ids if word_id in words], many=True
+        ).data
+
     def get_correct_rate(self, obj):
         """正答率を計算"""
         if obj.current_question_index > 0:
@@ -0,0 +1,246 @@
+# flashcard/stats.py
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from dictionary.models import Level
+from dictionary.word_pool import word_pool
+
+from .models import UserStatistics, UserWordStatus
+
+# モード名の表示（クイズは英訳を "en"、和訳を "jp" で保存する）
+MODE_DISPLAY = {
+    "en": "英訳",
+    "jp": "和訳",
+}
+
+
+def statistics_cells(user):
+    """
+    難易度・モードごとの集計を取得
+
+    FLASHCARD_MATERIALIZED_STATS が有効な場合は UserStatistics から、
+    無効な場合は UserWordStatus の条件付き集計から、どちらも1クエリで取得する
+
+    Returns:
+        list: (level_id, level_name, mode, attempted, correct) のリスト（難易度ID順）
+    """
+    if getattr(settings, "FLASHCARD_MATERIALIZED_STATS", False):
+        rows = (
+            UserStatistics.objects.filter(user=user, attempted__gt=0)
+            .values_list("level_id", "level__name", "mode", "attempted", "correct")
+            .order_by("level_id", "mode")
+        )
+        return list(rows)
+
+    rows = (
+        UserWordStatus.objects.filter(user=user)
+        .values("word__level_id", "word__level__name", "mode")
+        .annotate(
+            attempted=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True)),
+        )
+        .order_by("word__level_id", "mode")
+    )
+    return [
+        (
+            row["word__level_id"],
+            row["word__level__name"],
+            row["mode"],
+            row["attempted"],
+            row["correct"],
+        )
+        for row in rows
+    ]
+
+
+def correct_rate(correct, total):
+    return round(correct / total * 100, 1) if total > 0 else 0.0
+
+
+def summarize_statistics(cells):
+    """
+    難易度・モードごとの集計から、全体・難易度別・モード別の統計を作成
+
+    Returns:
+        dict: total_words_attempted, total_correct, total_incorrect, correct_rate,
+              by_level, by_mode
+    """
+    levels = {}
+    modes = defaultdict(lambda: [0, 0])
+    for level_id, level_name, mode, attempted, correct in cells:
+        level = levels.setdefault(level_id, [level_name, 0, 0])
+        level[1] += attempted
+        level[2] += correct
+        modes[mode][0] += attempted
+        modes[mode][1] += correct
+
+    total_attempted = sum(level[1] for level in levels.values())
+    total_correct = sum(level[2] for level in levels.values())
+
+    return {
+        "total_words_attempted": total_attempted,
+        "total_correct": total_correct,
+        "total_incorrect": total_attempted - total_correct,
+        "correct_rate": correct_rate(total_correct, total_attempted),
+        "by_level": [
+            {
+                "level_id": level_id,
+                "level_name": level_name,
+                "correct": correct,
+                "total": attempted,
+                "rate": correct_rate(correct, attempted),
+            }
+            for level_id, (level_name, attempted, correct) in levels.items()
+            if attempted > 0
+        ],
+        "by_mode": {
+            mode: {
+                "correct": modes[mode][1],
+                "total": modes[mode][0],
+                "rate": correct_rate(modes[mode][1], modes[mode][0]),
+            }
+            for mode in ["en", "jp"]
+            if modes[mode][0] > 0
+        },
+    }
+
+
+def level_mode_table(user):
+    """
+    難易度ごとの単語数と、モードごとの回答数・正解数・正解率の表
+    （ユーザー詳細のHTML・APIで共通）
+
+    難易度一覧1クエリと正誤の集計1クエリの計2クエリ。
+    難易度ごとの単語数はメモリ上の単語IDプールから取得する。
+
+    Returns:
+        list: 難易度ごとの {"id", "name", "total_count", "modes": [...]}
+    """
+    cells = {
+        (level_id, mode): (attempted, correct)
+        for level_id, _, mode, attempted, correct in statistics_cells(user)
+    }
+
+    table = []
+    for level in Level.objects.order_by("id").values("id", "name"):
+        modes = []
+        for mode, mode_display in MODE_DISPLAY.items():
+            attempted, correct = cells.get((level["id"], mode), (0, 0))
+            modes.append(
+                {
+                    "mode": mode,
+                    "mode_display": mode_display,
+                    "count": attempted,
+                    "correct": correct,
+                    "accuracy": correct_rate(correct, attempted),
+                }
+            )
+
+        table.append(
+            {
+                "id": level["id"],
+                "name": level["name"],
+                "total_count": word_pool.count(level_id=level["id"]),
+                "modes": modes,
+            }
+        )
+    return table
+
+
+def apply_statistics_changes(changes, word_levels):
+    """
+    UserWordStatus への反映結果を UserStatistics に差分反映
+    （FLASHCARD_MATERIALIZED_STATS が無効な場合は何もしない）
+
+    Args:
+        changes (list): scheduler.apply_answers の戻り値
+            (user_id, word_id, mode, 反映前の正誤（未回答なら None）, 反映後の正誤)
+        word_levels (dict): 単語ID -> 難易度ID
+    """
+    if not changes or not getattr(settings, "FLASHCARD_MATERIALIZED_STATS", False):
+        return
+
+    deltas = defaultdict(lambda: [0, 0])  # (user_id, level_id, mode) -> [attempted, correct]
+    for user_id, word_id, mode, was_correct, is_correct in changes:
+        delta = deltas[(user_id, word_levels[word_id], mode)]
+        if was_correct is None:
+            delta[0] += 1
+        delta[1] += int(is_correct) - int(bool(was_correct))
+
+    deltas = {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        current = {
+            (user_id, level_id, mode): (attempted, correct)
+            for user_id, level_id, mode, attempted, correct in (
+                UserStatistics.objects.select_for_update()
+                .filter(
+                    user_id__in={key[0] for key in deltas},
+                    level_id__in={key[1] for key in deltas},
+                )
+                .values_list("user_id", "level_id", "mode", "attempted", "correct")
+            )
+        }
+
+        rows = []
+        for (user_id, level_id, mode), (attempted, correct) in deltas.items():
+            base_attempted, base_correct = current.get((user_id, level_id, mode), (0, 0))
+            rows.append(
+                UserStatistics(
+                    user_id=user_id,
+                    level_id=level_id,
+                    mode=mode,
+                    attempted=base_attempted + attempted,
+                    correct=max(0, base_correct + correct),
+                )
+            )
+
+        UserStatistics.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "level", "mode"],
+            update_fields=["attempted", "correct"],
+        )
+
+
+def rebuild_user_statistics(user_ids=None):
+    """
+    UserWordStatus から UserStatistics を作り直す（1回の集計クエリ）
+
+    Args:
+        user_ids (list): 対象のユーザーID（未指定の場合は全ユーザー）
+
+    Returns:
+        int: 作成した行数
+    """
+    statuses = UserWordStatus.objects.all()
+    existing = UserStatistics.objects.all()
+    if user_ids is not None:
+        statuses = statuses.filter(user_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+
+    rows = [
+        UserStatistics(
+            user_id=row["user_id"],
+            level_id=row["word__level_id"],
+            mode=row["mode"],
+            attempted=row["attempted"],
+            correct=row["correct"],
+        )
+        for row in statuses.values("user_id", "word__level_id", "mode").annotate(
+            attempted=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True)),
+        ).order_by()
+    ]
+
+    with transaction.atomic():
+        existing.delete()
+        UserStatistics.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
@@ -1,3 +1,799 @@
-from django.test import TestCase
+# flashcard/tests.py
 
-# Create your tests here.
+import json
+import threading
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from dictionary.indexes import invalidate_all
+from dictionary.models import Level, PartOfSpeech, Word
+from dictionary.word_pool import word_pool
+from wordbook.testing import QueryBudgetTestMixin
+from .answer_log import append_answers, flush_answer_events
+from .api_views import (
+    MAX_PREFETCH,
+    UserProgressListAPIView,
+    get_due_cards,
+    get_statistics,
+    start_quiz,
+    submit_answer,
+    submit_answers_batch,
+)
+from .checks import check_quiz_session_cache
+from .grading import answer_table, grade_answer
+from .models import AnswerEvent, UserProgress, UserWordStatus
+from .stats import rebuild_user_statistics
+from .question_order import (
+    MAX_ID,
+    pack_question_ids,
+    question_count,
+    question_id_at,
+    question_ids_between,
+    unpack_question_ids,
+)
+from .quiz_session import QuizSession
+from .scheduler import MIN_EASE, due_word_ids, next_schedule
+
+
+class QuizTestMixin:
+    """単語・ユーザー・進行中のクイズを用意するテスト用の共通処理"""
+
+    question_count = 5
+
+    def setUp(self):
+        self.enterContext(
+            override_settings(
+                ANSWER_LOG_BACKGROUND_FLUSH=False, DICTIONARY_INDEX_BACKGROUND_REFRESH=False
+            )
+        )
+        caches["default"].clear()
+        invalidate_all()
+
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        self.level = Level.objects.create(name="テスト")
+        self.words = [
+            Word.objects.create(
+                english=f"word{i}",
+                japanese=f"単語{i}",
+                level=self.level,
+                part_of_speech=part_of_speech,
+            )
+            for i in range(self.question_count)
+        ]
+        self.user = CustomUser.objects.create(username="quiz", email="quiz@example.com")
+        self.progress = UserProgress.objects.create(
+            user=self.user,
+            level=self.level,
+            mode="en",
+            total_questions=self.question_count,
+            question_ids=[word.id for word in self.words],
+        )
+
+    def post(self, view, data):
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+
+class StaleQuizSessionTests(QuizTestMixin, TestCase):
+    """キャッシュのセッションが他のワーカーでの回答より古い場合"""
+
+    def setUp(self):
+        super().setUp()
+        # このワーカーのキャッシュには問題0のセッションが残ったまま、
+        # 他のワーカーで問題0が回答された
+        QuizSession.from_progress(self.progress).save()
+        UserProgress.compare_and_advance(self.progress.id, 0, self.question_count)
+
+    def test_answer_for_current_question_is_accepted(self):
+        response = self.post(
+            submit_answer,
+            {"progress_id": self.progress.id, "answer": "word1", "question_index": 1},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_correct"])
+        self.assertEqual(response.data["current_question_index"], 2)
+
+    def test_stale_answer_reports_current_question_index(self):
+        response = self.post(
+            submit_answer,
+            {"progress_id": self.progress.id, "answer": "word0", "question_index": 0},
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["current_question_index"], 1)
+
+    def test_answer_without_question_index_is_graded_against_current_question(self):
+        response = self.post(submit_answer, {"progress_id": self.progress.id, "answer": "word1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_correct"])
+        self.assertEqual(response.data["current_question_index"], 2)
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.current_question_index, 2)
+        self.assertEqual(AnswerEvent.objects.filter(user=self.user).count(), 1)
+
+    def test_batch_starting_at_current_question_is_accepted(self):
+        response = self.post(
+            submit_answers_batch,
+            {
+                "progress_id": self.progress.id,
+                "answers": [
+                    {"question_index": 1, "answer": "word1"},
+                    {"question_index": 2, "answer": "word2"},
+                ],
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["current_question_index"], 3)
+
+
+class BatchAnswerTests(QuizTestMixin, TestCase):
+    """回答のまとめて送信"""
+
+    def submit(self, answers):
+        return self.post(
+            submit_answers_batch,
+            {
+                "progress_id": self.progress.id,
+                "answers": [
+                    {"question_index": index, "answer": answer}
+                    for index, answer in enumerate(answers)
+                ],
+            },
+        )
+
+    def test_answers_are_graded_and_applied_together(self):
+        response = self.submit(["word0", "wrong", "word2"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["is_correct"] for result in response.data["results"]], [True, False, True]
+        )
+        self.assertEqual(response.data["score"], 2)
+        self.assertEqual(response.data["current_question_index"], 3)
+
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.score, 2)
+        self.assertEqual(self.progress.current_question_index, 3)
+        events = AnswerEvent.objects.filter(user=self.user).order_by("id")
+        self.assertEqual(
+            [(event.word_id, event.mode, event.is_correct) for event in events],
+            [
+                (self.words[0].id, "en", True),
+                (self.words[1].id, "en", False),
+                (self.words[2].id, "en", True),
+            ],
+        )
+
+    def test_answer_for_deleted_word_is_rejected(self):
+        self.words[1].delete()
+
+        response = self.submit(["word0", "word1", "word2"])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["current_question_index"], 0)
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.current_question_index, 0)
+        self.assertFalse(AnswerEvent.objects.filter(user=self.user).exists())
+
+
+class GradingTests(TestCase):
+    """回答の正誤判定（HTML・APIで共通）"""
+
+    # (モード, 回答, 正解か)
+    cases = [
+        ("en", "apple", True),
+        ("en", "ａｐｐｌｅ", True),  # 全角英字
+        ("en", "  apple  ", True),
+        ("en", "apples", False),
+        ("jp", "りんご", True),
+        ("jp", "林檎", True),  # 全角カンマ区切りの2つ目の正解
+        ("jp", "ｱｯﾌﾟﾙ", True),  # 半角カナ
+        ("jp", " りんご　", True),  # 全角スペース
+        ("jp", "りんご，林檎", False),
+        ("jp", "みかん", False),
+    ]
+
+    def setUp(self):
+        self.enterContext(
+            override_settings(
+                ANSWER_LOG_BACKGROUND_FLUSH=False, DICTIONARY_INDEX_BACKGROUND_REFRESH=False
+            )
+        )
+        caches["default"].clear()
+        invalidate_all()
+        self.level = Level.objects.create(name="テスト")
+        self.part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        self.word = Word.objects.create(
+            english="apple",
+            japanese="りんご，林檎, アップル",
+            level=self.level,
+            part_of_speech=self.part_of_speech,
+        )
+        self.user = CustomUser.objects.create(username="grading", email="grading@example.com")
+
+    def create_progress(self, mode):
+        return UserProgress.objects.create(
+            user=self.user,
+            level=self.level,
+            mode=mode,
+            total_questions=1,
+            question_ids=[self.word.id],
+        )
+
+    def grade_with_api(self, mode, answer):
+        request = APIRequestFactory().post(
+            "/", {"progress_id": self.create_progress(mode).id, "answer": answer}, format="json"
+        )
+        force_authenticate(request, user=self.user)
+        response = submit_answer(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data["is_correct"]
+
+    def grade_with_html(self, mode, answer):
+        progress = self.create_progress(mode)
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse("check_answer", args=[progress.id]), {"answer": answer})
+        self.assertEqual(response.status_code, 200)
+        progress.refresh_from_db()
+        return progress.score == 1
+
+    def test_answers_are_normalized(self):
+        for mode, answer, expected in self.cases:
+            with self.subTest(mode=mode, answer=answer):
+                self.assertEqual(grade_answer(self.word, mode, answer)[0], expected)
+
+    def test_whitespace_inside_answers_is_collapsed(self):
+        self.word.english = "ice cream"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.word.save()
+
+        for answer in ("ice cream", "ice   cream", " ice\u3000cream "):
+            with self.subTest(answer=answer):
+                self.assertTrue(grade_answer(self.word, "en", answer)[0])
+
+    def test_html_and_api_grade_the_same_way(self):
+        for mode, answer, expected in self.cases:
+            with self.subTest(mode=mode, answer=answer):
+                self.assertEqual(self.grade_with_api(mode, answer), expected)
+                self.assertEqual(self.grade_with_html(mode, answer), expected)
+
+    def test_answer_table_follows_word_changes(self):
+        self.assertTrue(grade_answer(self.word, "jp", "りんご")[0])
+
+        self.word.japanese = "林檎"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.word.save()
+
+        self.assertEqual(answer_table.answers(self.word)[1], frozenset(["林檎"]))
+        self.assertFalse(grade_answer(self.word, "jp", "りんご")[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Word.objects.get(id=self.word.id).delete()
+        self.assertNotIn(self.word.id, answer_table.data)
+
+
+class PrefetchTests(QuizTestMixin, TestCase):
+    """?prefetch=K で次の問題から K 問分を先読みする"""
+
+    question_count = MAX_PREFETCH + 5
+
+    def post_with_prefetch(self, view, data, prefetch):
+        request = APIRequestFactory().post(f"/?prefetch={prefetch}", data, format="json")
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def assert_questions(self, questions, start):
+        """questions が出題順の start 番目からの問題であること"""
+        question_ids = [word.id for word in self.words]
+        self.assertEqual(
+            [question["id"] for question in questions],
+            question_ids[start : start + len(questions)],
+        )
+        self.assertEqual(
+            [question["question_number"] for question in questions],
+            list(range(start + 1, start + len(questions) + 1)),
+        )
+        for question in questions:
+            self.assertEqual(question["total_questions"], self.question_count)
+
+    def test_answer_prefetches_following_questions_in_stored_order(self):
+        response = self.post_with_prefetch(
+            submit_answer, {"progress_id": self.progress.id, "answer": "word0"}, 3
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["prefetched_questions"]), 3)
+        self.assert_questions(response.data["prefetched_questions"], 1)
+        self.assertEqual(response.data["next_question"], response.data["prefetched_questions"][0])
+
+    def test_start_quiz_prefetches_from_first_question(self):
+        response = self.post_with_prefetch(
+            start_quiz, {"level_id": self.level.id, "mode": "en", "quiz_mode": "normal"}, 4
+        )
+
+        self.assertEqual(response.status_code, 201)
+        progress = UserProgress.objects.get(id=response.data["progress"]["id"])
+        prefetched = response.data["prefetched_questions"]
+        self.assertEqual(
+            [question["id"] for question in prefetched], progress.question_ids[:4]
+        )
+        self.assertEqual([question["question_number"] for question in prefetched], [1, 2, 3, 4])
+        self.assertEqual(response.data["current_question"], prefetched[0])
+
+    def test_prefetch_is_capped(self):
+        response = self.post_with_prefetch(
+            submit_answer, {"progress_id": self.progress.id, "answer": "word0"}, 1000
+        )
+
+        self.assertEqual(len(response.data["prefetched_questions"]), MAX_PREFETCH)
+        self.assert_questions(response.data["prefetched_questions"], 1)
+
+    def test_prefetched_questions_are_fetched_in_one_query(self):
+        # 正解表（プロセス内インデックス）の構築は計測しない
+        answer_table.data
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_with_prefetch(
+                submit_answer, {"progress_id": self.progress.id, "answer": "word0"}, 5
+            )
+
+        self.assertEqual(response.status_code, 200)
+        word_lookups = [
+            query["sql"] for query in queries.captured_queries if 'FROM "word"' in query["sql"]
+        ]
+        # 回答した問題の取得と、次の問題から5問分の取得
+        self.assertEqual(len(word_lookups), 2)
+        self.assertIn('"word"."id" IN', word_lookups[1])
+
+
+class StartQuizTests(QuizTestMixin, TestCase):
+    """単語IDプールに削除済みの単語が残っている場合のクイズ開始"""
+
+    def setUp(self):
+        super().setUp()
+        word_pool.data
+        # 他のワーカーで削除された（コミット後の差分反映が届かず、このプロセスのプールには残ったまま）
+        self.words[0].delete()
+        self.assertEqual(word_pool.count(level_id=self.level.id), self.question_count)
+
+    def assert_deleted_words_are_not_asked(self, quiz_mode):
+        response = self.post(
+            start_quiz, {"level_id": self.level.id, "mode": "en", "quiz_mode": quiz_mode}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        progress = UserProgress.objects.get(id=response.data["progress"]["id"])
+        self.assertCountEqual(progress.question_ids, [word.id for word in self.words[1:]])
+        self.assertEqual(progress.total_questions, self.question_count - 1)
+        self.assertEqual(response.data["current_question"]["id"], progress.question_ids[0])
+
+    def test_normal_mode(self):
+        self.assert_deleted_words_are_not_asked("normal")
+
+    def test_test_mode(self):
+        self.assert_deleted_words_are_not_asked("test")
+
+
+# SQLite のインメモリのテストDBはスレッドごとの接続から同時に書き込めない
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class ConcurrentAnswerTests(QuizTestMixin, TransactionTestCase):
+    """同じ進行状況・同じ問題へ複数スレッドから同時に回答しても、回答が二重に反映されたり失われたりしない"""
+
+    thread_count = 4
+
+    def answer_concurrently(self, with_index):
+        statuses = Counter()
+        lock = threading.Lock()
+
+        for question_index in range(self.question_count):
+            barrier = threading.Barrier(self.thread_count)
+
+            def worker():
+                data = {"progress_id": self.progress.id, "answer": "stress"}
+                if with_index:
+                    data["question_index"] = question_index
+                try:
+                    barrier.wait()
+                    response = self.post(submit_answer, data)
+                    with lock:
+                        statuses[response.status_code] += 1
+                finally:
+                    connection.close()
+
+            workers = [threading.Thread(target=worker) for _ in range(self.thread_count)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+
+        return statuses
+
+    def assert_each_answer_applied_once(self, statuses):
+        self.progress.refresh_from_db()
+        self.assertEqual(statuses[200], self.question_count)
+        # 他方は 409（回答済み）か、全問回答された後の 404（完了済み）のみ
+        self.assertLessEqual(set(statuses), {200, 404, 409})
+        self.assertEqual(self.progress.current_question_index, self.question_count)
+        self.assertTrue(self.progress.is_completed)
+        self.assertEqual(AnswerEvent.objects.filter(user=self.user).count(), self.question_count)
+
+    def test_concurrent_answers_with_question_index(self):
+        self.assert_each_answer_applied_once(self.answer_concurrently(with_index=True))
+
+    def test_concurrent_answers_without_question_index(self):
+        self.assert_each_answer_applied_once(self.answer_concurrently(with_index=False))
+
+
+class AnswerLogTests(QuizTestMixin, TestCase):
+    """回答イベントの追記と UserWordStatus への反映"""
+
+    def add_events(self, answers):
+        # 1時間前から1分おきに回答した
+        started_at = timezone.now() - timedelta(hours=1)
+        return [
+            AnswerEvent.objects.create(
+                user=self.user,
+                word=word,
+                mode="en",
+                is_correct=is_correct,
+                answered_at=started_at + timedelta(minutes=i),
+            )
+            for i, (word, is_correct) in enumerate(answers)
+        ]
+
+    def test_appended_answers_are_flushed_once(self):
+        append_answers(self.user, "en", [(self.words[0], True), (self.words[1], False)])
+        self.assertEqual(UserWordStatus.objects.count(), 0)
+
+        self.assertEqual(flush_answer_events(), 2)
+        self.assertEqual(flush_answer_events(), 0)
+
+        self.assertFalse(AnswerEvent.objects.exists())
+        statuses = UserWordStatus.objects.filter(user=self.user, mode="en")
+        self.assertEqual(
+            {status.word_id: status.is_correct for status in statuses},
+            {self.words[0].id: True, self.words[1].id: False},
+        )
+
+    def test_answers_to_same_word_are_folded_in_order(self):
+        word = self.words[0]
+        events = self.add_events(
+            [(word, True), (word, True), (word, True), (word, False), (word, True)]
+        )
+
+        flush_answer_events()
+
+        status = UserWordStatus.objects.get(user=self.user, word=word, mode="en")
+        # 不正解で連続正解数がリセットされ、最後の正解が1回目として数えられる
+        self.assertTrue(status.is_correct)
+        self.assertEqual(status.repetitions, 1)
+        self.assertEqual(status.interval, 1)
+        # 最終回答日時・次の復習日時は反映した時刻ではなく最後の回答日時から決まる
+        self.assertEqual(status.last_attempted_at, events[-1].answered_at)
+        self.assertEqual(status.due_at, events[-1].answered_at + timedelta(days=1))
+
+    def test_events_are_kept_when_flush_lock_is_not_acquired(self):
+        self.add_events([(self.words[0], True), (self.words[1], True)])
+
+        # 他のフラッシャーが反映中でロックを取れなかった（lock_timeout など）
+        with mock.patch(
+            "flashcard.answer_log.lock_flush", side_effect=OperationalError("lock timeout")
+        ):
+            with self.assertRaises(OperationalError):
+                flush_answer_events()
+
+        self.assertEqual(AnswerEvent.objects.count(), 2)
+        self.assertFalse(UserWordStatus.objects.exists())
+
+        # 次のフラッシュで反映される
+        self.assertEqual(flush_answer_events(), 2)
+        self.assertEqual(UserWordStatus.objects.filter(user=self.user, repetitions=1).count(), 2)
+
+
+class NextScheduleTests(SimpleTestCase):
+    """SM-2 による復習スケジュールの計算"""
+
+    def test_intervals_grow_after_consecutive_correct_answers(self):
+        schedule = (0, 2.5, 0)
+        intervals = []
+        for _ in range(4):
+            previous_interval = schedule[0]
+            schedule = next_schedule(*schedule, True)
+            intervals.append(schedule[0])
+
+        # 1日 → 6日 → 前回の間隔 × 易しさ係数
+        self.assertEqual(intervals[:2], [1, 6])
+        self.assertEqual(intervals[3], round(previous_interval * schedule[1]))
+        self.assertEqual(schedule[2], 4)
+
+    def test_wrong_answer_resets_schedule(self):
+        interval, ease, repetitions = next_schedule(15, 2.5, 3, False)
+
+        self.assertEqual((interval, repetitions), (0, 0))
+        self.assertLess(ease, 2.5)
+        # 次の正解は1回目として数え直す
+        self.assertEqual(next_schedule(interval, ease, repetitions, True)[::2], (1, 1))
+
+    def test_ease_never_drops_below_floor(self):
+        ease = 2.5
+        for _ in range(20):
+            _, ease, _ = next_schedule(0, ease, 0, False)
+        self.assertEqual(ease, MIN_EASE)
+
+
+class DueQueueTests(QuizTestMixin, TestCase):
+    """復習時期の来た単語の取得"""
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # 単語0〜2は期限切れ（期限の古い順に 2, 0, 1）、単語3は期限前、単語4は別のモード
+        for word, mode, due_at in (
+            (self.words[0], "en", now - timedelta(days=2)),
+            (self.words[1], "en", now - timedelta(days=1)),
+            (self.words[2], "en", now - timedelta(days=3)),
+            (self.words[3], "en", now + timedelta(days=1)),
+            (self.words[4], "jp", now - timedelta(days=5)),
+        ):
+            UserWordStatus.objects.create(user=self.user, word=word, mode=mode, due_at=due_at)
+        self.due_order = [self.words[2].id, self.words[0].id, self.words[1].id]
+
+    def get(self, params):
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=self.user)
+        return get_due_cards(request)
+
+    def test_only_due_cards_are_returned_in_due_order(self):
+        response = self.get({"mode": "en"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card["word"]["id"] for card in response.data["results"]], self.due_order)
+        self.assertFalse(response.data["has_more"])
+
+    def test_limit_reports_remaining_cards(self):
+        response = self.get({"mode": "en", "limit": 2})
+
+        self.assertEqual(
+            [card["word"]["id"] for card in response.data["results"]], self.due_order[:2]
+        )
+        self.assertTrue(response.data["has_more"])
+
+    def test_review_queue_is_limited_to_review_queue_limit(self):
+        with self.settings(REVIEW_QUEUE_LIMIT=2):
+            self.assertEqual(due_word_ids(self.user, "en"), self.due_order[:2])
+        self.assertEqual(due_word_ids(self.user, "en"), self.due_order)
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    マイグレーションが既存のデータを変換できるかのテスト
+
+    migrate_from まで戻してデータを作り、migrate_to まで進めて確認する
+    （テストの後は最新まで進め直す）
+    """
+
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self.migrate_to_latest)
+        self.old_apps = self.migrate(self.migrate_from)
+        self.user = CustomUser.objects.create(username="migration", email="migration@example.com")
+        level = Level.objects.create(name="テスト")
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        self.words = [
+            Word.objects.create(
+                english=f"word{i}", japanese=f"単語{i}", level=level, part_of_speech=part_of_speech
+            )
+            for i in range(5)
+        ]
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+class ScheduleMigrationTests(MigrationTestCase):
+    """既存の正解ステータスに復習期限を設定する（0004）"""
+
+    migrate_from = ("flashcard", "0003_userprogress_question_order")
+    migrate_to = ("flashcard", "0004_userwordstatus_schedule")
+
+    def test_existing_statuses_get_due_dates(self):
+        UserWordStatus = self.old_apps.get_model("flashcard", "UserWordStatus")
+        attempted_at = timezone.now() - timedelta(days=10)
+        for word, is_correct in ((self.words[0], True), (self.words[1], False)):
+            UserWordStatus.objects.create(
+                user_id=self.user.id, word_id=word.id, mode="en", is_correct=is_correct
+            )
+        UserWordStatus.objects.update(last_attempted_at=attempted_at)
+
+        UserWordStatus = self.migrate(self.migrate_to).get_model("flashcard", "UserWordStatus")
+
+        correct = UserWordStatus.objects.get(word_id=self.words[0].id)
+        self.assertEqual(correct.due_at, attempted_at + timedelta(days=1))
+        self.assertEqual((correct.interval, correct.repetitions), (1, 1))
+        incorrect = UserWordStatus.objects.get(word_id=self.words[1].id)
+        self.assertEqual(incorrect.due_at, attempted_at)
+        self.assertEqual((incorrect.interval, incorrect.repetitions), (0, 0))
+
+
+class QuestionOrderTests(SimpleTestCase):
+    """出題順のパック・アンパック"""
+
+    ids = [42, 7, MAX_ID, 1, 100000]
+
+    def test_round_trip(self):
+        order = pack_question_ids(self.ids)
+
+        self.assertEqual(len(order), 4 * len(self.ids))
+        self.assertEqual(question_count(order), len(self.ids))
+        self.assertEqual(unpack_question_ids(order), self.ids)
+        self.assertEqual(unpack_question_ids(pack_question_ids([])), [])
+        self.assertEqual(unpack_question_ids(None), [])
+
+    def test_ids_out_of_range_are_rejected(self):
+        with self.assertRaises(ValueError):
+            pack_question_ids([1, MAX_ID + 1])
+
+    def test_question_id_at(self):
+        order = pack_question_ids(self.ids)
+
+        self.assertEqual(question_id_at(order, 0), 42)
+        self.assertEqual(question_id_at(order, len(self.ids) - 1), 100000)
+        for index in (-1, len(self.ids)):
+            with self.subTest(index=index), self.assertRaises(IndexError):
+                question_id_at(order, index)
+
+    def test_question_ids_between_ends(self):
+        order = pack_question_ids(self.ids)
+
+        self.assertEqual(question_ids_between(order, 0, 2), [42, 7])
+        self.assertEqual(question_ids_between(order, 3, 2), [1, 100000])
+        # 末尾を超える分は切り詰める
+        self.assertEqual(question_ids_between(order, 4, 5), [100000])
+        self.assertEqual(question_ids_between(order, 5, 1), [])
+        self.assertEqual(question_ids_between(order, 0, 0), [])
+        self.assertEqual(question_ids_between(b"", 0, 3), [])
+
+
+class QuestionOrderMigrationTests(MigrationTestCase):
+    """出題順をJSONの文字列からパック配列に変換する（0003）"""
+
+    migrate_from = ("flashcard", "0002_alter_userprogress_question_ids")
+    migrate_to = ("flashcard", "0003_userprogress_question_order")
+
+    def test_question_order_is_kept(self):
+        UserProgress = self.old_apps.get_model("flashcard", "UserProgress")
+        question_ids = [self.words[3].id, self.words[0].id, self.words[4].id, self.words[1].id]
+        level_id = self.words[0].level_id
+        progresses = {
+            # json.dumps したリストを JSONField に保存していた（二重エンコード）
+            "double_encoded": UserProgress.objects.create(
+                user_id=self.user.id,
+                level_id=level_id,
+                mode="en",
+                question_ids=json.dumps(question_ids),
+            ),
+            "list": UserProgress.objects.create(
+                user_id=self.user.id, level_id=level_id, mode="en", question_ids=question_ids
+            ),
+            "empty": UserProgress.objects.create(
+                user_id=self.user.id, level_id=level_id, mode="en", question_ids=None
+            ),
+        }
+
+        UserProgress = self.migrate(self.migrate_to).get_model("flashcard", "UserProgress")
+
+        expected = {"double_encoded": question_ids, "list": question_ids, "empty": []}
+        for name, progress in progresses.items():
+            with self.subTest(name):
+                order = UserProgress.objects.get(id=progress.id).question_order
+                self.assertEqual(unpack_question_ids(bytes(order)), expected[name])
+
+
+class ReviewQuestionOrderMigrationTests(MigrationTestCase):
+    """復習の問題を ManyToMany からパック配列に変換する（0006）"""
+
+    migrate_from = ("flashcard", "0005_answerevent")
+    migrate_to = ("flashcard", "0006_userreviewprogress_question_order")
+
+    def test_question_order_follows_through_table_order(self):
+        UserReviewProgress = self.old_apps.get_model("flashcard", "UserReviewProgress")
+        Through = UserReviewProgress.questions.through
+        progress = UserReviewProgress.objects.create(user_id=self.user.id, mode="en")
+        other = UserReviewProgress.objects.create(user_id=self.user.id, mode="jp")
+        # 中間テーブルへの登録順（単語ID順とは異なる）が出題順
+        question_ids = [self.words[2].id, self.words[0].id, self.words[4].id]
+        for word_id in question_ids:
+            Through.objects.create(userreviewprogress_id=progress.id, word_id=word_id)
+        Through.objects.create(userreviewprogress_id=other.id, word_id=self.words[1].id)
+
+        UserReviewProgress = self.migrate(self.migrate_to).get_model(
+            "flashcard", "UserReviewProgress"
+        )
+
+        orders = dict(UserReviewProgress.objects.values_list("id", "question_order"))
+        self.assertEqual(unpack_question_ids(bytes(orders[progress.id])), question_ids)
+        self.assertEqual(unpack_question_ids(bytes(orders[other.id])), [self.words[1].id])
+
+
+class StatisticsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """統計のクエリ数が難易度の数に依存せず上限内に収まる"""
+
+    def assert_statistics(self, response):
+        # 難易度20 × 単語3 × 2モードに回答し、各難易度の最初の単語だけ正解
+        self.assertEqual(response.data["total_words_attempted"], 120)
+        self.assertEqual(response.data["total_correct"], 40)
+        self.assertEqual(len(response.data["by_level"]), self.level_count)
+
+    def test_statistics_from_aggregates(self):
+        with self.settings(FLASHCARD_MATERIALIZED_STATS=False):
+            self.assert_statistics(self.assert_query_budget(get_statistics, 2))
+
+    def test_statistics_from_materialized_table(self):
+        rebuild_user_statistics([self.user.id])
+        with self.settings(FLASHCARD_MATERIALIZED_STATS=True):
+            self.assert_statistics(self.assert_query_budget(get_statistics, 2))
+
+
+class ProgressListQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """進行状況一覧のクエリ数が件数に依存しない（難易度の単語数は単語IDプールから取得）"""
+
+    def test_progress_list(self):
+        response = self.assert_query_budget(UserProgressListAPIView.as_view(), 1)
+
+        self.assertEqual(len(response.data), self.level_count)
+        self.assertEqual(
+            {progress["level"]["word_count"] for progress in response.data},
+            {self.words_per_level},
+        )
+
+
+class QuizSessionCacheCheckTests(SimpleTestCase):
+    """クイズセッションのキャッシュがプロセス内キャッシュの場合の警告"""
+
+    @override_settings(
+        DEBUG=False,
+        QUIZ_SESSION_CACHE_ALIAS="default",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_warns_for_process_local_cache(self):
+        warnings = check_quiz_session_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["flashcard.W001"])
+
+    @override_settings(
+        DEBUG=False,
+        QUIZ_SESSION_CACHE_ALIAS="default",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}},
+    )
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_quiz_session_cache(None), [])
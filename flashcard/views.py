@@ -1,17 +1,22 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from dictionary.models import Word, Level
+from dictionary.word_pool import word_pool
 from django.contrib import messages
+from django.db import transaction
+from django.utils import timezone
 from .models import UserProgress, UserWordStatus, UserReviewProgress
+from .grading import grade_answer
+from .answer_log import append_answers
+from .scheduler import due_word_ids
 import random
-import json
 
 # 「最初から」か「続きから」を選択する
 @login_required
 def select_quiz(request):
     user_progress = UserProgress.objects.filter(user=request.user, is_completed=False).all()
     review_progress = UserReviewProgress.objects.filter(user=request.user, is_completed=False).all()
-    user_word_status = UserWordStatus.objects.filter(user=request.user, is_correct=False).first()
+    user_word_status = UserWordStatus.objects.filter(user=request.user, due_at__lte=timezone.now()).first()
     
     # POSTリクエスト
     if request.method == 'POST':
@@ -114,20 +119,18 @@ def quiz(request):
         messages.error(request, 'エラーが発生しました。難易度選択からお願いします')
         return redirect('select_level')
     
-    words = Word.objects.filter(level_id=level.id) # 選択した難易度の単語を全て抽出
-    
-    # テストモードの場合、ランダムで100問出題する
+    # テストモードの場合、ランダムで100問出題する（単語IDはメモリ上のプールから抽出）
     if test: 
-        total_questions = 100
-        questions = random.sample(list(words.values_list('id', flat=True)), total_questions)
+        questions = word_pool.sample_existing(100, level_id=level.id)
+        total_questions = len(questions)
         messages.success(request, 'テストモードで開始します')
     elif replay:
         # UserWordStatusから選択したモードの単語を全て取得
         replay_all_questions = UserWordStatus.objects.filter(user=request.user, mode=mode)
         # そこから単語のidを取得
         replay_all_questions_id = replay_all_questions.values_list('word_id', flat=True)
-        # 選択したlevelでフィルタリングされたwordsからreplay_all_questions_idの単語を取得
-        replay_questions = words.filter(id__in=replay_all_questions_id)
+        # 選択したlevelの単語からreplay_all_questions_idの単語を取得
+        replay_questions = Word.objects.filter(level_id=level.id, id__in=replay_all_questions_id)
         total_questions = len(replay_questions)
         questions = random.sample(list(replay_questions.values_list('id', flat=True)), total_questions)
         if questions:
@@ -138,9 +141,9 @@ def quiz(request):
             return redirect('user_home')
     # 通常モードの場合
     else:
-        total_questions = len(words)
-        # total_questionsの数だけ、wordsからidで取得し、questionsにリストで保存
-        questions = random.sample(list(words.values_list('id', flat=True)), total_questions)
+        # 選択した難易度の全単語のidをシャッフルし、questionsにリストで保存（削除済みの単語は除く）
+        questions = word_pool.sample_existing(word_pool.count(level_id=level.id), level_id=level.id)
+        total_questions = len(questions)
         messages.success(request, '通常モードで開始します')
         # question_indexとscoreを初期化
         
@@ -155,7 +158,7 @@ def quiz(request):
         score=score,
         total_questions=total_questions,
         current_question_index=question_index,
-        question_ids=json.dumps(questions),
+        question_ids=questions,
     )
     # questionsリストから、現在の問題のIDをquestion_indexを使って取得
     question_id = questions[question_index]
@@ -174,8 +177,7 @@ def quiz(request):
 def get_current_question(request, progress_id):
     # 進行状況とWordから現在の問題を取得し返す
     user_progress = get_object_or_404(UserProgress, id=progress_id, user=request.user, is_completed=False)
-    questions = json.loads(user_progress.question_ids)
-    question_id = questions[user_progress.current_question_index]
+    question_id = user_progress.question_id_at(user_progress.current_question_index)
     current_question = get_object_or_404(Word, id=question_id)
     
     return user_progress, current_question
@@ -247,25 +249,22 @@ def start_review(request):
             messages.error(request, '出題モードを取得できませんでした。ホームへ戻ります')
             return redirect('user_home')
         
-        # 特定のモードに基づいて、ユーザーが間違った問題を取得
-        mistakes = UserWordStatus.objects.filter(user=request.user, mode=mode, is_correct=False)
-        # mistakesが存在する場合はreview_quizにリダイレクト
-        if mistakes:
-            # mistakesから各mistake.wordを取得し、questionsリストを作成
-            questions = [mistake.word for mistake in mistakes]
-            # 復習進行状況を作成
+        # 特定のモードに基づいて、復習時期の来た問題（間違えた問題を含む）を期限の古い順に取得
+        questions = due_word_ids(request.user, mode)
+        # questionsが存在する場合はreview_quizにリダイレクト
+        if questions:
+            # 復習進行状況を作成（問題のIDを出題順に保存）
             review_progress = UserReviewProgress.objects.create(
                 user = request.user,
                 mode = mode,
                 total_questions = len(questions),
+                question_ids = questions,
             )
-            # review_progressのquestionsフィールドにquestionsリストを関連付ける（既存の関連はクリアされる）
-            review_progress.questions.set(questions)
             
             return redirect('review_quiz', review_id=review_progress.id)
-        # mistakesがなかった場合はuser_homeへ
+        # questionsがなかった場合はuser_homeへ
         else:
-            messages.error(request, '間違った問題はありませんでした')
+            messages.error(request, '復習する問題はありませんでした')
             return redirect('user_home')
     # POSTメソッド以外のリクエストはuser_homeへ
     else:
@@ -280,8 +279,8 @@ def review_quiz(request, review_id):
         return redirect('user_home')
     # 復習の進行状況を取得
     review_progress = get_object_or_404(UserReviewProgress, id=review_id, user=request.user,)
-    # current_question_indexから最初の問題を取得
-    current_question = review_progress.questions.all()[review_progress.current_question_index]
+    # current_question_indexの問題を主キーで取得
+    current_question = get_object_or_404(Word, id=review_progress.question_id_at(review_progress.current_question_index))
     
     # contextに最初の問題と進行状況を渡し、review_quiz.htmlにレンダリング
     context = {
@@ -299,42 +298,22 @@ def check_review_answer(request, progress_id):
         return redirect('user_home')
     # 復習の進行状況を取得
     review_progress = get_object_or_404(UserReviewProgress, id=progress_id, user=request.user,)
-    # 現在の問題を取得
-    current_question = review_progress.questions.all()[review_progress.current_question_index]
+    # 現在の問題を主キーで取得
+    current_question = get_object_or_404(Word, id=review_progress.question_id_at(review_progress.current_question_index))
     # ポストデータからanswerを取得
     answer = request.POST.get('answer').strip()
-    # 問題の解答を取得
-    correct_answer = current_question.english if review_progress.mode == 'en' else current_question.japanese.split(',')
-    # is_correctをFalseに設定
-    is_correct = False
     
     if request.method == 'POST':
-        # 英訳モード
-        if review_progress.mode == 'en':
-            if answer == correct_answer:
-                messages.success(request, '正解！！この調子で頑張りましょう!')
-                review_progress.score += 1 # 正解数を１加算
-                is_correct = True # 正誤記録を更新
-            else:
-                messages.error(request, '残念・・・次こそは正解だ！！')
-        # 和訳モード
+        # 回答の正誤を判定（和訳モードはカンマ区切りの正解のいずれかと一致すれば正解）
+        is_correct, _ = grade_answer(current_question, review_progress.mode, answer)
+        if is_correct:
+            messages.success(request, '正解！！この調子で頑張りましょう!')
+            review_progress.score += 1 # 正解数を１加算
         else:
-            # answerがcorrect_answerリストのいずれかの要素（日本語の正解）と一致するかを確認
-            if any(answer == correct_answer_japanese.strip() for correct_answer_japanese in correct_answer):
-                messages.success(request, '正解！！この調子で頑張りましょう!')
-                review_progress.score += 1 # 正解数を１加算
-                is_correct = True # 正誤記録を更新
-            else:
-                messages.error(request, '残念・・・次こそは正解だ！！')
-
-        # UserWordStatusの更新または作成（ユーザーごとの正解状態とモードを保存）
-        user_word_status, _ = UserWordStatus.objects.get_or_create(
-            user=request.user,
-            word=current_question,
-            mode=review_progress.mode  # モードを追加
-        )
-        user_word_status.is_correct = is_correct
-        user_word_status.save()
+            messages.error(request, '残念・・・次こそは正解だ！！')
+
+        # 回答イベントを追記（UserWordStatusの正解状態と次の復習日時はフラッシャーがまとめて更新）
+        append_answers(request.user, review_progress.mode, [(current_question, is_correct)])
         
         review_progress.current_question_index += 1 # 問題番号を1加算
         review_progress.save()
@@ -362,36 +341,38 @@ def check_answer(request, progress_id):
     # get_current_questionで進捗状況と現在の問題を取得
     user_progress, current_question = get_current_question(request, progress_id)
     answer = request.POST.get('answer').strip() #POSTリクエストからanswerを取得
-    # 問題の解答を取得
-    correct_answer = current_question.english if user_progress.mode == 'en' else current_question.japanese.split(',')
         
     if request.method == 'POST':
-        is_correct = False # 正誤記録を初期化
-        # 英訳モード
-        if user_progress.mode == 'en':
-            if answer == correct_answer:
-                messages.success(request, '正解！！この調子で頑張りましょう!')
-                user_progress.score += 1 # 正解数を１加算
-                is_correct = True # 正誤記録を更新
-            else:
-                messages.error(request, '残念・・・次こそは正解だ！！')
-        else: # 和訳モード
-            if any(answer == correct_answer_japanese.strip() for correct_answer_japanese in correct_answer):
-                messages.success(request, '正解！！この調子で頑張りましょう!')
-                user_progress.score += 1 # 正解数を１加算
-                is_correct = True # 正誤記録を更新
-            else:
-                messages.error(request, '残念・・・次こそは正解だ！！')
+        # 表示していた問題と現在の問題が異なる場合（二重送信など）は回答済みとして現在の問題へ
+        question_index = request.POST.get('question_index')
+        if question_index is not None and question_index != str(user_progress.current_question_index):
+            messages.error(request, 'この問題はすでに回答済みです')
+            return redirect('quiz_restart', progress_id=user_progress.id)
         
-        # UserWordStatusの更新または作成（ユーザーごとの正解状態とモードを保存）
-        user_word_status, created = UserWordStatus.objects.get_or_create(
-            user=request.user,
-            word=current_question,
-            mode=user_progress.mode  # モードを追加
-        )
-        user_word_status.is_correct = is_correct # 正誤記録をuser_word_statusに記録
-        user_word_status.save()
+        # 回答の正誤を判定（和訳モードはカンマ区切りの正解のいずれかと一致すれば正解）
+        is_correct, _ = grade_answer(current_question, user_progress.mode, answer)
         
+        with transaction.atomic():
+            # スコアと問題番号を1回の条件付きUPDATEで進める（同時に送られた回答は一方のみ反映）
+            if not UserProgress.compare_and_advance(
+                user_progress.id,
+                user_progress.current_question_index,
+                user_progress.total_questions,
+                correct=int(is_correct),
+            ):
+                messages.error(request, 'この問題はすでに回答済みです')
+                if UserProgress.objects.filter(id=user_progress.id, is_completed=True).exists():
+                    return redirect('result', progress_id=user_progress.id)
+                return redirect('quiz_restart', progress_id=user_progress.id)
+            
+            # 回答イベントを追記（UserWordStatusの正解状態と次の復習日時はフラッシャーがまとめて更新）
+            append_answers(request.user, user_progress.mode, [(current_question, is_correct)])
+        
+        if is_correct:
+            messages.success(request, '正解！！この調子で頑張りましょう!')
+            user_progress.score += 1 # 正解数を１加算
+        else:
+            messages.error(request, '残念・・・次こそは正解だ！！')
         user_progress.current_question_index += 1 # 問題番号を1加算
         
         # 問題数の確認
@@ -399,10 +380,8 @@ def check_answer(request, progress_id):
         if user_progress.current_question_index >= user_progress.total_questions:
             user_progress.is_completed = True
             user_progress.is_paused = False
-            user_progress.save()
             return render(request, 'flashcard/last_check_answer.html', {'user_progress':user_progress, 'current_question': current_question, 'answer': answer})
         else:
-            user_progress.save()
             return render(request, 'flashcard/check_answer.html', {'user_progress': user_progress, 'current_question': current_question, 'answer': answer})
     
     # POSTリクエスト以外はuser_homeにリダイレクト
@@ -3,12 +3,31 @@
 from rest_framework import authentication, exceptions
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import IntegrityError, transaction
 import jwt
 import logging
 
+from .jwks import get_jwks_cache
+from .metrics import StageTimer, registry
+from .token_cache import get_rejected_token_cache, get_verified_token_cache
+from .user_cache import get_user_cache
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+AUTH_STAGE_SECONDS = registry.histogram(
+    "auth_stage_seconds", "SupabaseAuthentication のステージごとの所要時間（秒）"
+)
+REJECTED_TOKENS = registry.counter(
+    "auth_rejected_tokens_total", "検証に失敗したトークン数（例外の種類別）"
+)
+REJECTED_CACHE_LOOKUPS = registry.counter(
+    "auth_rejected_cache_lookups_total", "ネガティブキャッシュの参照数（hit/miss）"
+)
+REJECTED_CACHE_HIT_RATE = registry.gauge(
+    "auth_rejected_cache_hit_rate", "ネガティブキャッシュのヒット率"
+)
+
 
 class SupabaseAuthentication(authentication.BaseAuthentication):
     """
@@ -32,44 +51,120 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
         if not auth_header:
             return None
 
+        # ステージごとの所要時間（ServerTimingMiddleware が Server-Timing ヘッダーに出力）
+        timer = StageTimer(
+            AUTH_STAGE_SECONDS, enabled=getattr(settings, "AUTH_TIMING_ENABLED", False)
+        )
+        getattr(request, "_request", request).auth_timer = timer
+
         try:
             # "Bearer {token}" から token を抽出
-            parts = auth_header.split()
+            with timer.stage("auth_header"):
+                parts = auth_header.split()
             if len(parts) != 2 or parts[0].lower() != "bearer":
                 return None
 
             token = parts[1]
 
             # Supabase JWTを検証
-            payload = self._verify_jwt(token)
+            # 同じトークンは exp まで検証結果を再利用し、署名検証を省略する
+            token_cache = get_verified_token_cache()
+            with timer.stage("auth_token_cache"):
+                payload = token_cache.get(token)
+            if payload is None:
+                payload = self._verify_jwt_or_reject(request, token, timer)
+                token_cache.set(token, payload)
 
             # ユーザーを取得または作成
-            user = self._get_or_create_user(payload)
+            user = self._get_or_create_user(payload, timer)
 
             return (user, token)
 
-        except jwt.ExpiredSignatureError:
-            logger.warning("JWT token has expired")
-            raise exceptions.AuthenticationFailed("トークンの有効期限が切れています")
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid JWT token: {str(e)}")
-            raise exceptions.AuthenticationFailed("無効なトークンです")
+        except exceptions.AuthenticationFailed:
+            raise
         except Exception as e:
             logger.error(f"Authentication failed: {str(e)}")
             raise exceptions.AuthenticationFailed(f"認証に失敗しました: {str(e)}")
 
-    def _verify_jwt(self, token):
+    def _verify_jwt_or_reject(self, request, token, timer):
+        """
+        ネガティブキャッシュを確認してからJWTを検証
+
+        一度拒否したトークンは SUPABASE_REJECTED_TOKEN_TTL 秒の間、
+        署名検証もログ出力もせずに401を返す。
+
+        Returns:
+            dict: デコードされたペイロード
+        """
+        rejected_tokens = get_rejected_token_cache()
+
+        with timer.stage("auth_rejected_cache"):
+            detail = rejected_tokens.get(token)
+        self._record_rejected_lookup(hit=detail is not None)
+        if detail is not None:
+            raise exceptions.AuthenticationFailed(detail)
+
+        try:
+            return self._verify_jwt(token, timer)
+
+        except jwt.PyJWKClientError as e:
+            # 未知の kid は鍵のローテーション直後（再取得の間隔内）の可能性があるので、
+            # 一時的な失敗として扱いキャッシュしない（鍵を再取得した後は同じトークンで認証できる）
+            REJECTED_TOKENS.inc(reason=type(e).__name__)
+            logger.warning(
+                f"JWT signing key not available for {self._client_key(request)}: {str(e)}"
+            )
+            raise exceptions.AuthenticationFailed("無効なトークンです")
+
+        except jwt.PyJWTError as e:
+            # 期限切れ・署名不正などトークン自体の問題のみキャッシュする
+            # （JWKS取得の通信エラーなど一時的な失敗はキャッシュしない）
+            if isinstance(e, jwt.ExpiredSignatureError):
+                detail = "トークンの有効期限が切れています"
+            else:
+                detail = "無効なトークンです"
+
+            client = self._client_key(request)
+            count = rejected_tokens.add(token, detail, client=client)
+            REJECTED_TOKENS.inc(reason=type(e).__name__)
+
+            # 同じクライアントからの拒否はログを間引く
+            if count == 1 or count % 100 == 0:
+                logger.warning(
+                    f"Rejected JWT token from {client} ({count} in window): {str(e)}"
+                )
+
+            raise exceptions.AuthenticationFailed(detail)
+
+    def _record_rejected_lookup(self, hit):
+        REJECTED_CACHE_LOOKUPS.inc(result="hit" if hit else "miss")
+        hits = REJECTED_CACHE_LOOKUPS.value(result="hit")
+        total = hits + REJECTED_CACHE_LOOKUPS.value(result="miss")
+        REJECTED_CACHE_HIT_RATE.set(round(hits / total, 4))
+
+    def _client_key(self, request):
+        """クライアントの識別子（プロキシ経由の場合は X-Forwarded-For の先頭）"""
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+        return request.META.get("REMOTE_ADDR")
+
+    def _verify_jwt(self, token, timer=None):
         """
         Supabase JWTを検証
-        ES256の場合はJWKSエンドポイントから公開鍵を動的に取得
+        ES256の場合はJWKSキャッシュ（wordbook.jwks）から公開鍵を取得
         HS256の場合は秘密鍵で検証
 
         Args:
             token (str): JWTトークン
+            timer (StageTimer): ステージ計測用（省略時は計測しない）
 
         Returns:
             dict: デコードされたペイロード
         """
+        if timer is None:
+            timer = StageTimer(enabled=False)
+
         # トークンのアルゴリズムを確認
         try:
             header = jwt.get_unverified_header(token)
@@ -80,29 +175,24 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
         # ES256の場合はJWKSから公開鍵を取得
         if algorithm == "ES256":
             try:
-                from jwt import PyJWKClient
-
-                # SupabaseのJWKSエンドポイント
-                jwks_url = f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
-                jwks_client = PyJWKClient(jwks_url)
-
-                # トークンから適切な公開鍵を取得
-                signing_key = jwks_client.get_signing_key_from_jwt(token)
+                # プロセス共通キャッシュから kid に対応する公開鍵を取得
+                # （リクエストごとのJWKS取得は行わない）
+                with timer.stage("auth_jwks"):
+                    signing_key = get_jwks_cache().get_signing_key(header.get("kid"))
 
                 # ES256で検証
-                payload = jwt.decode(
-                    token,
-                    signing_key.key,
-                    algorithms=["ES256"],
-                    audience="authenticated",
-                )
+                with timer.stage("auth_verify"):
+                    payload = jwt.decode(
+                        token,
+                        signing_key.key,
+                        algorithms=["ES256"],
+                        audience="authenticated",
+                    )
 
                 return payload
 
-            except ImportError:
-                raise exceptions.AuthenticationFailed(
-                    "ES256検証にはPyJWT[crypto]が必要です: pip install PyJWT[crypto]"
-                )
+            except jwt.PyJWTError:
+                raise
             except Exception as e:
                 logger.error(f"ES256 JWT verification failed: {str(e)}")
                 raise exceptions.AuthenticationFailed(
@@ -116,25 +206,34 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
                     "SUPABASE_JWT_SECRET が設定されていません"
                 )
 
-            payload = jwt.decode(
-                token,
-                settings.SUPABASE_JWT_SECRET,
-                algorithms=["HS256"],
-                audience="authenticated",
-            )
+            with timer.stage("auth_verify"):
+                payload = jwt.decode(
+                    token,
+                    settings.SUPABASE_JWT_SECRET,
+                    algorithms=["HS256"],
+                    audience="authenticated",
+                )
 
             return payload
 
-    def _get_or_create_user(self, payload):
+    def _get_or_create_user(self, payload, timer=None):
         """
         JWTペイロードからユーザーを取得または作成
 
+        supabase_id -> ユーザーIDの解決結果はキャッシュし、定常状態では主キーでの取得1回だけにする。
+        ユーザー自体（is_active などの権限情報）は毎回DBから読む。
+        キャッシュミス時の解決処理は supabase_id ごとに1つに絞る（single-flight）。
+
         Args:
             payload (dict): デコードされたJWTペイロード
+            timer (StageTimer): ステージ計測用（省略時は計測しない）
 
         Returns:
             CustomUser: ユーザーオブジェクト
         """
+        if timer is None:
+            timer = StageTimer(enabled=False)
+
         supabase_user_id = payload.get("sub")
         email = payload.get("email")
 
@@ -143,10 +242,45 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
                 "トークンに必要な情報が含まれていません"
             )
 
+        user_cache = get_user_cache()
+
+        with timer.stage("auth_user_cache"):
+            user_id = user_cache.get(supabase_user_id)
+        if user_id is not None:
+            with timer.stage("auth_user_db"):
+                user = User.objects.filter(pk=user_id).first()
+            # 削除済み・メールアドレスが変わっている場合は下で解決し直す
+            if user is not None and user.email == email:
+                return self._check_active(user)
+
+        with timer.stage("auth_user_db"), user_cache.single_flight(supabase_user_id):
+            user = self._resolve_user(supabase_user_id, email)
+            user_cache.set(supabase_user_id, user.id)
+
+        return self._check_active(user)
+
+    def _check_active(self, user):
+        """無効化されたユーザーは認証しない"""
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("このユーザーは無効です")
+        return user
+
+    def _resolve_user(self, supabase_user_id, email):
+        """
+        DBからユーザーを取得、紐付け、または作成
+
+        Args:
+            supabase_user_id (str): Supabase のユーザーID（sub）
+            email (str): メールアドレス
+
+        Returns:
+            CustomUser: ユーザーオブジェクト
+        """
         # まず supabase_id でユーザーを探す
-        try:
-            user = User.objects.get(supabase_id=supabase_user_id)
-            logger.info(f"Existing user found by supabase_id: {email}")
+        user = User.objects.filter(supabase_id=supabase_user_id).first()
+
+        if user is not None:
+            logger.debug(f"Existing user found by supabase_id: {email}")
 
             # メールアドレスが変更されている場合は更新
             if user.email != email:
@@ -158,35 +292,44 @@ class SupabaseAuthentication(authentication.BaseAuthentication):
 
             return user
 
-        except User.DoesNotExist:
-            # supabase_idで見つからない場合、emailで検索
-            try:
-                user = User.objects.get(email=email)
-                logger.warning(
-                    f"User found by email but missing supabase_id. "
-                    f"Linking supabase_id: {supabase_user_id} to user: {user.id}"
+        # supabase_idで見つからない場合、emailで検索
+        user = User.objects.filter(email=email).first()
+
+        if user is not None:
+            logger.warning(
+                f"User found by email but missing supabase_id. "
+                f"Linking supabase_id: {supabase_user_id} to user: {user.id}"
+            )
+            # 既存ユーザーにsupabase_idを紐付け
+            user.supabase_id = supabase_user_id
+            user.save(update_fields=["supabase_id"])
+            return user
+
+        # 完全に新しいユーザーを作成
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    supabase_id=supabase_user_id,
+                    email=email,
+                    username=email.split("@")[0],  # 仮のusername
                 )
-                # 既存ユーザーにsupabase_idを紐付け
-                user.supabase_id = supabase_user_id
-                user.save(update_fields=["supabase_id"])
+            logger.info(f"New user created via Supabase: {email}")
+            return user
+
+        except IntegrityError:
+            # 別のワーカーが同時に作成した場合は一意制約で弾かれるので、作成済みのユーザーを使う
+            user = User.objects.filter(supabase_id=supabase_user_id).first()
+            if user is not None:
                 return user
 
-            except User.DoesNotExist:
-                # 完全に新しいユーザーを作成
-                try:
-                    user = User.objects.create(
-                        supabase_id=supabase_user_id,
-                        email=email,
-                        username=email.split("@")[0],  # 仮のusername
-                    )
-                    logger.info(f"New user created via Supabase: {email}")
-                    return user
+            logger.error(f"Failed to create user: {email}")
+            raise exceptions.AuthenticationFailed("ユーザーの作成に失敗しました")
 
-                except Exception as e:
-                    logger.error(f"Failed to create user: {str(e)}")
-                    raise exceptions.AuthenticationFailed(
-                        f"ユーザーの作成に失敗しました: {str(e)}"
-                    )
+        except Exception as e:
+            logger.error(f"Failed to create user: {str(e)}")
+            raise exceptions.AuthenticationFailed(
+                f"ユーザーの作成に失敗しました: {str(e)}"
+            )
 
     def authenticate_header(self, request):
         """
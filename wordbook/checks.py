@@ -0,0 +1,31 @@
+# wordbook/checks.py
+
+from django.conf import settings
+from django.core import checks
+
+# プロセスごとに別々のデータを持つキャッシュバックエンド
+PROCESS_LOCAL_CACHE_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def check_shared_cache_alias(setting_name, default, check_id, hint):
+    """
+    setting_name のキャッシュエイリアスがプロセス内キャッシュを指していれば警告を返す
+
+    gunicorn の各ワーカーが別々の内容を持つと、他のワーカーでの更新が見えなくなる。
+    DEBUG（runserver の単一プロセス）では警告しない。
+    """
+    if settings.DEBUG:
+        return []
+
+    alias = getattr(settings, setting_name, default)
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+
+    return [
+        checks.Warning(
+            f"{setting_name} ({alias!r}) はプロセス内キャッシュ（{backend}）です",
+            hint=hint,
+            id=check_id,
+        )
+    ]
@@ -0,0 +1,190 @@
+# wordbook/jwks.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+
+import jwt
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """
+    Supabase JWKS（公開鍵セット）のプロセス共通キャッシュ
+
+    - kid をキーに公開鍵を保持し、TTL内はネットワークアクセスなしで検証できる
+    - TTLを過ぎた鍵はそのまま使い、裏でスレッドが再取得する（stale-while-revalidate）
+    - 未知の kid を受け取った場合は鍵ローテーションとみなし、1回だけ同期的に再取得する
+    - snapshot_path を指定すると取得したJWKSをディスクに保存し、
+      起動直後のワーカーでもネットワークなしで検証を始められる
+    """
+
+    def __init__(
+        self, url, ttl=600, snapshot_path=None, timeout=5, refetch_cooldown=10
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.timeout = timeout
+        self.refetch_cooldown = refetch_cooldown
+
+        self._keys = {}  # kid -> PyJWK
+        self._fetched_at = None  # 最後に取得した時刻（time.time()）
+        self._last_attempt = 0.0  # 最後に取得を試みた時刻（time.monotonic()）
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        # 取得回数（監視・検証用）
+        self.fetch_count = 0
+
+    def get_signing_key(self, kid):
+        """
+        kid に対応する公開鍵を返す
+
+        Args:
+            kid (str | None): JWTヘッダーの kid
+
+        Returns:
+            PyJWK: 検証に使う公開鍵
+        """
+        if not self._keys:
+            with self._lock:
+                if not self._keys and not self._load_snapshot():
+                    self._fetch()
+
+        key = self._find(kid)
+
+        if key is None:
+            # 未知の kid: 鍵ローテーションの可能性があるので1回だけ再取得
+            with self._lock:
+                key = self._find(kid)
+                if key is None and self._can_refetch():
+                    self._fetch()
+                    key = self._find(kid)
+
+            if key is None:
+                raise jwt.PyJWKClientError(f"一致する公開鍵が見つかりません: kid={kid}")
+
+        elif self._is_stale():
+            self._refresh_in_background()
+
+        return key
+
+    def clear(self):
+        """メモリ上のキャッシュを破棄（スナップショットは残す）"""
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = None
+            self._last_attempt = 0.0
+
+    def _find(self, kid):
+        keys = self._keys
+        if kid is None:
+            # kid のないトークンは鍵が1つの場合のみ許可
+            return next(iter(keys.values())) if len(keys) == 1 else None
+        return keys.get(kid)
+
+    def _is_stale(self):
+        return self._fetched_at is None or time.time() - self._fetched_at > self.ttl
+
+    def _can_refetch(self):
+        return time.monotonic() - self._last_attempt >= self.refetch_cooldown
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or not self._can_refetch():
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._lock:
+                    self._fetch()
+            except Exception as e:
+                # 古い鍵で検証を続けられるので警告のみ
+                logger.warning(f"JWKS background refresh failed: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def _fetch(self):
+        """JWKSエンドポイントから取得（呼び出し側でロックを取ること）"""
+        self._last_attempt = time.monotonic()
+        self.fetch_count += 1
+
+        request = urllib.request.Request(
+            self.url, headers={"User-Agent": "wordbook-jwks-cache"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.load(response)
+
+        self._install(data, time.time())
+        self._save_snapshot(data)
+
+    def _install(self, data, fetched_at):
+        keys = {}
+        for jwk in jwt.PyJWKSet.from_dict(data).keys:
+            if jwk.public_key_use in ("sig", None):
+                keys[jwk.key_id] = jwk
+
+        if not keys:
+            raise jwt.PyJWKClientError("JWKSに署名用の公開鍵がありません")
+
+        self._keys = keys
+        self._fetched_at = fetched_at
+
+    def _load_snapshot(self):
+        """ディスク上のスナップショットから読み込む（成功したらTrue）"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._install(snapshot["jwks"], snapshot["fetched_at"])
+            logger.info(f"JWKS loaded from snapshot: {self.snapshot_path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load JWKS snapshot: {str(e)}")
+            return False
+
+    def _save_snapshot(self, data):
+        if not self.snapshot_path:
+            return
+
+        # 途中まで書かれたファイルを他のワーカーが読まないよう、一時ファイル経由で置き換える
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self._fetched_at, "jwks": data}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write JWKS snapshot: {str(e)}")
+
+
+_jwks_cache = None
+_jwks_cache_lock = threading.Lock()
+
+
+def get_jwks_cache():
+    """settings からプロセス共通の JWKSCache を取得（初回のみ生成）"""
+    global _jwks_cache
+
+    if _jwks_cache is None:
+        with _jwks_cache_lock:
+            if _jwks_cache is None:
+                _jwks_cache = JWKSCache(
+                    url=f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+                    ttl=getattr(settings, "SUPABASE_JWKS_TTL", 600),
+                    snapshot_path=getattr(settings, "SUPABASE_JWKS_SNAPSHOT_PATH", None),
+                )
+
+    return _jwks_cache
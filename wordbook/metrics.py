@@ -0,0 +1,188 @@
+# wordbook/metrics.py
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# ヒストグラムのバケット境界（秒）
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Counter:
+    """単調増加するカウンター"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}  # ラベル -> 値
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {"labels": dict(key), "value": value}
+                for key, value in self._values.items()
+            ]
+
+
+class Gauge:
+    """任意の値を設定するゲージ"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}  # ラベル -> 値
+
+    def set(self, value, **labels):
+        self._values[tuple(sorted(labels.items()))] = value
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def snapshot(self):
+        return [
+            {"labels": dict(key), "value": value}
+            for key, value in list(self._values.items())
+        ]
+
+
+class Histogram:
+    """バケット集計のヒストグラム（Prometheus の histogram と同じ形式）"""
+
+    def __init__(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # ラベル -> [バケットごとの件数..., 合計, 件数]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            result = []
+            for key, series in self._series.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                result.append(
+                    {
+                        "labels": dict(key),
+                        "buckets": buckets,
+                        "sum": series[-2],
+                        "count": series[-1],
+                    }
+                )
+            return result
+
+
+class MetricsRegistry:
+    """プロセス内のメトリクスを名前で管理"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text=""):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=""):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                "type": type(metric).__name__.lower(),
+                "help": metric.help_text,
+                "series": metric.snapshot(),
+            }
+            for metric in metrics
+        }
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+
+registry = MetricsRegistry()
+
+
+class StageTimer:
+    """
+    処理ステージごとの所要時間を計測
+
+    enabled=False の場合は何も計測しない（計測のオーバーヘッドを切り替えられる）。
+    計測結果は stages に (ステージ名, 秒) で追加され、histogram にも記録される。
+    """
+
+    def __init__(self, histogram=None, enabled=True):
+        self.histogram = histogram
+        self.enabled = enabled
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        self.stages.append((name, seconds))
+        if self.histogram is not None:
+            self.histogram.observe(seconds, stage=name)
+
+    def server_timing(self):
+        """Server-Timing ヘッダーの値（ミリ秒）"""
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages
+        )
@@ -0,0 +1,25 @@
+# wordbook/middleware.py
+
+
+class ServerTimingMiddleware:
+    """
+    認証処理で計測したステージごとの所要時間を Server-Timing ヘッダーで返す
+
+    計測は settings.AUTH_TIMING_ENABLED が True の場合のみ行われる
+    （SupabaseAuthentication が request.auth_timer に結果を保存する）
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        timer = getattr(request, "auth_timer", None)
+        if timer is not None and timer.stages:
+            value = timer.server_timing()
+            if response.has_header("Server-Timing"):
+                value = f"{response['Server-Timing']}, {value}"
+            response["Server-Timing"] = value
+
+        return response
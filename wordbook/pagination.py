@@ -0,0 +1,160 @@
+# wordbook/pagination.py
+
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from urllib.parse import urlencode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    複合キー（例: 最終回答日時, id）によるキーセットページネーション
+
+    - OFFSET を使わず「前のページの最後の行より後」を WHERE で指定するので、
+      何ページ目でも先頭ページと同じコストで取得できる
+    - ordering 全体で行が一意に決まるようにすること（最後のフィールドを id など一意なものにする）
+    - カーソルは最後の行のキーを JSON にして base64 でエンコードしたもの
+    - 件数の集計（COUNT）はせず、page_size + 1 件を取得して続きの有無を判定する
+    """
+
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "無効なカーソルです"
+
+    def get_ordering(self, request, queryset, view=None):
+        return self.ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(self.get_ordering(request, queryset, view))
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        self.next_position = (
+            [self.key_value(rows[-1], field) for field in self.ordering]
+            if self.has_more
+            else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.encode_cursor(self.next_position),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(self.next_position)
+        return self.request.build_absolute_uri(
+            f"{self.request.path}?{urlencode(params, doseq=True)}"
+        )
+
+    def after(self, position):
+        """
+        (f1, f2, ..., fn) > (v1, v2, ..., vn) を辞書順の条件に展開
+        f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...（降順のフィールドは < で比較）
+
+        OR だけではインデックスの範囲検索にならないことがあるので、
+        先頭フィールドの f1 >= v1 を AND で重ねて範囲の開始位置を明示する
+        """
+        conditions = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equals = {
+                previous.lstrip("-"): value
+                for previous, value in zip(self.ordering[:i], position[:i])
+            }
+            conditions.append(Q(**equals, **{f"{name}__{lookup}": position[i]}))
+        first = self.ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return bound & reduce(lambda a, b: a | b, conditions)
+
+    @staticmethod
+    def key_value(obj, field):
+        value = obj
+        for attr in field.lstrip("-").split("__"):
+            value = getattr(value, attr)
+        return value
+
+    def encode_cursor(self, position):
+        if position is None:
+            return None
+        payload = json.dumps(
+            [
+                value.isoformat() if isinstance(value, datetime.datetime) else value
+                for value in position
+            ],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return [
+            self.cursor_value(model, field, value)
+            for field, value in zip(self.ordering, position)
+        ]
+
+    def cursor_value(self, model, field, value):
+        """カーソルの値を ordering のフィールドの型に変換（変換できなければ404）"""
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            model_field = self.model_field(model, field)
+            value = model_field.to_python(value)
+            model_field.run_validators(value)
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        return value
+
+    @staticmethod
+    def model_field(model, field):
+        """ordering のフィールド名（関連先は __ 区切り）に対応するモデルのフィールド"""
+        *relations, name = field.lstrip("-").split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        model_field = model._meta.get_field(name)
+        # 外部キーは参照先のフィールドの型で比較する
+        return model_field.target_field if model_field.is_relation else model_field
@@ -34,6 +34,27 @@ SUPABASE_JWT_SECRET = config("SUPABASE_JWT_SECRET")
 
 if not SUPABASE_JWT_SECRET:
     raise ValueError("SUPABASE_JWT_SECRET must be set in .env file")
+
+# JWKS（ES256公開鍵）のキャッシュ設定
+# TTL（秒）を過ぎるとバックグラウンドで再取得する
+SUPABASE_JWKS_TTL = config("SUPABASE_JWKS_TTL", default=600, cast=int)
+# 取得したJWKSのスナップショット保存先（空の場合は保存しない）
+SUPABASE_JWKS_SNAPSHOT_PATH = config("SUPABASE_JWKS_SNAPSHOT_PATH", default="")
+
+# 検証済みトークンのキャッシュ設定（エントリはトークンの exp で失効）
+SUPABASE_TOKEN_CACHE_SIZE = config("SUPABASE_TOKEN_CACHE_SIZE", default=1024, cast=int)
+# 全ワーカーで共有する場合は CACHES のエイリアスを指定（空の場合はプロセス内のみ）
+SUPABASE_TOKEN_CACHE_ALIAS = config("SUPABASE_TOKEN_CACHE_ALIAS", default="")
+
+# 検証に失敗したトークンを即座に拒否する期間（秒）
+SUPABASE_REJECTED_TOKEN_TTL = config("SUPABASE_REJECTED_TOKEN_TTL", default=60, cast=int)
+
+# supabase_id -> ユーザーIDの解決キャッシュ設定
+SUPABASE_USER_CACHE_ALIAS = config("SUPABASE_USER_CACHE_ALIAS", default="default")
+SUPABASE_USER_CACHE_TTL = config("SUPABASE_USER_CACHE_TTL", default=300, cast=int)
+
+# 認証ステージごとの計測（Server-Timing ヘッダーとメトリクス）を有効にするか
+AUTH_TIMING_ENABLED = config("AUTH_TIMING_ENABLED", default=False, cast=bool)
 # ============================
 
 # デバッグ設定の読み込み（存在しない場合はデフォルトでFalse）
@@ -95,6 +116,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "wordbook.middleware.ServerTimingMiddleware",  # 認証ステージの Server-Timing
 ]
 
 # STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -235,6 +257,43 @@ ADMIN_EMAIL = config("ADMIN_EMAIL", default="admin@wordbook.com")
 # 管理者用URL
 ADMIN_URL = config("ADMIN_URL", default="http://localhost:8000/admin")
 
+# クイズセッション（進行中クイズの出題順・位置・スコア）のキャッシュ設定
+# プロセス内キャッシュ（LocMemCache）のままでは check で警告する（flashcard.W001）
+QUIZ_SESSION_CACHE_ALIAS = config("QUIZ_SESSION_CACHE_ALIAS", default="default")
+QUIZ_SESSION_TTL = config("QUIZ_SESSION_TTL", default=60 * 60 * 24, cast=int)
+
+# 復習モード・リプレイモードで1回に出題する復習時期の来た単語の上限
+REVIEW_QUEUE_LIMIT = config("REVIEW_QUEUE_LIMIT", default=100, cast=int)
+
+# 回答イベントを UserWordStatus に反映する間隔（秒）と1回あたりの最大件数
+# 専用のワーカーで flush_answer_events --loop を動かす場合は ANSWER_LOG_BACKGROUND_FLUSH=False にする
+ANSWER_LOG_FLUSH_INTERVAL = config("ANSWER_LOG_FLUSH_INTERVAL", default=2.0, cast=float)
+ANSWER_LOG_BATCH_SIZE = config("ANSWER_LOG_BATCH_SIZE", default=500, cast=int)
+ANSWER_LOG_BACKGROUND_FLUSH = config("ANSWER_LOG_BACKGROUND_FLUSH", default=True, cast=bool)
+
+# 統計APIをユーザーごとの集計テーブル（UserStatistics）から返す
+# 有効にした後は rebuild_user_statistics コマンドで既存データから集計テーブルを作成する
+FLASHCARD_MATERIALIZED_STATS = config("FLASHCARD_MATERIALIZED_STATS", default=False, cast=bool)
+
+# 辞書のプロセス内インデックス（単語IDプールなど）の再構築間隔（秒）
+# 同じプロセスでの変更はシグナルで即時反映され、他のワーカーでの変更は
+# 辞書のバージョンの確認（DICTIONARY_INDEX_VERSION_CHECK_INTERVAL）で反映される
+DICTIONARY_INDEX_TTL = config("DICTIONARY_INDEX_TTL", default=300, cast=int)
+# 再構築の間は古いインデックスで応答し、裏のスレッドで作り直す（False の場合はリクエスト内で作り直す）
+DICTIONARY_INDEX_BACKGROUND_REFRESH = config(
+    "DICTIONARY_INDEX_BACKGROUND_REFRESH", default=True, cast=bool
+)
+# 他のワーカーでの辞書の変更（DBに保存した辞書のバージョン）を確認する間隔（秒）
+DICTIONARY_INDEX_VERSION_CHECK_INTERVAL = config(
+    "DICTIONARY_INDEX_VERSION_CHECK_INTERVAL", default=5, cast=float
+)
+
+# 単語検索の結果キャッシュ（辞書の変更時はバージョンを進めて一括で無効にする）
+# プロセス内キャッシュ（LocMemCache）でも古い結果は返さないが、ワーカーごとに結果を持つので
+# ヒット率が下がる（check で警告する: dictionary.W001）
+DICTIONARY_SEARCH_CACHE_ALIAS = config("DICTIONARY_SEARCH_CACHE_ALIAS", default="default")
+DICTIONARY_SEARCH_CACHE_TTL = config("DICTIONARY_SEARCH_CACHE_TTL", default=600, cast=int)
+
 # セキュリティ設定
 
 # HTTPSリダイレクトを強制する。（開発中はFalseで設定）
@@ -0,0 +1,69 @@
+# wordbook/testing.py
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from dictionary.indexes import invalidate_all
+from dictionary.models import Level, PartOfSpeech, Word
+from flashcard.models import UserProgress, UserWordStatus
+
+
+class QueryBudgetTestMixin:
+    """
+    クエリ数の上限を確認するテスト（TestCase と組み合わせる）の共通処理
+
+    難易度を level_count 個作り、難易度ごとに単語 words_per_level 個・進行状況・
+    両モードの正解ステータス（各難易度の最初の単語のみ正解）を用意する。
+    難易度を増やしてもクエリ数が変わらないことを assert_query_budget で確かめる。
+    """
+
+    level_count = 20
+    words_per_level = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create(username="budget", email="budget@example.com")
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+
+        statuses = []
+        for i in range(cls.level_count):
+            level = Level.objects.create(name=f"budget-{i}")
+            UserProgress.objects.create(
+                user=cls.user, level=level, mode="en", total_questions=cls.words_per_level
+            )
+            words = Word.objects.bulk_create(
+                Word(
+                    english=f"budget{i}x{j}",
+                    japanese=f"予算{i}-{j}",
+                    level=level,
+                    part_of_speech=part_of_speech,
+                )
+                for j in range(cls.words_per_level)
+            )
+            statuses += [
+                UserWordStatus(user=cls.user, word=word, mode=mode, is_correct=j == 0)
+                for j, word in enumerate(words)
+                for mode in ("en", "jp")
+            ]
+        UserWordStatus.objects.bulk_create(statuses)
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(DICTIONARY_INDEX_BACKGROUND_REFRESH=False))
+        invalidate_all()
+
+    def get(self, view):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def assert_query_budget(self, view, budget):
+        """2回目の呼び出しのクエリ数が budget 件であることを確認し、そのレスポンスを返す"""
+        # 1回目はプロセス内のインデックス（単語IDプールなど）の構築を含むので計測しない
+        self.get(view)
+        with self.assertNumQueries(budget):
+            response = self.get(view)
+        self.assertEqual(response.status_code, 200)
+        return response
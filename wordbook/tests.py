@@ -0,0 +1,456 @@
+# wordbook/tests.py
+
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.core.cache import caches
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    modify_settings,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from dictionary.api_views import WordListAPIView
+from dictionary.models import Level, PartOfSpeech, Word
+from flashcard.api_views import get_incorrect_words
+from flashcard.models import UserWordStatus
+from .authentication import SupabaseAuthentication
+from .jwks import JWKSCache
+from .token_cache import (
+    VerifiedTokenCache,
+    get_rejected_token_cache,
+    get_verified_token_cache,
+)
+
+TEST_JWT_SECRET = "test-jwt-secret"
+
+
+def b64url_coordinate(value):
+    """P-256 の座標を JWK 用に 32 バイト固定長で base64url エンコード"""
+    return base64.urlsafe_b64encode(value.to_bytes(32, "big")).rstrip(b"=").decode()
+
+
+def make_signing_key(kid):
+    """ES256 の秘密鍵と、それに対応する JWK（dict）を作成"""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    numbers = private_key.public_key().public_numbers()
+    # ECAlgorithm.to_jwk は先頭の 0 バイトを落とすため、約 1/128 の確率で読み込めない JWK になる
+    jwk = {
+        "kty": "EC",
+        "crv": "P-256",
+        "x": b64url_coordinate(numbers.x),
+        "y": b64url_coordinate(numbers.y),
+        "kid": kid,
+        "use": "sig",
+        "alg": "ES256",
+    }
+    return private_key, jwk
+
+
+def make_token(private_key, kid, **claims):
+    payload = {
+        "sub": "00000000-0000-0000-0000-000000000001",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="ES256", headers={"kid": kid})
+
+
+class JWKSServer:
+    """テスト用のローカル JWKS エンドポイント（取得回数を数える）"""
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.request_count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.request_count += 1
+                body = json.dumps({"keys": server.keys}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/jwks.json"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class JWKSCacheTests(SimpleTestCase):
+    """JWKSCache をローカルの JWKS サーバーに対して検証"""
+
+    def setUp(self):
+        self.private_key, jwk = make_signing_key("key-1")
+        self.server = JWKSServer([jwk])
+        self.addCleanup(self.server.close)
+
+    def verify(self, cache, token):
+        kid = jwt.get_unverified_header(token)["kid"]
+        return jwt.decode(
+            token,
+            cache.get_signing_key(kid).key,
+            algorithms=["ES256"],
+            audience="authenticated",
+        )
+
+    def test_many_verifications_fetch_jwks_at_most_once(self):
+        """TTL内であれば1万回検証しても JWKS の取得は1回以下"""
+        cache = JWKSCache(self.server.url, ttl=600)
+        token = make_token(self.private_key, "key-1")
+
+        for _ in range(10000):
+            self.verify(cache, token)
+
+        self.assertLessEqual(cache.fetch_count, 1)
+        self.assertLessEqual(self.server.request_count, 1)
+
+    def test_unknown_kid_refetches_rotated_keys(self):
+        """未知の kid は鍵ローテーションとみなして再取得し、新しい鍵で検証できる"""
+        cache = JWKSCache(self.server.url, ttl=600, refetch_cooldown=0)
+        self.verify(cache, make_token(self.private_key, "key-1"))
+
+        new_private_key, new_jwk = make_signing_key("key-2")
+        self.server.keys.append(new_jwk)
+
+        payload = self.verify(cache, make_token(new_private_key, "key-2"))
+
+        self.assertEqual(payload["aud"], "authenticated")
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_unknown_kid_within_cooldown_does_not_refetch(self):
+        """再取得の間隔内に届いた未知の kid ではエンドポイントにアクセスしない"""
+        cache = JWKSCache(self.server.url, ttl=600, refetch_cooldown=60)
+        self.verify(cache, make_token(self.private_key, "key-1"))
+
+        with self.assertRaises(jwt.PyJWKClientError):
+            cache.get_signing_key("unknown")
+
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_snapshot_allows_verification_without_network(self):
+        """スナップショットがあれば、JWKS エンドポイントに届かなくても検証できる"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        snapshot_path = os.path.join(directory.name, "jwks.json")
+
+        JWKSCache(self.server.url, snapshot_path=snapshot_path).get_signing_key("key-1")
+        self.assertTrue(os.path.exists(snapshot_path))
+
+        # 接続できない URL でもスナップショットから鍵を読み込む
+        offline = JWKSCache("http://127.0.0.1:9/jwks.json", snapshot_path=snapshot_path)
+        payload = self.verify(offline, make_token(self.private_key, "key-1"))
+
+        self.assertEqual(payload["aud"], "authenticated")
+        self.assertEqual(offline.fetch_count, 0)
+
+
+class VerifiedTokenCacheTests(SimpleTestCase):
+    """署名検証済みペイロードのキャッシュ"""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.now = time.time()
+
+    def at(self, seconds):
+        """現在時刻を seconds 秒後に進める"""
+        return mock.patch("wordbook.token_cache.time.time", return_value=self.now + seconds)
+
+    def test_entry_expires_with_token(self):
+        cache = VerifiedTokenCache()
+        payload = {"sub": "user", "exp": self.now + 60}
+        with self.at(0):
+            cache.set("token", payload)
+            self.assertEqual(cache.get("token"), payload)
+
+        with self.at(61):
+            self.assertIsNone(cache.get("token"))
+        self.assertEqual(len(cache._entries), 0)
+
+    def test_expired_or_exp_less_tokens_are_not_stored(self):
+        cache = VerifiedTokenCache()
+        with self.at(0):
+            cache.set("expired", {"sub": "user", "exp": self.now - 1})
+            cache.set("no-exp", {"sub": "user"})
+
+            self.assertIsNone(cache.get("expired"))
+            self.assertIsNone(cache.get("no-exp"))
+        self.assertEqual(len(cache._entries), 0)
+
+    def test_shared_entry_past_exp_is_not_served(self):
+        cache = VerifiedTokenCache(cache_alias="default")
+        with self.at(0):
+            cache.set("token", {"sub": "user", "exp": self.now + 60})
+        # 他のワーカー（プロセス内のLRUが空）から、exp を過ぎた後に読む
+        other_worker = VerifiedTokenCache(cache_alias="default")
+        with self.at(61):
+            self.assertIsNone(other_worker.get("token"))
+
+    def test_lru_never_exceeds_maxsize(self):
+        cache = VerifiedTokenCache(maxsize=3)
+        payload = {"sub": "user", "exp": self.now + 60}
+        with self.at(0):
+            for i in range(10):
+                cache.set(f"token-{i}", payload)
+                self.assertLessEqual(len(cache._entries), 3)
+
+            # 最近使ったエントリは残り、最も長く使っていないエントリから追い出す
+            cache.get("token-7")
+            cache.set("token-10", payload)
+            self.assertIsNotNone(cache.get("token-7"))
+            self.assertIsNone(cache.get("token-8"))
+            self.assertEqual(len(cache._entries), 3)
+
+
+@override_settings(SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+class SupabaseUserResolutionTests(TestCase):
+    """supabase_id -> ユーザーIDの解決キャッシュ"""
+
+    def setUp(self):
+        caches["default"].clear()
+        get_verified_token_cache().clear()
+        get_rejected_token_cache().clear()
+        self.authenticator = SupabaseAuthentication()
+        self.token = jwt.encode(
+            {
+                "sub": "11111111-1111-1111-1111-111111111111",
+                "email": "cached@example.com",
+                "aud": "authenticated",
+                "exp": int(time.time()) + 3600,
+            },
+            TEST_JWT_SECRET,
+            algorithm="HS256",
+        )
+
+    def authenticate(self):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return self.authenticator.authenticate(request)[0]
+
+    def test_first_request_creates_one_user(self):
+        user = self.authenticate()
+        self.assertEqual(user.supabase_id, "11111111-1111-1111-1111-111111111111")
+        self.assertEqual(CustomUser.objects.filter(email="cached@example.com").count(), 1)
+
+    def test_steady_state_loads_user_by_primary_key_only(self):
+        self.authenticate()
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+    def test_deactivation_on_another_worker_is_applied_immediately(self):
+        """シグナルの届かない変更（他のワーカー・update()）でも権限は最新の値で判定する"""
+        user = self.authenticate()
+        CustomUser.objects.filter(pk=user.pk).update(is_active=False)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_expired_cached_token_is_verified_again(self):
+        """キャッシュ済みのトークンも exp を過ぎた後は検証し直す（キャッシュから返さない）"""
+        now = time.time()
+        verify_jwt = SupabaseAuthentication._verify_jwt
+        with mock.patch.object(
+            SupabaseAuthentication, "_verify_jwt", autospec=True, side_effect=verify_jwt
+        ) as verify:
+            self.authenticate()
+            self.authenticate()
+            self.assertEqual(verify.call_count, 1)
+
+            # exp（1時間後）を過ぎた
+            with mock.patch("wordbook.token_cache.time.time", return_value=now + 3601):
+                self.authenticate()
+            self.assertEqual(verify.call_count, 2)
+
+    def test_staff_flag_is_read_from_database(self):
+        user = self.authenticate()
+        CustomUser.objects.filter(pk=user.pk).update(is_staff=True)
+
+        self.assertTrue(self.authenticate().is_staff)
+
+
+@override_settings(SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+@modify_settings(MIDDLEWARE={"append": "wordbook.middleware.ServerTimingMiddleware"})
+class ServerTimingTests(TestCase):
+    """認証ステージの Server-Timing ヘッダー"""
+
+    def setUp(self):
+        caches["default"].clear()
+        get_verified_token_cache().clear()
+        get_rejected_token_cache().clear()
+        token = jwt.encode(
+            {
+                "sub": "22222222-2222-2222-2222-222222222222",
+                "email": "timing@example.com",
+                "aud": "authenticated",
+                "exp": int(time.time()) + 3600,
+            },
+            TEST_JWT_SECRET,
+            algorithm="HS256",
+        )
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def test_stages_are_reported_when_enabled(self):
+        with self.settings(AUTH_TIMING_ENABLED=True):
+            response = self.client.get(reverse("metrics"), headers=self.headers)
+
+        stages = dict(
+            part.strip().split(";dur=") for part in response["Server-Timing"].split(",")
+        )
+        expected = {"auth_header", "auth_token_cache", "auth_user_cache"}
+        self.assertLessEqual(expected, set(stages))
+        for duration in stages.values():
+            self.assertGreaterEqual(float(duration), 0)
+
+    def test_no_header_when_disabled(self):
+        with self.settings(AUTH_TIMING_ENABLED=False):
+            response = self.client.get(reverse("metrics"), headers=self.headers)
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class MetricsEndpointTests(TestCase):
+    """プロセス内メトリクスの取得（管理者のみ）"""
+
+    def test_staff_can_read_metrics(self):
+        staff = CustomUser.objects.create(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["auth_stage_seconds"]["type"], "histogram")
+
+    def test_other_users_are_rejected(self):
+        self.assertIn(self.client.get(reverse("metrics")).status_code, (401, 403))
+
+        user = CustomUser.objects.create(username="member", email="member@example.com")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+
+class UnknownKidTests(TestCase):
+    """鍵のローテーション直後に届いた未知の kid のトークン"""
+
+    def setUp(self):
+        get_verified_token_cache().clear()
+        get_rejected_token_cache().clear()
+        self.private_key, jwk = make_signing_key("key-1")
+        self.server = JWKSServer([jwk])
+        self.addCleanup(self.server.close)
+
+        self.jwks_cache = JWKSCache(self.server.url, refetch_cooldown=10)
+        patcher = mock.patch(
+            "wordbook.authentication.get_jwks_cache", return_value=self.jwks_cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def authenticate(self, token):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return SupabaseAuthentication().authenticate(request)[0]
+
+    def test_unknown_kid_is_not_negative_cached(self):
+        claims = {"email": "rotated@example.com"}
+        self.authenticate(make_token(self.private_key, "key-1", **claims))
+
+        # 新しい鍵で署名されたトークンが、再取得の間隔内に届く
+        new_private_key, new_jwk = make_signing_key("key-2")
+        self.server.keys.append(new_jwk)
+        token = make_token(new_private_key, "key-2", **claims)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+        self.assertIsNone(get_rejected_token_cache().get(token))
+
+        # 間隔が過ぎた後は鍵を再取得して同じトークンで認証できる
+        self.jwks_cache.refetch_cooldown = 0
+        user = self.authenticate(token)
+
+        self.assertEqual(user.email, "rotated@example.com")
+
+
+class KeysetCursorTests(TestCase):
+    """キーセットページネーションのカーソル"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(username="cursor", email="cursor@example.com")
+        level = Level.objects.create(name="テスト")
+        part_of_speech = PartOfSpeech.objects.create(name="名詞")
+        words = [
+            Word.objects.create(
+                english=f"word{i}", japanese=f"単語{i}", level=level, part_of_speech=part_of_speech
+            )
+            for i in range(5)
+        ]
+        UserWordStatus.objects.bulk_create(
+            UserWordStatus(user=cls.user, word=word, mode="en", is_correct=False)
+            for word in words
+        )
+
+    def get(self, view, **params):
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    @staticmethod
+    def cursor(position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+    def test_next_cursor_walks_every_row_once(self):
+        for view, key in ((get_incorrect_words, "id"), (WordListAPIView.as_view(), "english")):
+            seen = []
+            params = {"limit": 2}
+            while True:
+                response = self.get(view, **params)
+                self.assertEqual(response.status_code, 200)
+                seen += [row[key] for row in response.data["results"]]
+                if response.data["next_cursor"] is None:
+                    break
+                params["cursor"] = response.data["next_cursor"]
+            self.assertEqual(len(seen), 5)
+            self.assertEqual(len(set(seen)), 5)
+
+    def test_malformed_cursor_values_are_not_found(self):
+        cases = [
+            (get_incorrect_words, {}, ["abc", 1]),
+            (get_incorrect_words, {}, [{"a": 1}, 1]),
+            (get_incorrect_words, {}, ["2024-01-01T00:00:00+00:00", "abc"]),
+            (get_incorrect_words, {}, ["2024-01-01T00:00:00+00:00", [1]]),
+            (WordListAPIView.as_view(), {}, ["abc"]),
+            (WordListAPIView.as_view(), {}, [{"a": 1}]),
+            (WordListAPIView.as_view(), {}, [None]),
+            (WordListAPIView.as_view(), {}, [10**30]),
+            (WordListAPIView.as_view(), {"ordering": "level"}, ["abc", "word1"]),
+            (WordListAPIView.as_view(), {"ordering": "-english"}, [{"a": 1}]),
+        ]
+        for view, params, position in cases:
+            with self.subTest(position=position, **params):
+                response = self.get(view, cursor=self.cursor(position), **params)
+                self.assertEqual(response.status_code, 404)
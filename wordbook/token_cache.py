@@ -0,0 +1,184 @@
+# wordbook/token_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def token_digest(token):
+    """トークン本体をキーに使わないよう SHA-256 のダイジェストに変換"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    署名検証済みJWTペイロードのキャッシュ
+
+    - トークンのダイジェストをキーにしたサイズ上限付きLRU（プロセス内）
+    - 各エントリはトークン自身の exp で失効する
+    - cache_alias を指定すると Django のキャッシュバックエンドも併用し、
+      gunicorn の全ワーカーで検証結果を共有する
+    """
+
+    key_prefix = "supabase:verified:"
+
+    def __init__(self, maxsize=1024, cache_alias=None):
+        self.maxsize = maxsize
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()  # digest -> (exp, payload)
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """
+        検証済みペイロードを返す（未登録・失効済みの場合は None）
+        """
+        digest = token_digest(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(digest)
+                    return entry[1]
+                del self._entries[digest]
+
+        if self.cache_alias:
+            payload = caches[self.cache_alias].get(self.key_prefix + digest)
+            if payload is not None and payload.get("exp", 0) > now:
+                self._store(digest, payload)
+                return payload
+
+        return None
+
+    def set(self, token, payload):
+        """
+        検証済みペイロードを登録（exp のないトークンはキャッシュしない）
+        """
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+
+        ttl = exp - time.time()
+        if ttl <= 0:
+            return
+
+        digest = token_digest(token)
+        self._store(digest, payload)
+
+        if self.cache_alias:
+            caches[self.cache_alias].set(
+                self.key_prefix + digest, payload, timeout=int(ttl) + 1
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, digest, payload):
+        with self._lock:
+            self._entries[digest] = (payload["exp"], payload)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RejectedTokenCache:
+    """
+    検証に失敗したトークンの短期キャッシュ（ネガティブキャッシュ）
+
+    - 同じトークンの再送は署名検証もログ出力もせずに即座に拒否できる
+    - クライアントごとの拒否回数を ttl の期間で数え、ログ出力の間引きに使う
+    """
+
+    def __init__(self, maxsize=4096, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # digest -> (失効時刻, 拒否理由)
+        self._clients = OrderedDict()  # クライアント -> [期間の開始時刻, 拒否回数]
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """
+        拒否済みトークンの拒否理由を返す（未登録・失効済みの場合は None）
+        """
+        digest = token_digest(token)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[digest]
+                return None
+            return entry[1]
+
+    def add(self, token, detail, client=None):
+        """
+        拒否したトークンを登録し、そのクライアントの期間内の拒否回数を返す
+        """
+        digest = token_digest(token)
+        now = time.monotonic()
+
+        with self._lock:
+            self._entries[digest] = (now + self.ttl, detail)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+            counter = self._clients.get(client)
+            if counter is None or counter[0] + self.ttl <= now:
+                counter = [now, 0]
+            counter[1] += 1
+            self._clients[client] = counter
+            self._clients.move_to_end(client)
+            while len(self._clients) > self.maxsize:
+                self._clients.popitem(last=False)
+
+            return counter[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._clients.clear()
+
+
+_verified_token_cache = None
+_verified_token_cache_lock = threading.Lock()
+
+
+def get_verified_token_cache():
+    """settings からプロセス共通の VerifiedTokenCache を取得（初回のみ生成）"""
+    global _verified_token_cache
+
+    if _verified_token_cache is None:
+        with _verified_token_cache_lock:
+            if _verified_token_cache is None:
+                _verified_token_cache = VerifiedTokenCache(
+                    maxsize=getattr(settings, "SUPABASE_TOKEN_CACHE_SIZE", 1024),
+                    cache_alias=getattr(settings, "SUPABASE_TOKEN_CACHE_ALIAS", None),
+                )
+
+    return _verified_token_cache
+
+
+_rejected_token_cache = None
+
+
+def get_rejected_token_cache():
+    """settings からプロセス共通の RejectedTokenCache を取得（初回のみ生成）"""
+    global _rejected_token_cache
+
+    if _rejected_token_cache is None:
+        with _verified_token_cache_lock:
+            if _rejected_token_cache is None:
+                _rejected_token_cache = RejectedTokenCache(
+                    ttl=getattr(settings, "SUPABASE_REJECTED_TOKEN_TTL", 60),
+                )
+
+    return _rejected_token_cache
@@ -23,6 +23,7 @@ urlpatterns = [
     path("flashcard/", include("flashcard.urls")),
     path("test-error/", views.test_error, name="test_error"),  # ERRORログ用
     path("api/health/", health_check),
+    path("api/metrics/", views.metrics, name="metrics"),
     path("api/", include("dictionary.api.urls")),
     # ===== 🆕 DRF API用URL =====
     path("api/accounts/", include("accounts.api_urls")),
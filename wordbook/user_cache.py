@@ -0,0 +1,78 @@
+# wordbook/user_cache.py
+
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class SupabaseUserCache:
+    """
+    supabase_id -> ユーザーIDの解決結果キャッシュ
+
+    - supabase_id / メールアドレスによる検索・紐付け・作成を省略し、
+      定常状態の認証は主キーでの取得1回だけにする
+    - 保存するのはユーザーIDのみ（is_active / is_staff などは毎回DBから読むので、
+      他のワーカーでの権限の変更もすぐに反映される）
+    - ユーザーの保存・削除時は accounts.signals から invalidate される
+    """
+
+    key_prefix = "supabase:user:"
+
+    def __init__(self, cache_alias="default", timeout=300):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self._locks = {}  # supabase_id -> [Lock, 待機数]
+        self._locks_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get(self, supabase_id):
+        return self.cache.get(self.key_prefix + supabase_id)
+
+    def set(self, supabase_id, user_id):
+        self.cache.set(self.key_prefix + supabase_id, user_id, timeout=self.timeout)
+
+    def invalidate(self, supabase_id):
+        self.cache.delete(self.key_prefix + supabase_id)
+
+    @contextmanager
+    def single_flight(self, supabase_id):
+        """
+        同じ supabase_id の解決処理をプロセス内で1つに絞る
+        （新規ユーザーの初回アクセスで同時に届くリクエスト対策）
+        """
+        with self._locks_lock:
+            entry = self._locks.setdefault(supabase_id, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[supabase_id]
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    """settings からプロセス共通の SupabaseUserCache を取得（初回のみ生成）"""
+    global _user_cache
+
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = SupabaseUserCache(
+                    cache_alias=getattr(settings, "SUPABASE_USER_CACHE_ALIAS", "default"),
+                    timeout=getattr(settings, "SUPABASE_USER_CACHE_TTL", 300),
+                )
+
+    return _user_cache
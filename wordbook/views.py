@@ -1,5 +1,9 @@
 from django.shortcuts import render
 from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .metrics import registry
 
 def home(request):
     return render(request, 'home.html')
@@ -8,4 +12,11 @@ def home(request):
 def test_error(request):
     # ZeroDivisionErrorを発生させる
     result = 1 / 0
-    return HttpResponse(f"The result is {result}")
\ No newline at end of file
+    return HttpResponse(f"The result is {result}")
+
+
+# プロセス内メトリクスの取得（管理者のみ）
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    return Response(registry.snapshot())